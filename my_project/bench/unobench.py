@@ -0,0 +1,254 @@
+# -*- coding: utf-8 -*-
+#!/usr/bin/env python
+
+# unostarter is helper for LibreOffice macro development
+# Copyright (C) 2017  Sasa Kelecevic
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301  USA
+
+"""Benchmarks of unostarter bridge calls and timings
+
+Runs on the stand-in runtime from unofake, so no office is needed:
+
+    python unobench.py
+    python unobench.py --latency 0.0002 --json bench.json
+    python unobench.py --compare bench.json
+    python unobench.py startup --import-budget 50
+
+With --real the benchmarks run against a listening office and calls
+are counted with unostarter tracing.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+# unostarter as deployed into the office
+PYTHONPATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'src', 'pythonpath')
+sys.path.insert(0, os.path.abspath(PYTHONPATH))
+
+BENCHMARKS = []
+
+# what each submodule adds to a cold import, timed in a fresh interpreter
+_IMPORTS = (
+    ('import/unostarter', 'import unostarter'),
+    ('import/unogui', 'import unostarter; unostarter.Gui'),
+    ('import/unoinspect', 'import unostarter; unostarter.Inspector'),
+)
+
+_IMPORT_SCRIPT = """
+import sys, time
+sys.path.insert(0, sys.argv[2])
+if sys.argv[1] == 'fake':
+    import unofake
+    unofake.install()
+setup, statement = sys.argv[3:]
+exec(setup)
+start = time.perf_counter()
+exec(statement)
+print(time.perf_counter() - start)
+"""
+
+
+def benchmark(func):
+    BENCHMARKS.append(func)
+    return func
+
+
+class _Runner:
+    def __init__(self, u, office=None):
+        self.u = u
+        self.office = office
+        self.results = {}
+
+    def calls(self):
+        if self.office is not None:
+            return self.office.calls
+        return self.u._tracer.calls if self.u._tracer is not None else 0
+
+    def measure(self, name, func, repeat=1):
+        """Record bridge calls of one run and best time of repeat runs"""
+        best = None
+        calls = 0
+        for _ in range(repeat):
+            before = self.calls()
+            start = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - start
+            calls = self.calls() - before
+            best = elapsed if best is None else min(best, elapsed)
+        self.results[name] = {'calls': calls, 'seconds': best}
+
+
+def importTime(setup, statement, real=False):
+    """Seconds statement takes after setup in a fresh interpreter"""
+    out = subprocess.check_output([sys.executable, '-c', _IMPORT_SCRIPT, 'real' if real else 'fake',
+                                   os.path.abspath(PYTHONPATH), setup, statement],
+                                  cwd=os.path.dirname(os.path.abspath(__file__)))
+    return float(out.decode().split()[-1])
+
+
+@benchmark
+def startup(r, repeat=5):
+    setup = ''
+    for name, statement in _IMPORTS:
+        best = min(importTime(setup, statement, r.office is None) for _ in range(repeat))
+        r.results[name] = {'calls': 0, 'seconds': best}
+        # the core is already loaded when a submodule is measured
+        setup = 'import unostarter'
+
+
+@benchmark
+def connect(r):
+    u = r.u
+    u.resetConnections()
+    r.measure('connect/cached x50', lambda: [u.ConnectOffice() for _ in range(50)])
+    r.measure('connect/uncached x5', lambda: [u.ConnectOffice(cache=False) for _ in range(5)])
+
+
+def _singleProperties(cls):
+    """Subclass of a dialog class setting control properties one by one"""
+    return type(cls.__name__, (cls,), {'batchProperties': False})
+
+
+@benchmark
+def dialogs(r):
+    u = r.u
+    for cls in (u.SelectBoxClass, u.OptionBoxClass, u.TextBoxClass, u.NumberBoxClass, u.DateBoxClass,
+                u.MessageBoxWizardClass):
+        for mode, built in (('batched', cls), ('single', _singleProperties(cls))):
+            r.measure('dialog/{}/{}'.format(cls.__name__, mode), lambda: built().dispose(), repeat=3)
+
+
+@benchmark
+def optionbox(r):
+    u = r.u
+    app = u.OptionBoxClass(choices=['item{:05d}'.format(i) for i in range(10000)])
+    r.measure('optionbox/selectAll 10k', app.selectAll, repeat=3)
+    r.measure('optionbox/clearAll 10k', app.clearAll, repeat=3)
+    r.measure('optionbox/invertSelection 10k', app.invertSelection, repeat=3)
+    r.measure('optionbox/selectPattern 10k', lambda: app.selectPattern('item0*'), repeat=3)
+    r.measure('optionbox/getSelectedPos 10k', app.getSelectedPos, repeat=3)
+    control = app.DialogContainer.getControl('lbChoices')
+    # the former way of selecting, one bridge call per item
+    r.measure('optionbox/selectItem loop 1k', lambda: [control.selectItem(item, True)
+                                                       for item in app.lbChoices.StringItemList[:1000]])
+    app.dispose()
+
+
+@benchmark
+def inspection(r):
+    u = r.u
+    insp = u.Inspector()
+    sheets = insp.desktop.getCurrentComponent().Sheets
+    sheet = sheets.getByIndex(0)
+    insp.cache.clear()
+    r.measure('inspect/first', lambda: insp.inspect(sheet))
+    r.measure('inspect/cached x100', lambda: [insp.inspect(sheet) for _ in range(100)])
+    r.measure('inspect/item x100', lambda: [insp.inspect(sheet, item=['Name']) for _ in range(100)])
+    r.measure('inspect/no values x100', lambda: [insp.inspect(sheet, values=False) for _ in range(100)])
+
+
+@benchmark
+def calc(r):
+    u = r.u
+    office = u.Office()
+    data = u.CalcData(office.getDocument(), office)
+    sheet = data.getSheet(0)
+    r.measure('calc/read used area', lambda: data.read(sheet))
+    with tempfile.TemporaryDirectory() as tmp:
+        for format in ('csv', 'columnar'):
+            r.measure('calc/export ' + format, lambda: data.export(os.path.join(tmp, 'sheet.' + format), sheet, format=format))
+    rows = [('row{}'.format(i), i, i * 0.5, None, i % 7) for i in range(40000)]
+    r.measure('calc/import 200k cells', lambda: data.importData(rows, sheet, 'H1'))
+
+    def per_cell():
+        for row in range(100):
+            for column in range(5):
+                sheet.getCellByPosition(column, row).getString()
+    r.measure('calc/per cell 100x5', per_cell)
+
+
+def run(names=None, real=False, latency=0.0, rows=200000):
+    office = None
+    if not real:
+        import unofake
+        office = unofake.install(latency=latency, rows=rows)
+    import unostarter as u
+    if real:
+        u.startTracing()
+    runner = _Runner(u, office)
+    for func in BENCHMARKS:
+        if names and func.__name__ not in names:
+            continue
+        func(runner)
+    return runner.results
+
+
+def compare(results, baseline, tolerance):
+    """Return lines describing regressions against baseline"""
+    regressions = []
+    for name, old in sorted(baseline.items()):
+        new = results.get(name)
+        if new is None:
+            continue
+        if new['calls'] > old['calls']:
+            regressions.append('{}: {} bridge calls, was {}'.format(name, new['calls'], old['calls']))
+        if old['seconds'] and new['seconds'] > old['seconds'] * tolerance:
+            regressions.append('{}: {:.1f} ms, was {:.1f} ms'.format(name, new['seconds'] * 1000, old['seconds'] * 1000))
+    return regressions
+
+
+def checkBudget(results, budget):
+    """Return lines for cold imports slower than budget seconds"""
+    return ['{}: {:.1f} ms, budget {:.1f} ms'.format(name, results[name]['seconds'] * 1000, budget * 1000)
+            for name, _ in _IMPORTS if name in results and results[name]['seconds'] > budget]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('names', nargs='*', help='benchmarks to run: ' + ', '.join(f.__name__ for f in BENCHMARKS))
+    parser.add_argument('--real', action='store_true', help='use a listening office instead of the stand-in')
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds per stand-in bridge call')
+    parser.add_argument('--rows', type=int, default=200000, help='rows of stand-in sheet data')
+    parser.add_argument('--json', help='write results to this file')
+    parser.add_argument('--compare', help='baseline results file, exit 1 on regression')
+    parser.add_argument('--tolerance', type=float, default=1.5, help='allowed time ratio against baseline')
+    parser.add_argument('--import-budget', type=float, help='milliseconds allowed per cold import, exit 1 if slower')
+    args = parser.parse_args(argv)
+
+    results = run(args.names, args.real, args.latency, args.rows)
+    for name, r in results.items():
+        print('{:<45} {:>8} calls {:>10.2f} ms'.format(name, r['calls'], r['seconds'] * 1000))
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=1, sort_keys=True)
+    regressions = []
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+    if args.import_budget is not None:
+        regressions += checkBudget(results, args.import_budget / 1000)
+    for line in regressions:
+        print('REGRESSION ' + line)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
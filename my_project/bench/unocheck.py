@@ -0,0 +1,571 @@
+# -*- coding: utf-8 -*-
+#!/usr/bin/env python
+
+# unostarter is helper for LibreOffice macro development
+# Copyright (C) 2017  Sasa Kelecevic
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301  USA
+
+"""Behaviour checks of unostarter on the stand-in runtime from unofake
+
+    python unocheck.py                 # all checks, exit 1 on failure
+    python unocheck.py bulk_edit       # selected checks
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import traceback
+
+import unofake
+
+# unostarter as deployed into the office
+PYTHONPATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'src', 'pythonpath')
+sys.path.insert(0, os.path.abspath(PYTHONPATH))
+
+CHECKS = []
+
+
+def check(func):
+    CHECKS.append(func)
+    return func
+
+
+def fresh(**kwargs):
+    """Start a new stand-in office and drop state cached by unostarter"""
+    office = unofake.install(**kwargs)
+    import unostarter
+    unostarter.resetConnections()
+    unostarter.clearDocumentCache()
+    return office, unostarter
+
+
+class _TempDir:
+    def __enter__(self):
+        self.path = tempfile.mkdtemp(prefix='unocheck_')
+        return self.path
+
+    def __exit__(self, *args):
+        shutil.rmtree(self.path, ignore_errors=True)
+
+
+def _touch(path, text='x'):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        f.write(text)
+    return path
+
+
+@check
+def bulk_edit():
+    office, u = fresh()
+    o = u.Office()
+    doc = o.getDocument()
+    with o.bulk_edit(doc, undo='context', undo_title='outer'):
+        with o.bulk_edit(doc, undo='lock'):
+            assert doc._locks == {'controllers': 2, 'actions': 2}
+            assert not doc._autocalc
+            assert doc._undo._locks == 1
+        assert doc._locks == {'controllers': 1, 'actions': 1}
+        assert not doc._autocalc, 'inner scope must not enable auto calculation of the outer one'
+    assert doc._locks == {'controllers': 0, 'actions': 0}
+    assert doc._autocalc
+    assert doc._undo._actions == ['outer'] and doc._undo._locks == 0
+    try:
+        with o.bulk_edit(doc, undo='context'):
+            raise KeyError('boom')
+    except KeyError:
+        pass
+    assert doc._locks == {'controllers': 0, 'actions': 0} and doc._autocalc and not doc._undo._contexts
+
+
+@check
+def convert_many():
+    office, u = fresh(rows=3)
+    o = u.Office()
+    with _TempDir() as tmp:
+        paths = [_touch(os.path.join(tmp, 'in', 'doc{}.ods'.format(i))) for i in range(5)]
+        paths.insert(2, os.path.join(tmp, 'in', 'missing.ods'))
+        out = os.path.join(tmp, 'out')
+        os.makedirs(out)
+        for prefetch in (0, 2):
+            results = list(o.convert_many(paths, 'calc_pdf_Export', out, prefetch=prefetch))
+            assert [r.path for r in results] == paths
+            assert [r.error is None for r in results] == [True, True, False, True, True, True]
+            for r in results:
+                if r.error is None:
+                    assert os.path.exists(r.output) and r.output.endswith('.pdf'), r
+        # inputs with the same name in other directories must not overwrite each other
+        same = [_touch(os.path.join(tmp, 'in', d, 'report.ods'), d) for d in ('a', 'b')]
+        for prefetch in (0, 2):
+            shutil.rmtree(out)
+            os.makedirs(out)
+            first, second = o.convert_many(same, 'calc_pdf_Export', out, prefetch=prefetch)
+            assert first.error is None and first.output == os.path.join(out, 'report.pdf')
+            assert isinstance(second.error, ValueError) and second.output is None, second
+            assert os.listdir(out) == ['report.pdf']
+        # an error of the paths iterable reaches the caller
+        def broken():
+            yield paths[0]
+            raise OSError('listing failed')
+        for prefetch in (0, 2):
+            results = []
+            try:
+                for r in o.convert_many(broken(), 'calc_pdf_Export', out, prefetch=prefetch):
+                    results.append(r)
+            except OSError:
+                pass
+            else:
+                raise AssertionError('convert_many ended without the error')
+            assert [r.path for r in results] == paths[:1]
+        # closing early must not leave the loader thread blocked
+        gen = o.convert_many(paths, 'calc_pdf_Export', out, prefetch=1)
+        next(gen)
+        gen.close()
+
+
+@check
+def writer_builder():
+    office, u = fresh()
+    o = u.Office()
+    doc = o.getDesktop().loadComponentFromURL('private:factory/swriter', '_blank', 0, ())
+    with u.WriterBuilder(doc, o) as w:
+        w.heading('Report', 1)
+        w.paragraph('one')
+        w.paragraph('two')
+        w.table([('a', 1), ('b', None)])
+        w.paragraph('after')
+    text = doc.getText()
+    assert text._paragraphs == [['Heading 1', 'Report'], ['Standard', 'one'], ['Standard', 'two'],
+                                ['Standard', 'after']], text._paragraphs
+    assert text._tables[0]._data == (('a', 1.0), ('b', ''))
+
+
+@check
+def replace_many():
+    office, u = fresh()
+    o = u.Office()
+    doc = o.getDesktop().loadComponentFromURL('private:factory/swriter', '_blank', 0, ())
+    doc.getText().setString('The colour of colours  \nthe Colour wheel\nno match')
+    rules = [('colour', 'color'), u.ReplaceRule('(\\w+) wheel', 'wheel of $1', regex=True),
+             ('The', 'A', False, True), (' +$', '', True), ('absent', 'x')]
+    original = doc.getText().getString()
+    assert o.replaceMany(rules, doc, dry_run=True) == [3, 1, 1, 1, 0]
+    assert doc.getText().getString() == original, 'dry run must not change the document'
+    assert o.replaceMany(rules, doc) == [3, 1, 1, 1, 0]
+    assert doc.getText().getString() == 'A color of colors\nthe wheel of color\nno match', doc.getText().getString()
+    assert doc._undo._actions == ['Replace'], 'all rules must be one undo action'
+
+
+@check
+def export_import():
+    office, u = fresh(rows=250, columns=4)
+    o = u.Office()
+    data = u.CalcData(o.getDocument(), o)
+    rows = data.read(0)
+    with _TempDir() as tmp:
+        for format in ('csv', 'columnar'):
+            path = os.path.join(tmp, 'sheet.' + format)
+            progress = []
+            result = data.export(path, 0, format=format, block_rows=100, progress=progress.append)
+            assert result.rows == 250 and [p.rows for p in progress] == [100, 200, 250]
+            if format == 'csv':
+                target = 'Sheet2'
+                data.importData(path, target)
+            else:
+                blocks = list(u.readColumnar(path))
+                assert sum(len(block[0]) for block in blocks) == 250
+                target = 'Sheet2'
+                data.importData((row for block in blocks for row in zip(*block)), target, 'A1', block_rows=64)
+            assert data.read(target, 'A1:D250') == rows, format
+        # numbers survive the text round trip exactly
+        numbers = [(1234567890123456.0, 0.1 + 0.2, -2.5e-300, 42.0)]
+        data.importData(numbers, 'Sheet2', 'F1')
+        path = os.path.join(tmp, 'numbers.csv')
+        data.export(path, 'Sheet2', 'F1:I1')
+        with open(path) as f:
+            assert f.read().split() == ['1234567890123456,0.30000000000000004,-2.5e-300,42']
+        data.importData(path, 'Sheet2', 'F2')
+        assert data.read('Sheet2', 'F2:I2') == numbers
+
+
+@check
+def mirror():
+    office, u = fresh(rows=300, columns=3)
+    data = u.CalcData()
+    sheet = data.getSheet(0)
+    m = data.mirror(sheet, block_rows=100)
+    before = office.calls
+    for row in range(len(m)):
+        m[row, 1] = m[row, 1] + 1
+    assert office.calls == before, 'reads and writes must stay in memory'
+    sheet._store(2, 150, 'office')
+    m.markStale(unofake._Struct('com.sun.star.table.CellRangeAddress', Sheet=0, StartColumn=2, EndColumn=2,
+                                StartRow=150, EndRow=150))
+    assert m[150, 2] == 'office' and m.refreshes == 1
+    m.flush()
+    assert not m.isDirty()
+    assert data.read(sheet, 'B1:B300') == [(float(r * 3 + 1 + 1),) for r in range(300)]
+    m.close()
+    assert not data.document._changes, 'close() removes the listener'
+
+    # edits in the office reach the mirror through the changes listener
+    m = data.mirror(sheet, 'A1:C300', block_rows=100)
+    sheet.getCellByPosition(1, 250).setString('edited')
+    assert m._stale == {2}
+    assert m[250, 1] == 'edited'
+    m[0, 0] = 'own write'
+    m.flush()
+    assert m._stale == set(), 'flushed cells must not mark the mirror stale'
+    m.close()
+
+    # only written cells go back, formulas and cells changed in the office stay
+    sheet.getCellByPosition(2, 10).setFormula('=B11*2')
+    m = data.mirror(sheet, 'A1:C300', listen=False)
+    sheet._store(0, 11, 'office')
+    m[10, 1] = 'x'
+    m[11, 1] = 'y'
+    m[11, 2] = 'z'
+    before = m.flushes
+    m.flush()
+    assert sheet.getCellByPosition(2, 10).getFormula() == '=B11*2'
+    assert data.read(sheet, 'A11:C12') == [('row10', 'x', 0.0), ('office', 'y', 'z')]
+    assert m.flushes - before == 2, 'dirty cells are written as two rectangles'
+
+
+def _pipe_of(ctx, wait=0.0):
+    time.sleep(wait)
+    return ctx._office.pipe
+
+
+@check
+def pool():
+    office, u = fresh()
+    with _TempDir() as tmp:
+        template = os.path.join(tmp, 'template')
+        with u.Office.launch(office.soffice, template, timeout=10) as first, \
+                u.Office.launch(office.soffice, template, timeout=10) as second:
+            assert os.path.isdir(os.path.join(template, 'user'))
+            assert first.ctx._office is not second.ctx._office, 'every launch starts its own office'
+            with u.OfficePool(2, office.soffice, startup_timeout=10, template=template) as a, \
+                    u.OfficePool(2, office.soffice, startup_timeout=10, template=template) as b:
+                pipes_a = set(a.map(lambda ctx, i: _pipe_of(ctx, 0.1), range(4)))
+                pipes_b = set(b.map(lambda ctx, i: _pipe_of(ctx, 0.1), range(4)))
+                assert len(pipes_a) == 2 and len(pipes_b) == 2 and not pipes_a & pipes_b, (pipes_a, pipes_b)
+                launched = {first.ctx._office.pipe, second.ctx._office.pipe}
+                assert not launched & (pipes_a | pipes_b), 'pools must not share the launched offices'
+                b.close()
+                assert set(a.map(lambda ctx, i: _pipe_of(ctx, 0.1), range(2))) == pipes_a, \
+                    'closing one pool keeps the offices of the other'
+
+                # a killed worker is started again for the next job
+                worker = a._workers[0]
+                worker.process.kill()
+                worker.process.wait()
+                assert len(set(a.map(lambda ctx, i: _pipe_of(ctx, 0.1), range(4)))) == 2
+                assert a.restarts == 1 and worker.isAlive()
+            second.shutdown()
+            assert first.getDesktop().getCurrentComponent() is not None, 'shutdown of one office keeps the other'
+            assert first._worker.isAlive()
+        assert os.listdir(unofake._pipe_dir) == ['soffice'], 'all office processes have exited'
+
+
+def _profile_exists(ctx, path, wait):
+    time.sleep(wait)
+    return os.path.isdir(path)
+
+
+@check
+def pool_close():
+    office, u = fresh()
+    pool = u.OfficePool(1, office.soffice, startup_timeout=10)
+    profile = pool._workers[0].profile
+    jobs = [pool.submit(_profile_exists, profile, 0.2) for _ in range(2)]
+    pool.close(wait=False)
+    assert os.path.isdir(pool._base_dir), 'queued jobs still need the profiles'
+    assert [job.result() for job in jobs] == [True, True]
+    for t in pool._threads:
+        t.join()
+    assert not os.path.exists(pool._base_dir), 'the last worker removes the profiles'
+
+
+@check
+def profile_template():
+    office, u = fresh()
+    assert not u._PROFILE_TEMPLATE.startswith(tempfile.gettempdir()), 'the default template is private to the user'
+    with _TempDir() as tmp:
+        template = os.path.join(tmp, 'cache', 'profile')
+        errors = []
+
+        def prepare():
+            try:
+                u.prepareProfile(template, office.soffice, 10)
+            except Exception as e:
+                errors.append(e)
+        threads = [threading.Thread(target=prepare) for _ in range(3)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert not errors, errors
+        assert os.listdir(os.path.dirname(template)) == ['profile'], 'temporary directories are removed'
+        assert os.listdir(template) == ['user']
+
+
+@check
+def document_cache():
+    office, u = fresh(rows=3)
+    with _TempDir() as tmp, u.Office.launch(office.soffice, None, timeout=10) as first, \
+            u.Office.launch(office.soffice, None, timeout=10) as second:
+        path = _touch(os.path.join(tmp, 'doc.ods'))
+        doc_a = first.open_document(path)
+        doc_b = second.open_document(path)
+        assert doc_a is not doc_b and doc_b._office is second.ctx._office
+        assert first.open_document(path) is doc_a and second.open_document(path) is doc_b, \
+            'offices must not close the documents of each other'
+        stats = u.getDocumentCacheStats()
+        assert (stats['hits'], stats['misses'], stats['reloads'], stats['documents']) == (2, 2, 0, 2), stats
+        u.clearDocumentCache(path)
+        assert u.getDocumentCacheStats()['documents'] == 0
+
+
+@check
+def inspect_values():
+    office, u = fresh()
+    insp = u.Inspector()
+    model = unofake.ControlModel(office, 'Edit')
+    model._props.update(Name='name', Label='label', Width=3)
+    for item in (None, ['Width', 'Name', 'Label']):
+        office.reset()
+        result = insp.inspect(model, item=item)
+        assert [result[n]['repr'] for n in ('Width', 'Name', 'Label')] == ['3', 'name', 'label']
+        assert office.members.get('getPropertyValues') == 1 and 'getPropertyValue' not in office.members, \
+            'values are read with one sorted getPropertyValues call'
+    assert isinstance(result, dict) and isinstance(result['Name'], dict)
+    assert json.loads(json.dumps(result))['Name'] == {'type': result['Name']['type'], 'repr': 'name'}
+    names = insp.inspect(model, values=False)
+    assert json.loads(json.dumps(names))['Name'] == {'type': names['Name'].type}
+
+
+@check
+def pool_connects():
+    office, u = fresh()
+    with _TempDir() as tmp:
+        misses = u.getConnectionStats()['misses']
+        # the first start sets up the profile, the worker polls until the office listens
+        with u.OfficePool(2, office.soffice, startup_timeout=10, profile_dir=tmp) as pool:
+            assert list(pool.map(lambda ctx, i: i, range(2))) == [0, 1]
+            assert u.getConnectionStats()['misses'] == misses + 2, 'one miss per started worker'
+
+
+@check
+def connection_locks():
+    office, u = fresh(connect_latency=0.3)
+    slow, cached = 'uno:socket,host=slow,port=2002;urp;', 'uno:socket,host=cached,port=2002;urp;'
+    u._connections.get(cached)
+    connects = office.connects
+    threads = [threading.Thread(target=u._connections.get, args=(slow,)) for i in range(2)]
+    for t in threads:
+        t.start()
+    time.sleep(0.05)
+    start = time.perf_counter()
+    assert u._connections.get(cached) is not None
+    u.getConnectionStats()
+    assert time.perf_counter() - start < 0.15, 'a connect in progress blocks other urls'
+    for t in threads:
+        t.join()
+    assert office.connects == connects + 1, 'concurrent callers for one url connect once'
+    u._connections.discard(slow)
+    u._connections.discard(cached)
+
+
+_IMPORTS = """
+import sys
+import unofake
+unofake.install()
+before = set(sys.modules)
+import {0}unostarter as u
+{1}
+print(' '.join(sorted(set(sys.modules) - before)))
+"""
+
+
+@check
+def imports():
+    office, u = fresh()
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([os.path.dirname(os.path.abspath(__file__)), PYTHONPATH]))
+    loaded = subprocess.check_output([sys.executable, '-c', _IMPORTS.format('', '')], env=env, text=True).split()
+    eager = {'array', 'csv', 'html', 'queue', 'struct', 'subprocess'} & set(loaded)
+    assert not eager, 'only needed by the pool, conversion and export paths: {}'.format(eager)
+
+    # the modules find each other in a package whose name contains a module name
+    with _TempDir() as tmp:
+        package = os.path.join(tmp, 'unogui_tools')
+        os.makedirs(package)
+        _touch(os.path.join(package, '__init__.py'), '')
+        for name in ('unostarter', 'unogui', 'unoinspect', 'unoapi'):
+            shutil.copy(os.path.join(PYTHONPATH, name + '.py'), package)
+        env['PYTHONPATH'] += os.pathsep + tmp
+        loaded = subprocess.check_output([sys.executable, '-c', _IMPORTS.format('unogui_tools.', 'u.Gui, u.Inspector, u._submodule("unoapi")')], env=env,
+                                         text=True).split()
+        assert {'unogui_tools.unogui', 'unogui_tools.unoinspect', 'unogui_tools.unoapi'} <= set(loaded), loaded
+        assert not {'unostarter', 'unogui', 'unoapi'} & set(loaded), loaded
+
+
+@check
+def tracer_sites():
+    office, u = fresh()
+    import unogui
+    unogui._dialogs.clear()
+    with u.tracing() as tracer:
+        u.Gui.TextBox('name', 'Text', 'x')
+        insp = u.Inspector()
+        insp.inspect(insp.desktop.getCurrentComponent().Sheets.getByIndex(0))
+    sites = {r['site'].split(':')[0] for r in tracer.summary(top=None)}
+    assert sites == {'unocheck.py'}, 'calls are reported where user code made them, not {}'.format(sites)
+    unogui._dialogs.clear()
+
+
+@check
+def tracer_proxies():
+    office, u = fresh()
+    insp = u.Inspector()
+    with u.tracing() as tracer:
+        sheets = u.Office().getDocument().Sheets
+        assert len(sheets) == 2 and 'Sheet2' in sheets and 'Other' not in sheets
+        assert sheets[1] == sheets['Sheet2'] and isinstance(sheets[1], u._TracedObject)
+        assert [sheet.Name for sheet in sheets] == ['Sheet1', 'Sheet2']
+        # proxies passed to objects created before tracing started
+        assert 'Name' in insp.inspect(sheets[0])
+        u._invoke(insp.introspection, 'inspect', (sheets[0],))
+    members = {r['member'] for r in tracer.summary(top=None)}
+    assert {'__len__', '__contains__', '__getitem__', '__iter__'} <= members, members
+
+
+@check
+def dialog_calls():
+    office, u = fresh()
+    import unogui
+    for cls in (unogui.SelectBoxClass, unogui.OptionBoxClass, unogui.TextBoxClass, unogui.NumberBoxClass,
+                unogui.DateBoxClass, unogui.MessageBoxWizardClass):
+        made = {}
+        # the stand-in counts bridge calls itself, tracing has to count the same
+        # with the connection already cached
+        cls().dispose()
+        for batched in (True, False):
+            built = cls if batched else type(cls.__name__, (cls,), {'batchProperties': False})
+            before = office.calls
+            app = built()
+            made[batched] = office.calls - before
+            app.dispose()
+            with u.tracing() as tracer:
+                app = built()
+            counted = tracer.calls
+            app.dispose()
+            assert counted == made[batched], '{}: {} counted, {} made'.format(cls.__name__, counted, made[batched])
+        assert made[True] < made[False], '{} sets properties one by one'.format(cls.__name__)
+    app = unogui.SearchBoxClass('pick', 'Search', ['a', 'b'])
+    assert app.lbChoices is app.DialogModel.getByName('lbChoices'), 'addControls sets the control attributes'
+    app.dispose()
+
+
+@check
+def dialog_pool():
+    office, u = fresh()
+    import unogui
+    unogui._dialogs.clear()
+    boxes = [(u.Gui.SelectBox, unogui.SelectBoxClass, ('pick', 'Select', ['a', 'b'])),
+             (u.Gui.OptionBox, unogui.OptionBoxClass, ('pick', 'Options', ['a', 'b', 'c'])),
+             (u.Gui.TextBox, unogui.TextBoxClass, ('name', 'Text', 'x')),
+             (u.Gui.NumberBox, unogui.NumberBoxClass, ('count', 'Number', 3)),
+             (u.Gui.DateBox, unogui.DateBoxClass, ('day', 'Date'))]
+    for box, cls, args in boxes:
+        box(*args)
+        app = unogui._dialogs._idle[cls][0]
+        box(*args)
+        assert unogui._dialogs._idle[cls] == [app], '{} is built again instead of reused'.format(cls.__name__)
+    option = unogui._dialogs._idle[unogui.OptionBoxClass][0]
+    option.setSelectedPos([0, 2])
+    u.Gui.OptionBox('again', 'Options', ['x', 'y'])
+    assert unogui._dialogs._idle[unogui.OptionBoxClass] == [option] and option.getSelectedPos() == ()
+    for i in range(3):
+        unogui._dialogs.clear()
+        u.Gui.TextBox('name', 'Text', 'x')
+    desktop = u.ConnectOffice().getValueByName('/singletons/com.sun.star.frame.theDesktop')
+    listeners = [l for l in desktop._listeners if isinstance(l, unogui._DialogTerminateListener)]
+    assert len(listeners) == 1, 'clear() must keep the terminate listener registration'
+    listening = len(unogui._dialogs._listening)
+    desktop.terminate()
+    assert not unogui._dialogs._idle and len(unogui._dialogs._listening) == listening - 1, \
+        'a terminated office is forgotten'
+
+
+@check
+def async_cancel():
+    office, u = fresh(latency=0.005)
+    import unogui
+    unogui._dialogs.clear()
+
+    async def cancel(delay):
+        task = asyncio.ensure_future(u.Gui.aio.OptionBox('pick', 'Options', ['a', 'b']))
+        await asyncio.sleep(delay)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            return
+        raise AssertionError('OptionBox was not cancelled')
+
+    # cancelled while the dialog is built, then while it is shown
+    for delay in (0.01, 1.0):
+        asyncio.run(cancel(delay))
+        idle = unogui._dialogs._idle.get(unogui.OptionBoxClass)
+        assert idle and len(idle) == 1, 'a cancelled dialog goes back to the pool'
+        assert not idle[0].DialogContainer._visible and idle[0]._onClose is None
+    unogui._dialogs.clear()
+
+
+def run(names=None):
+    failed = []
+    for func in CHECKS:
+        if names and func.__name__ not in names:
+            continue
+        try:
+            func()
+        except Exception:
+            failed.append(func.__name__)
+            print('FAIL ' + func.__name__)
+            traceback.print_exc()
+        else:
+            print('ok   ' + func.__name__)
+    return failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('names', nargs='*', help='checks to run: ' + ', '.join(f.__name__ for f in CHECKS))
+    args = parser.parse_args(argv)
+    return 1 if run(args.names) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
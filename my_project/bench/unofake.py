@@ -0,0 +1,1435 @@
+# -*- coding: utf-8 -*-
+#!/usr/bin/env python
+
+# unostarter is helper for LibreOffice macro development
+# Copyright (C) 2017  Sasa Kelecevic
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301  USA
+
+"""Stand-in UNO runtime for running unostarter without LibreOffice
+
+install() registers fake uno, unohelper and com.sun.star.* modules.
+It must be called before unostarter is imported. The fake office
+imitates the service manager, desktop, Calc and Writer documents, dialog
+models and introspection used by unostarter. Every call on a remote object counts
+as one bridge round trip and waits the configured latency.
+
+Usage:
+import unofake
+office = unofake.install(latency=0.0002)
+import unostarter
+...
+print(office.calls)
+
+Offices started by unostarter (Office.launch, OfficePool) run the
+executable in office.soffice, a small process which serves its pipe
+until the fake desktop is terminated.
+"""
+
+import atexit
+import importlib.abc
+import importlib.machinery
+import inspect
+import os
+import re
+import shutil
+import sys
+import tempfile
+import time
+import types
+import urllib.parse
+import urllib.request
+
+__all__ = ['install', 'FakeOffice']
+
+# constants imported by unostarter, everything else defaults to 0
+_CONSTANTS = {
+    'com.sun.star.awt.MessageBoxType': {'MESSAGEBOX': 0, 'INFOBOX': 1, 'WARNINGBOX': 2, 'ERRORBOX': 3, 'QUERYBOX': 4},
+    'com.sun.star.awt.MessageBoxButtons': {
+        'BUTTONS_OK': 1, 'BUTTONS_OK_CANCEL': 2, 'BUTTONS_YES_NO': 3, 'BUTTONS_YES_NO_CANCEL': 4,
+        'BUTTONS_RETRY_CANCEL': 5, 'BUTTONS_ABORT_IGNORE_RETRY': 6,
+        'DEFAULT_BUTTON_OK': 65536, 'DEFAULT_BUTTON_CANCEL': 131072, 'DEFAULT_BUTTON_RETRY': 196608,
+        'DEFAULT_BUTTON_YES': 262144, 'DEFAULT_BUTTON_NO': 327680, 'DEFAULT_BUTTON_IGNORE': 393216},
+    'com.sun.star.beans.MethodConcept': {'ALL': -1},
+    'com.sun.star.beans.PropertyConcept': {'ALL': -1},
+    'com.sun.star.reflection.ParamMode': {'IN': 'IN', 'OUT': 'OUT', 'INOUT': 'INOUT'},
+    'com.sun.star.text.ControlCharacter': {'PARAGRAPH_BREAK': 0},
+}
+
+_office = None
+# directory of pipe files, one per running office process
+_pipe_dir = None
+# fake offices behind the pipes, by pipe name
+_pipe_offices = {}
+# seconds a process needs to start with a new and an initialised profile
+_FIRST_START = 0.3
+_START = 0.05
+
+
+# -----------------------------------------------------------
+#               FAKE MODULES
+# -----------------------------------------------------------
+
+class _UnoException(Exception):
+    def __init__(self, Message='', Context=None):
+        Exception.__init__(self, Message)
+        self.Message = Message
+        self.Context = Context
+
+
+def _module_getattr(module):
+    cache = {}
+    constants = _CONSTANTS.get(module.__name__, {})
+
+    def __getattr__(name):
+        if name.startswith('__'):
+            raise AttributeError(name)
+        if name not in cache:
+            if name in constants:
+                cache[name] = constants[name]
+            elif name.endswith('Exception'):
+                cache[name] = type(name, (_UnoException,), {'__module__': module.__name__})
+            elif name[:1] == 'X' and name[1:2].isupper():
+                cache[name] = type(name, (object,), {'__module__': module.__name__})
+            else:
+                cache[name] = 0
+        return cache[name]
+    return __getattr__
+
+
+class _ComFinder(importlib.abc.MetaPathFinder, importlib.abc.Loader):
+    """Create com.sun.star.* modules on import"""
+    def find_spec(self, fullname, path, target=None):
+        if fullname == 'com' or fullname.startswith('com.'):
+            return importlib.machinery.ModuleSpec(fullname, self, is_package=True)
+        return None
+
+    def create_module(self, spec):
+        return None
+
+    def exec_module(self, module):
+        module.__path__ = []
+        module.__getattr__ = _module_getattr(module)
+
+
+class Any:
+    def __init__(self, typeName, value):
+        self.typeName = typeName
+        self.value = value
+
+
+class Enum:
+    def __init__(self, typeName, value):
+        self.typeName = typeName
+        self.value = value
+
+    def __eq__(self, other):
+        return isinstance(other, Enum) and (self.typeName, self.value) == (other.typeName, other.value)
+
+    def __hash__(self):
+        return hash((self.typeName, self.value))
+
+
+class ByteSequence:
+    def __init__(self, value):
+        self.value = bytes(value)
+
+
+class _Struct:
+    def __init__(self, typeName, **kwargs):
+        self.typeName = typeName
+        self.__dict__.update(kwargs)
+
+    def __repr__(self):
+        fields = ', '.join('{} = {!r}'.format(k, v) for k, v in self.__dict__.items() if k != 'typeName')
+        return '({}){{ {} }}'.format(self.typeName, fields)
+
+
+def _plain(value):
+    return value.value if isinstance(value, Any) else value
+
+
+def _invoke(obj, method, args):
+    # typed values are passed on, fake objects unwrap them with _plain
+    _checkConvertible(args)
+    return getattr(obj, method)(*args)
+
+
+def _make_uno_module():
+    m = types.ModuleType('uno')
+    m.getComponentContext = lambda: _office.local
+    m.systemPathToFileUrl = lambda path: 'file://' + urllib.request.pathname2url(path)
+    m.fileUrlToSystemPath = lambda url: urllib.request.url2pathname(urllib.parse.urlparse(url).path)
+    m.createUnoStruct = lambda name, *args: _Struct(name, Name='', Value=None)
+    m.invoke = _invoke
+    m.Any = Any
+    m.Enum = Enum
+    m.ByteSequence = ByteSequence
+    m.getTypeByName = lambda name: _Type(name)
+    return m
+
+
+class _Base(object):
+    """unohelper.Base, Python objects which implement UNO interfaces"""
+
+
+def _make_unohelper_module():
+    m = types.ModuleType('unohelper')
+
+    m.Base = _Base
+    m.systemPathToFileUrl = lambda path: 'file://' + urllib.request.pathname2url(path)
+    return m
+
+
+def _exception(module, name):
+    return getattr(importlib.import_module(module), name)
+
+
+# -----------------------------------------------------------
+#               FAKE OFFICE
+# -----------------------------------------------------------
+
+class FakeOffice:
+    """State of the fake office: latency, round trip counter, live objects
+    """
+    def __init__(self, latency=0.0, connect_latency=0.02, rows=1000, columns=5, pipe=None):
+        """
+        :param latency: seconds waited per bridge call
+        :param connect_latency: seconds waited per connect
+        :param rows: rows of the generated data on Sheet1
+        :param columns: columns of the generated data on Sheet1
+        :param pipe: name of the pipe served by an office process, None for the office in this process
+        """
+        self.pipe = pipe
+        self.soffice = None
+        self.latency = latency
+        self.connect_latency = connect_latency
+        self.running = True
+        self.calls = 0
+        self.connects = 0
+        self.members = {}
+        self.rows = rows
+        self.columns = columns
+        self.local = Context(None)
+        self.start()
+
+    def start(self):
+        """(Re)start the office, objects of the previous run are disposed"""
+        self.generation = _Generation()
+        self.remote = Context(self)
+        self.desktop = Desktop(self)
+        self.desktop._current = SpreadsheetDocument(self, rows=self.rows, columns=self.columns)
+        self.running = True
+
+    def stop(self):
+        self.generation.disposed = True
+        self.running = False
+        if self.pipe is not None:
+            # the process exits when its pipe file is gone
+            try:
+                os.remove(os.path.join(_pipe_dir, self.pipe))
+            except OSError:
+                pass
+
+    def restart(self):
+        self.stop()
+        self.start()
+
+    def reset(self):
+        """Clear the counters"""
+        self.calls = 0
+        self.connects = 0
+        self.members.clear()
+
+    def roundtrip(self, obj, member):
+        if self.pipe is not None and self.running and not _pipeServed(self.pipe):
+            # the process was killed
+            self.stop()
+        if obj._generation.disposed:
+            raise _exception('com.sun.star.lang', 'DisposedException')("Office is gone", None)
+        self.calls += 1
+        self.members[member] = self.members.get(member, 0) + 1
+        if self.latency:
+            end = time.perf_counter() + self.latency
+            while time.perf_counter() < end:
+                pass
+
+
+class _Generation:
+    def __init__(self):
+        self.disposed = False
+
+
+_PLAIN_TYPES = (str, int, float, bool, bytes, type(None))
+
+
+def _checkConvertible(value):
+    """Raise like pyuno for values which have no UNO type, such as Python proxies"""
+    if isinstance(value, (tuple, list)):
+        for v in value:
+            _checkConvertible(v)
+    elif not isinstance(value, _PLAIN_TYPES + (pyuno, _Struct, Any, Enum, ByteSequence, _Type, _Base)):
+        raise _exception('com.sun.star.uno', 'RuntimeException')(
+            "Couldn't convert {!r} to a UNO type".format(value), None)
+
+
+def _remote(func):
+    """Count a method as one bridge round trip"""
+    name = func.__name__
+
+    def call(self, *args):
+        if self._office is not None:
+            self._office.roundtrip(self, name)
+        for arg in args:
+            _checkConvertible(arg)
+        return func(self, *args)
+    call.__name__ = name
+    call.__wrapped__ = func
+    return call
+
+
+class _Type:
+    def __init__(self, typeName):
+        self.typeName = typeName
+
+    def __str__(self):
+        return "<Type instance {} (<uno.Enum com.sun.star.uno.TypeClass ('STRING')>)>".format(self.typeName)
+
+
+def _type_of(value):
+    if isinstance(value, bool):
+        return 'boolean'
+    if isinstance(value, int):
+        return 'long'
+    if isinstance(value, float):
+        return 'double'
+    if isinstance(value, str):
+        return 'string'
+    if isinstance(value, tuple):
+        return '[]any'
+    if isinstance(value, pyuno):
+        return 'com.sun.star.uno.XInterface'
+    return 'any'
+
+
+class pyuno(object):
+    """Base of all fake UNO objects, class name matches the real pyuno type
+    """
+    _impl = 'fake.Object'
+    _services = ()
+    _interfaces = ('com.sun.star.uno.XInterface', 'com.sun.star.lang.XServiceInfo', 'com.sun.star.lang.XTypeProvider')
+
+    def __init__(self, office, **props):
+        object.__setattr__(self, '_office', office)
+        object.__setattr__(self, '_generation', office.generation if office is not None else _Generation())
+        object.__setattr__(self, '_props', dict(props))
+
+    def __getattr__(self, name):
+        if name[:1].isupper():
+            if self._office is not None:
+                self._office.roundtrip(self, name)
+            if name in self._props:
+                return self._props[name]
+        raise AttributeError(name)
+
+    def __setattr__(self, name, value):
+        if name[:1].isupper():
+            if self._office is not None:
+                self._office.roundtrip(self, name)
+            self._props[name] = _plain(value)
+        else:
+            object.__setattr__(self, name, value)
+
+    def __repr__(self):
+        return 'pyuno object ({})0x{:x}'.format(self._impl, id(self))
+
+    @_remote
+    def getImplementationName(self):
+        return self._impl
+
+    @_remote
+    def getSupportedServiceNames(self):
+        return self._services
+
+    @_remote
+    def supportsService(self, name):
+        return name in self._services
+
+    @_remote
+    def getTypes(self):
+        return tuple(_Type(name) for name in self._interfaces)
+
+    @_remote
+    def getPropertyValue(self, name):
+        try:
+            return self._props[name]
+        except KeyError:
+            raise _exception('com.sun.star.beans', 'UnknownPropertyException')(name, self)
+
+    @_remote
+    def setPropertyValue(self, name, value):
+        self._props[name] = _plain(value)
+
+    @_remote
+    def getPropertyValues(self, names):
+        if list(names) != sorted(names):
+            # the office returns void for unsorted names, fail loudly instead
+            raise _exception('com.sun.star.lang', 'IllegalArgumentException')("names must be sorted", self)
+        return tuple(self._props.get(name) for name in names)
+
+    @_remote
+    def setPropertyValues(self, names, values):
+        for name, value in zip(names, _plain(values)):
+            self._props[name] = _plain(value)
+
+    @_remote
+    def dispose(self):
+        pass
+
+
+class Context(pyuno):
+    _impl = 'fake.ComponentContext'
+
+    def __init__(self, office):
+        pyuno.__init__(self, office)
+        self._props['ServiceManager'] = ServiceManager(office, self)
+
+    @_remote
+    def getServiceManager(self):
+        return self._props['ServiceManager']
+
+    @_remote
+    def getValueByName(self, name):
+        office = self._office or _office
+        singletons = {
+            '/singletons/com.sun.star.frame.theDesktop': lambda: office.desktop,
+            '/singletons/com.sun.star.beans.theIntrospection': lambda: Introspection(office),
+            '/singletons/com.sun.star.reflection.theCoreReflection': lambda: pyuno(office),
+            '/singletons/com.sun.star.util.theServiceDocumenter': lambda: pyuno(office),
+        }
+        return singletons.get(name, lambda: None)()
+
+
+class ServiceManager(pyuno):
+    _impl = 'fake.ServiceManager'
+
+    def __init__(self, office, ctx):
+        pyuno.__init__(self, office)
+        object.__setattr__(self, '_ctx', ctx)
+
+    def _create(self, name, args=()):
+        office = self._office
+        if name == 'com.sun.star.bridge.UnoUrlResolver':
+            return UrlResolver(office)
+        if name == 'com.sun.star.awt.UnoControlDialog':
+            return Dialog(office)
+        if name == 'com.sun.star.awt.UnoControlDialogModel':
+            return DialogModel(office)
+        if name in ('com.sun.star.awt.Toolkit', 'com.sun.star.awt.ExtToolkit'):
+            return Toolkit(office)
+        return pyuno(office)
+
+    @_remote
+    def createInstance(self, name):
+        return self._create(name)
+
+    @_remote
+    def createInstanceWithContext(self, name, ctx):
+        return self._create(name)
+
+    @_remote
+    def createInstanceWithArguments(self, name, args):
+        return self._create(name, args)
+
+    @_remote
+    def createInstanceWithArgumentsAndContext(self, name, args, ctx):
+        return self._create(name, args)
+
+
+class UrlResolver(pyuno):
+    _impl = 'fake.UnoUrlResolver'
+
+    @_remote
+    def resolve(self, url):
+        office = _office
+        pipe = re.search('pipe,name=([^;]+)', url)
+        if pipe is not None:
+            office = _pipeOffice(pipe.group(1), _office)
+        if office is None or not office.running:
+            raise _exception('com.sun.star.connection', 'NoConnectException')("Connector : couldn't connect", None)
+        office.connects += 1
+        time.sleep(office.connect_latency)
+        return office.remote
+
+
+# ---------- awt ----------
+
+_MODEL_DEFAULTS = {
+    'ComboBox': {'Text': '', 'StringItemList': (), 'Dropdown': False},
+    'ListBox': {'StringItemList': (), 'SelectedItems': (), 'MultiSelection': False},
+    'Edit': {'Text': ''},
+    'NumericField': {'Value': 0.0, 'ValueMin': -1000000.0, 'ValueMax': 1000000.0, 'DecimalAccuracy': 2},
+    'DateField': {'Date': None, 'Text': ''},
+}
+
+
+# sequence properties which setPropertyValue(s) only accepts as a uno.Any of this type
+_SEQUENCE_PROPERTIES = {'SelectedItems': '[]short', 'StringItemList': '[]string'}
+
+
+class ControlModel(pyuno):
+    _impl = 'fake.UnoControlModel'
+
+    def __init__(self, office, kind):
+        props = {'Name': '', 'PositionX': 0, 'PositionY': 0, 'Width': 0, 'Height': 0, 'Label': ''}
+        props.update(_MODEL_DEFAULTS.get(kind, {}))
+        pyuno.__init__(self, office, **props)
+        object.__setattr__(self, '_kind', kind)
+
+    def _check(self, name, value):
+        # a plain tuple arrives as []any, sequence properties need a typed value
+        if name in _SEQUENCE_PROPERTIES and not (isinstance(value, Any) and value.typeName == _SEQUENCE_PROPERTIES[name]):
+            raise _exception('com.sun.star.lang', 'IllegalArgumentException')(
+                "{} needs {}".format(name, _SEQUENCE_PROPERTIES[name]), self)
+
+    @_remote
+    def setPropertyValue(self, name, value):
+        self._check(name, value)
+        self._props[name] = _plain(value)
+
+    @_remote
+    def setPropertyValues(self, names, values):
+        for name, value in zip(names, values):
+            self._check(name, value)
+        for name, value in zip(names, values):
+            self._props[name] = _plain(value)
+
+
+class DialogModel(pyuno):
+    _impl = 'fake.UnoControlDialogModel'
+
+    def __init__(self, office):
+        pyuno.__init__(self, office, Title='', Name='', PositionX=0, PositionY=0, Width=0, Height=0,
+                       Closeable=False, Moveable=False)
+        object.__setattr__(self, '_controls', {})
+
+    @_remote
+    def createInstance(self, name):
+        kind = re.sub(r'^com\.sun\.star\.awt\.UnoControl(.*)Model$', r'\1', name)
+        return ControlModel(self._office, kind)
+
+    @_remote
+    def insertByName(self, name, model):
+        self._controls[name] = model
+
+    @_remote
+    def removeByName(self, name):
+        del self._controls[name]
+
+    @_remote
+    def getByName(self, name):
+        return self._controls[name]
+
+    @_remote
+    def hasByName(self, name):
+        return name in self._controls
+
+    @_remote
+    def getElementNames(self):
+        return tuple(self._controls)
+
+
+class Control(pyuno):
+    _impl = 'fake.UnoControl'
+
+    def __init__(self, office, model):
+        pyuno.__init__(self, office)
+        object.__setattr__(self, '_model', model)
+        object.__setattr__(self, '_listeners', [])
+
+    def _items(self):
+        return self._model._props.get('StringItemList', ())
+
+    @_remote
+    def getModel(self):
+        return self._model
+
+    @_remote
+    def addActionListener(self, listener):
+        self._listeners.append(listener)
+
+    @_remote
+    def setActionCommand(self, command):
+        self._model._props['ActionCommand'] = command
+
+    @_remote
+    def addTextListener(self, listener):
+        self._listeners.append(listener)
+
+    @_remote
+    def addItemListener(self, listener):
+        self._listeners.append(listener)
+
+    @_remote
+    def selectItem(self, item, select):
+        items = self._items()
+        if item in items:
+            self._select((items.index(item),), select)
+
+    @_remote
+    def selectItemsPos(self, positions, select):
+        self._select(positions, select)
+
+    def _select(self, positions, select):
+        selected = set(self._model._props.get('SelectedItems', ()))
+        if select:
+            selected.update(positions)
+        else:
+            selected.difference_update(positions)
+        self._model._props['SelectedItems'] = tuple(sorted(selected))
+
+    @_remote
+    def getSelectedItemsPos(self):
+        return self._model._props.get('SelectedItems', ())
+
+    @_remote
+    def getSelectedItems(self):
+        items = self._items()
+        return tuple(items[i] for i in self._model._props.get('SelectedItems', ()))
+
+    @_remote
+    def getSelectedItem(self):
+        selected = self.getSelectedItems.__wrapped__(self)
+        return selected[0] if selected else ''
+
+
+class Dialog(pyuno):
+    _impl = 'fake.UnoControlDialog'
+
+    def __init__(self, office):
+        pyuno.__init__(self, office)
+        object.__setattr__(self, '_model', None)
+        object.__setattr__(self, '_controls', {})
+        object.__setattr__(self, '_visible', False)
+
+    @_remote
+    def setModel(self, model):
+        object.__setattr__(self, '_model', model)
+
+    @_remote
+    def getModel(self):
+        return self._model
+
+    @_remote
+    def getControl(self, name):
+        if name not in self._controls:
+            self._controls[name] = Control(self._office, self._model._controls[name])
+        return self._controls[name]
+
+    @_remote
+    def setVisible(self, visible):
+        object.__setattr__(self, '_visible', visible)
+
+    @_remote
+    def createPeer(self, toolkit, parent):
+        pass
+
+    @_remote
+    def execute(self):
+        return 0
+
+    @_remote
+    def endExecute(self):
+        pass
+
+    @_remote
+    def addTopWindowListener(self, listener):
+        pass
+
+
+class MessageBox(pyuno):
+    _impl = 'fake.MessageBox'
+
+    @_remote
+    def execute(self):
+        return 1
+
+
+class Toolkit(pyuno):
+    _impl = 'fake.Toolkit'
+
+    @_remote
+    def createMessageBox(self, parent, messageType, buttons, title, message):
+        return MessageBox(self._office)
+
+
+# ---------- documents ----------
+
+def _column_index(letters):
+    n = 0
+    for ch in letters.upper():
+        n = n * 26 + ord(ch) - 64
+    return n - 1
+
+
+def _parse_range(name):
+    cells = []
+    for part in name.split(':'):
+        m = re.match(r'^\$?([A-Za-z]+)\$?(\d+)$', part.split('.')[-1])
+        cells.append((_column_index(m.group(1)), int(m.group(2)) - 1))
+    if len(cells) == 1:
+        cells.append(cells[0])
+    return cells[0][0], cells[0][1], cells[1][0], cells[1][1]
+
+
+class Sheet(pyuno):
+    """Sheet with generated data: column 0 text, other columns numbers"""
+    _impl = 'ScTableSheetObj'
+    _services = ('com.sun.star.sheet.Spreadsheet',)
+    _interfaces = pyuno._interfaces + ('com.sun.star.sheet.XSpreadsheet',)
+
+    def __init__(self, office, name, rows, columns):
+        pyuno.__init__(self, office, Name=name, IsVisible=True, TabColor=-1)
+        object.__setattr__(self, '_rows', rows)
+        object.__setattr__(self, '_columns', columns)
+        object.__setattr__(self, '_cells', {})
+        # formulas by cell, their computed value is kept in _cells
+        object.__setattr__(self, '_formulas', {})
+        object.__setattr__(self, '_document', None)
+        object.__setattr__(self, '_index', 0)
+
+    def _changed(self, c0, r0, c1, r1):
+        """Tell changes listeners of the document, like an edit in the office"""
+        if self._document is not None:
+            self._document._notify(CellRange(self._office, self, c0, r0, c1, r1))
+
+    def _value(self, column, row):
+        if (column, row) in self._cells:
+            return self._cells[(column, row)]
+        if row < self._rows and column < self._columns:
+            return 'row{}'.format(row) if column == 0 else float(row * self._columns + column)
+        return ''
+
+    def _store(self, column, row, value):
+        self._cells[(column, row)] = value
+        self._formulas.pop((column, row), None)
+        if value != '':
+            object.__setattr__(self, '_rows', max(self._rows, row + 1))
+            object.__setattr__(self, '_columns', max(self._columns, column + 1))
+
+    @_remote
+    def createCursor(self):
+        return SheetCursor(self._office, self)
+
+    @_remote
+    def getCellRangeByPosition(self, c0, r0, c1, r1):
+        return CellRange(self._office, self, c0, r0, c1, r1)
+
+    @_remote
+    def getCellRangeByName(self, name):
+        return CellRange(self._office, self, *_parse_range(name))
+
+    @_remote
+    def getCellByPosition(self, column, row):
+        return Cell(self._office, self, column, row)
+
+
+class SheetCursor(pyuno):
+    _impl = 'ScCellCursorObj'
+
+    def __init__(self, office, sheet):
+        pyuno.__init__(self, office)
+        object.__setattr__(self, '_sheet', sheet)
+        object.__setattr__(self, '_address', [0, 0, 0, 0])
+
+    @_remote
+    def gotoStartOfUsedArea(self, expand):
+        self._address[0:2] = [0, 0]
+
+    @_remote
+    def gotoEndOfUsedArea(self, expand):
+        self._address[2:4] = [max(0, self._sheet._columns - 1), max(0, self._sheet._rows - 1)]
+
+    @_remote
+    def getRangeAddress(self):
+        c0, r0, c1, r1 = self._address
+        return _Struct('com.sun.star.table.CellRangeAddress', Sheet=self._sheet._index, StartColumn=c0, StartRow=r0,
+                       EndColumn=c1, EndRow=r1)
+
+
+class CellRange(pyuno):
+    _impl = 'ScCellRangeObj'
+    _interfaces = pyuno._interfaces + ('com.sun.star.sheet.XCellRangeData',)
+
+    def __init__(self, office, sheet, c0, r0, c1, r1):
+        pyuno.__init__(self, office)
+        object.__setattr__(self, '_sheet', sheet)
+        object.__setattr__(self, '_address', (c0, r0, c1, r1))
+
+    @_remote
+    def getRangeAddress(self):
+        c0, r0, c1, r1 = self._address
+        return _Struct('com.sun.star.table.CellRangeAddress', Sheet=self._sheet._index, StartColumn=c0, StartRow=r0,
+                       EndColumn=c1, EndRow=r1)
+
+    @_remote
+    def getDataArray(self):
+        c0, r0, c1, r1 = self._address
+        value = self._sheet._value
+        return tuple(tuple(value(c, r) for c in range(c0, c1 + 1)) for r in range(r0, r1 + 1))
+
+    @_remote
+    def getFormulaArray(self):
+        c0, r0, c1, r1 = self._address
+        sheet = self._sheet
+        return tuple(tuple(sheet._formulas.get((c, r), str(sheet._value(c, r))) for c in range(c0, c1 + 1))
+                     for r in range(r0, r1 + 1))
+
+    @_remote
+    def setDataArray(self, rows):
+        c0, r0, c1, r1 = self._address
+        if len(rows) != r1 - r0 + 1 or any(len(row) != c1 - c0 + 1 for row in rows):
+            raise _exception('com.sun.star.uno', 'RuntimeException')("Array size does not match range", self)
+        for r, row in enumerate(rows):
+            for c, v in enumerate(row):
+                self._sheet._store(c0 + c, r0 + r, v)
+        self._sheet._changed(c0, r0, c1, r1)
+
+    setFormulaArray = setDataArray
+
+
+class Cell(pyuno):
+    _impl = 'ScCellObj'
+
+    def __init__(self, office, sheet, column, row):
+        pyuno.__init__(self, office)
+        object.__setattr__(self, '_sheet', sheet)
+        object.__setattr__(self, '_pos', (column, row))
+
+    @_remote
+    def getValue(self):
+        v = self._sheet._value(*self._pos)
+        return v if isinstance(v, float) else 0.0
+
+    @_remote
+    def getString(self):
+        return str(self._sheet._value(*self._pos))
+
+    @_remote
+    def setValue(self, value):
+        self._sheet._store(*self._pos, value=float(value))
+        self._sheet._changed(*(self._pos * 2))
+
+    @_remote
+    def setString(self, value):
+        self._sheet._store(*self._pos, value=str(value))
+        self._sheet._changed(*(self._pos * 2))
+
+    @_remote
+    def setFormula(self, formula):
+        # the stand-in does not calculate, a formula cell shows 0
+        self._sheet._store(*self._pos, value=0.0)
+        self._sheet._formulas[self._pos] = formula
+        self._sheet._changed(*(self._pos * 2))
+
+    @_remote
+    def getFormula(self):
+        return self._sheet._formulas.get(self._pos, str(self._sheet._value(*self._pos)))
+
+
+class Sheets(pyuno):
+    _impl = 'ScTableSheetsObj'
+
+    def __init__(self, office, sheets):
+        pyuno.__init__(self, office)
+        object.__setattr__(self, '_sheets', sheets)
+
+    @_remote
+    def getCount(self):
+        return len(self._sheets)
+
+    @_remote
+    def getByIndex(self, index):
+        return self._sheets[index]
+
+    @_remote
+    def getByName(self, name):
+        for sheet in self._sheets:
+            if sheet._props['Name'] == name:
+                return sheet
+        raise _exception('com.sun.star.container', 'NoSuchElementException')(name, self)
+
+    @_remote
+    def getElementNames(self):
+        return tuple(sheet._props['Name'] for sheet in self._sheets)
+
+    @_remote
+    def hasByName(self, name):
+        return any(sheet._props['Name'] == name for sheet in self._sheets)
+
+    # container protocol of pyuno, backed by the calls above
+    def __len__(self):
+        return self.getCount()
+
+    def __getitem__(self, key):
+        return self.getByName(key) if isinstance(key, str) else self.getByIndex(key)
+
+    def __contains__(self, name):
+        return self.hasByName(name)
+
+    def __iter__(self):
+        return iter([self.getByIndex(i) for i in range(self.getCount())])
+
+
+class Controller(pyuno):
+    _impl = 'ScTabViewObj'
+
+    def __init__(self, office, document):
+        pyuno.__init__(self, office)
+        object.__setattr__(self, '_document', document)
+
+    @_remote
+    def getActiveSheet(self):
+        return self._document._props['Sheets']._sheets[0]
+
+
+class UndoManager(pyuno):
+    _impl = 'fake.UndoManager'
+
+    def __init__(self, office):
+        pyuno.__init__(self, office)
+        object.__setattr__(self, '_locks', 0)
+        object.__setattr__(self, '_contexts', [])
+        # titles of closed top level undo actions
+        object.__setattr__(self, '_actions', [])
+
+    @_remote
+    def lock(self):
+        object.__setattr__(self, '_locks', self._locks + 1)
+
+    @_remote
+    def unlock(self):
+        object.__setattr__(self, '_locks', self._locks - 1)
+
+    @_remote
+    def isLocked(self):
+        return self._locks > 0
+
+    @_remote
+    def enterUndoContext(self, title):
+        self._contexts.append(title)
+
+    @_remote
+    def leaveUndoContext(self):
+        title = self._contexts.pop()
+        if not self._contexts:
+            self._actions.append(title)
+
+
+class _Model(pyuno):
+    """Methods shared by the fake documents"""
+
+    def __init__(self, office, **props):
+        pyuno.__init__(self, office, **props)
+        object.__setattr__(self, '_locks', {'controllers': 0, 'actions': 0})
+        object.__setattr__(self, '_autocalc', True)
+        object.__setattr__(self, '_undo', UndoManager(office))
+
+    @_remote
+    def getURL(self):
+        return self._props['URL']
+
+    @_remote
+    def lockControllers(self):
+        self._locks['controllers'] += 1
+
+    @_remote
+    def unlockControllers(self):
+        self._locks['controllers'] -= 1
+
+    @_remote
+    def hasControllersLocked(self):
+        return self._locks['controllers'] > 0
+
+    @_remote
+    def addActionLock(self):
+        self._locks['actions'] += 1
+
+    @_remote
+    def removeActionLock(self):
+        self._locks['actions'] -= 1
+
+    @_remote
+    def getUndoManager(self):
+        return self._undo
+
+    @_remote
+    def storeToURL(self, url, args):
+        if url.startswith('file:'):
+            with open(urllib.request.url2pathname(urllib.parse.urlparse(url).path), 'w') as f:
+                f.write(self._props['URL'])
+
+    @_remote
+    def close(self, deliver):
+        # later calls on the document raise DisposedException
+        generation = _Generation()
+        generation.disposed = True
+        object.__setattr__(self, '_generation', generation)
+
+
+class SpreadsheetDocument(_Model):
+    _impl = 'ScModelObj'
+    _services = ('com.sun.star.sheet.SpreadsheetDocument', 'com.sun.star.document.OfficeDocument')
+    _interfaces = pyuno._interfaces + ('com.sun.star.frame.XModel', 'com.sun.star.sheet.XSpreadsheetDocument',
+                                       'com.sun.star.sheet.XCalculatable', 'com.sun.star.beans.XPropertySet')
+
+    def __init__(self, office, url='', rows=0, columns=0):
+        sheets = [Sheet(office, 'Sheet1', rows, columns), Sheet(office, 'Sheet2', 0, 0)]
+        _Model.__init__(self, office, Sheets=Sheets(office, sheets), Title='Untitled 1', URL=url,
+                        IsLoaded=True, AutomaticControlFocus=False, ApplyFormDesignMode=False)
+        object.__setattr__(self, '_controller', Controller(office, self))
+        object.__setattr__(self, '_changes', [])
+        for index, sheet in enumerate(sheets):
+            object.__setattr__(sheet, '_document', self)
+            object.__setattr__(sheet, '_index', index)
+
+    def _notify(self, cells):
+        change = _Struct('com.sun.star.util.ElementChange', Accessor='cell-change', Element=None, ReplacedElement=cells)
+        event = _Struct('com.sun.star.util.ChangesEvent', Source=self, Base=None, Changes=(change,))
+        for listener in list(self._changes):
+            listener.changesOccurred(event)
+
+    @_remote
+    def addChangesListener(self, listener):
+        self._changes.append(listener)
+
+    @_remote
+    def removeChangesListener(self, listener):
+        self._changes.remove(listener)
+
+    @_remote
+    def getCurrentController(self):
+        return self._controller
+
+    @_remote
+    def getSheets(self):
+        return self._props['Sheets']
+
+    @_remote
+    def getSelection(self):
+        return self._props['Sheets']._sheets[0]
+
+    @_remote
+    def isAutomaticCalculationEnabled(self):
+        return self._autocalc
+
+    @_remote
+    def enableAutomaticCalculation(self, enable):
+        object.__setattr__(self, '_autocalc', enable)
+
+    @_remote
+    def calculateAll(self):
+        pass
+
+
+# ---------- writer ----------
+
+class TextTable(pyuno):
+    _impl = 'SwXTextTable'
+
+    def __init__(self, office):
+        pyuno.__init__(self, office)
+        object.__setattr__(self, '_data', ())
+
+    @_remote
+    def initialize(self, rows, columns):
+        object.__setattr__(self, '_data', tuple(('',) * columns for _ in range(rows)))
+
+    @_remote
+    def setDataArray(self, rows):
+        object.__setattr__(self, '_data', tuple(tuple(row) for row in rows))
+
+    @_remote
+    def getDataArray(self):
+        return self._data
+
+
+class TextCursor(pyuno):
+    """Cursor which always stays at the end of the text"""
+    _impl = 'SwXTextCursor'
+
+    def __init__(self, office, text):
+        pyuno.__init__(self, office)
+        object.__setattr__(self, '_text', text)
+
+    @_remote
+    def gotoEnd(self, expand):
+        pass
+
+    @_remote
+    def isStartOfParagraph(self):
+        return self._text._paragraphs[-1][1] == ''
+
+    @_remote
+    def isEndOfParagraph(self):
+        return True
+
+    @_remote
+    def setPropertyValue(self, name, value):
+        if name == 'ParaStyleName':
+            self._text._paragraphs[-1][0] = value
+
+    @_remote
+    def insertDocumentFromURL(self, url, args):
+        self._text._paragraphs.append(['Standard', '<imported>'])
+
+
+class Text(pyuno):
+    """Text of a Writer document as a list of [style, text] paragraphs"""
+    _impl = 'SwXBodyText'
+
+    def __init__(self, office):
+        pyuno.__init__(self, office)
+        object.__setattr__(self, '_paragraphs', [['Standard', '']])
+        object.__setattr__(self, '_tables', [])
+
+    @_remote
+    def createTextCursor(self):
+        return TextCursor(self._office, self)
+
+    @_remote
+    def insertString(self, cursor, string, absorb):
+        lines = string.replace('\r', '\n').split('\n')
+        last = self._paragraphs[-1]
+        last[1] += lines[0]
+        for line in lines[1:]:
+            self._paragraphs.append([last[0], line])
+
+    @_remote
+    def insertControlCharacter(self, cursor, character, absorb):
+        self._paragraphs.append([self._paragraphs[-1][0], ''])
+
+    @_remote
+    def insertTextContent(self, cursor, content, absorb):
+        self._tables.append(content)
+        self._paragraphs.append(['Standard', ''])
+
+    @_remote
+    def getString(self):
+        return '\n'.join(text for _, text in self._paragraphs)
+
+    @_remote
+    def setString(self, string):
+        self._paragraphs[:] = [['Standard', line] for line in string.split('\n')]
+
+
+class ReplaceDescriptor(pyuno):
+    """Like SwXTextSearch: properties through XPropertySet only"""
+    _impl = 'SwXTextSearch'
+
+    def __init__(self, office):
+        pyuno.__init__(self, office, SearchRegularExpression=False, SearchCaseSensitive=False, SearchWords=False)
+        object.__setattr__(self, '_search', '')
+        object.__setattr__(self, '_replace', '')
+
+    @property
+    def setPropertyValues(self):
+        raise AttributeError('setPropertyValues')
+
+    @property
+    def getPropertyValues(self):
+        raise AttributeError('getPropertyValues')
+
+    @_remote
+    def setSearchString(self, string):
+        object.__setattr__(self, '_search', string)
+
+    @_remote
+    def getSearchString(self):
+        return self._search
+
+    @_remote
+    def setReplaceString(self, string):
+        object.__setattr__(self, '_replace', string)
+
+    @_remote
+    def getReplaceString(self):
+        return self._replace
+
+    def _pattern(self):
+        props = self._props
+        pattern = self._search if props['SearchRegularExpression'] else re.escape(self._search)
+        if props['SearchWords']:
+            pattern = r'\b' + pattern + r'\b'
+        return re.compile(pattern, 0 if props['SearchCaseSensitive'] else re.IGNORECASE)
+
+    def _replacement(self):
+        if self._props['SearchRegularExpression']:
+            # $1 in office regular expressions
+            return re.sub(r'\$(\d)', r'\\g<\1>', self._replace)
+        return lambda match: self._replace
+
+
+class FoundRanges(pyuno):
+    _impl = 'SwXTextRanges'
+
+    def __init__(self, office, count):
+        pyuno.__init__(self, office)
+        object.__setattr__(self, '_count', count)
+
+    @_remote
+    def getCount(self):
+        return self._count
+
+
+class TextDocument(_Model):
+    _impl = 'SwXTextDocument'
+    _services = ('com.sun.star.text.TextDocument', 'com.sun.star.document.OfficeDocument')
+    _interfaces = pyuno._interfaces + ('com.sun.star.frame.XModel', 'com.sun.star.text.XTextDocument')
+
+    def __init__(self, office, url=''):
+        _Model.__init__(self, office, Title='Untitled 1', URL=url, IsLoaded=True)
+        object.__setattr__(self, '_text', Text(office))
+
+    @_remote
+    def getText(self):
+        return self._text
+
+    @_remote
+    def createInstance(self, name):
+        if name == 'com.sun.star.text.TextTable':
+            return TextTable(self._office)
+        return pyuno(self._office)
+
+    @_remote
+    def createReplaceDescriptor(self):
+        return ReplaceDescriptor(self._office)
+
+    @_remote
+    def findAll(self, desc):
+        pattern = desc._pattern()
+        count = sum(len(pattern.findall(text)) for _, text in self._text._paragraphs)
+        return FoundRanges(self._office, count) if count else None
+
+    @_remote
+    def replaceAll(self, desc):
+        # regular expressions match within a paragraph, as in the office
+        pattern = desc._pattern()
+        count = 0
+        for paragraph in self._text._paragraphs:
+            paragraph[1], n = pattern.subn(desc._replacement(), paragraph[1])
+            count += n
+        return count
+
+
+_WRITER_EXTENSIONS = ('.odt', '.ott', '.doc', '.docx', '.rtf', '.txt', '.html')
+
+
+class Desktop(pyuno):
+    _impl = 'com.sun.star.comp.framework.Desktop'
+
+    def __init__(self, office):
+        pyuno.__init__(self, office)
+        object.__setattr__(self, '_current', None)
+        object.__setattr__(self, '_listeners', [])
+
+    @_remote
+    def getCurrentComponent(self):
+        return self._current
+
+    @_remote
+    def loadComponentFromURL(self, url, frame, flags, args):
+        if url == 'private:factory/swriter':
+            return TextDocument(self._office)
+        if url.startswith('file:'):
+            path = urllib.request.url2pathname(urllib.parse.urlparse(url).path)
+            if not os.path.exists(path):
+                raise _exception('com.sun.star.lang', 'IllegalArgumentException')("Unsupported URL <{}>".format(url), self)
+            if os.path.splitext(path)[1].lower() in _WRITER_EXTENSIONS:
+                return TextDocument(self._office, url=url)
+        return SpreadsheetDocument(self._office, url=url, rows=self._office.rows, columns=self._office.columns)
+
+    @_remote
+    def addTerminateListener(self, listener):
+        self._listeners.append(listener)
+
+    @_remote
+    def terminate(self):
+        for listener in self._listeners:
+            listener.notifyTermination(None)
+        self._office.stop()
+        return True
+
+
+# ---------- introspection ----------
+
+class _Method:
+    def __init__(self, name, params):
+        self.Name = name
+        self.ParameterTypes = tuple(_Struct('com.sun.star.reflection.XIdlClass', Name='any') for _ in params)
+        self.ParameterInfos = tuple(_Struct('com.sun.star.reflection.ParamInfo', aName=p, aMode='IN') for p in params)
+
+
+class IntrospectionAccess(pyuno):
+    _impl = 'fake.IntrospectionAccess'
+
+    def __init__(self, office, obj):
+        pyuno.__init__(self, office)
+        object.__setattr__(self, '_obj', obj)
+
+    @_remote
+    def getProperties(self, concept):
+        return tuple(_Struct('com.sun.star.beans.Property', Name=name, Type=_Type(_type_of(value)))
+                     for name, value in self._obj._props.items())
+
+    @_remote
+    def getMethods(self, concept):
+        methods = []
+        for name, member in inspect.getmembers(type(self._obj)):
+            func = getattr(member, '__wrapped__', None)
+            if func is None:
+                continue
+            params = list(inspect.signature(func).parameters)[1:]
+            methods.append(_Method(name, params))
+        return tuple(methods)
+
+
+class Introspection(pyuno):
+    _impl = 'fake.Introspection'
+
+    @_remote
+    def inspect(self, obj):
+        return IntrospectionAccess(self._office, obj)
+
+
+# all fake objects report the type name of real pyuno objects
+for _cls in (Context, ServiceManager, UrlResolver, ControlModel, DialogModel, Control, Dialog, MessageBox, Toolkit,
+             Sheet, SheetCursor, CellRange, Cell, Sheets, Controller, UndoManager, _Model, SpreadsheetDocument,
+             TextTable, TextCursor, Text, ReplaceDescriptor, FoundRanges, TextDocument, Desktop, IntrospectionAccess, Introspection):
+    _cls.__name__ = 'pyuno'
+
+
+# -----------------------------------------------------------
+#               INSTALL
+# -----------------------------------------------------------
+
+# ---------- office processes ----------
+
+def _pipeServed(pipe):
+    """Return True while the process of the pipe is running"""
+    try:
+        with open(os.path.join(_pipe_dir, pipe)) as f:
+            pid = int(f.read())
+        os.kill(pid, 0)
+    except (OSError, ValueError):
+        return False
+    return True
+
+
+def _pipeOffice(pipe, template):
+    """Return the fake office behind a pipe, None when no process serves it"""
+    if not _pipeServed(pipe):
+        return None
+    office = _pipe_offices.get(pipe)
+    if office is None or not office.running:
+        office = FakeOffice(template.latency, template.connect_latency, template.rows, template.columns, pipe)
+        _pipe_offices[pipe] = office
+    return office
+
+
+def _serve(argv):
+    """Main of the office process: take the pipe and wait until it is released
+
+    Understands the -env:UserInstallation and --accept arguments of soffice.
+    A profile without a user directory is set up first, which takes longer.
+    """
+    global _pipe_dir
+    profile = pipe = None
+    for arg in argv:
+        if arg.startswith('-env:UserInstallation='):
+            profile = urllib.request.url2pathname(urllib.parse.urlparse(arg.split('=', 1)[1]).path)
+        elif arg.startswith('--accept=pipe,name='):
+            pipe = arg[len('--accept=pipe,name='):].split(';')[0]
+    if profile is None or pipe is None:
+        return 2
+    user = os.path.join(profile, 'user')
+    if os.path.isdir(user):
+        time.sleep(_START)
+    else:
+        time.sleep(_FIRST_START)
+        os.makedirs(user)
+        with open(os.path.join(user, 'registrymodifications.xcu'), 'w') as f:
+            f.write('<items/>')
+    _pipe_dir = os.environ['UNOFAKE_PIPES']
+    path = os.path.join(_pipe_dir, pipe)
+    if os.path.exists(path) and not _pipeServed(pipe):
+        # left behind by a killed process
+        os.remove(path)
+    try:
+        # like the real office, a pipe name can only be taken once
+        fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+    except FileExistsError:
+        return 1
+    os.write(fd, str(os.getpid()).encode())
+    os.close(fd)
+    while os.path.exists(path):
+        time.sleep(0.02)
+    return 0
+
+
+def _removePipes():
+    if _pipe_dir is not None:
+        shutil.rmtree(_pipe_dir, ignore_errors=True)
+
+
+def _soffice():
+    """Create the pipe directory and the office executable, return its path"""
+    global _pipe_dir
+    if _pipe_dir is None:
+        _pipe_dir = tempfile.mkdtemp(prefix='unofake_')
+        os.environ['UNOFAKE_PIPES'] = _pipe_dir
+        atexit.register(_removePipes)
+    path = os.path.join(_pipe_dir, 'soffice')
+    if not os.path.exists(path):
+        with open(path, 'w') as f:
+            f.write('#!/bin/sh\nexec "{}" "{}" "$@"\n'.format(sys.executable, os.path.abspath(__file__)))
+        os.chmod(path, 0o755)
+    return path
+
+
+def install(latency=0.0, connect_latency=0.02, rows=1000, columns=5):
+    """Register the fake modules and start a fake office
+
+    :param latency: seconds waited per bridge call
+    :param connect_latency: seconds waited per connect
+    :param rows: rows of generated data on Sheet1 of the current document
+    :param columns: columns of generated data
+    Return the FakeOffice.
+    """
+    global _office
+    if not any(isinstance(f, _ComFinder) for f in sys.meta_path):
+        sys.meta_path.insert(0, _ComFinder())
+    sys.modules['uno'] = _make_uno_module()
+    sys.modules['unohelper'] = _make_unohelper_module()
+    for office in list(_pipe_offices.values()):
+        office.stop()
+    _pipe_offices.clear()
+    _office = FakeOffice(latency, connect_latency, rows, columns)
+    _office.soffice = _soffice()
+    return _office
+
+
+if __name__ == "__main__":
+    sys.exit(_serve(sys.argv[1:]))
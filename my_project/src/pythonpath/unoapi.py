@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+#!/usr/bin/env python
+
+# unostarter is helper for LibreOffice macro development
+# Copyright (C) 2017  Sasa Kelecevic
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301  USA
+
+"""Offline index of the UNO API
+
+The index is a SQLite file written once by Inspector.exportApiIndex()
+from a running office. Reading it needs neither uno nor soffice:
+
+    python unoapi.py api.db insertString
+"""
+
+import sqlite3
+
+__all__ = ['UnoApiIndex']
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS types (name TEXT PRIMARY KEY, short TEXT, kind TEXT);
+CREATE TABLE IF NOT EXISTS methods (owner TEXT, name TEXT, return_type TEXT, params TEXT);
+CREATE TABLE IF NOT EXISTS properties (owner TEXT, name TEXT, type TEXT);
+CREATE TABLE IF NOT EXISTS constants (owner TEXT, name TEXT, value TEXT);
+CREATE TABLE IF NOT EXISTS interfaces (service TEXT, interface TEXT);
+"""
+
+_INDEXES = """
+CREATE INDEX IF NOT EXISTS types_short ON types (short);
+CREATE INDEX IF NOT EXISTS methods_name ON methods (name);
+CREATE INDEX IF NOT EXISTS methods_owner ON methods (owner);
+CREATE INDEX IF NOT EXISTS properties_name ON properties (name);
+CREATE INDEX IF NOT EXISTS properties_owner ON properties (owner);
+CREATE INDEX IF NOT EXISTS constants_name ON constants (name);
+CREATE INDEX IF NOT EXISTS constants_owner ON constants (owner);
+CREATE INDEX IF NOT EXISTS interfaces_service ON interfaces (service);
+CREATE INDEX IF NOT EXISTS interfaces_interface ON interfaces (interface);
+"""
+
+_COLUMNS = {
+    'types': 3,
+    'methods': 4,
+    'properties': 3,
+    'constants': 3,
+    'interfaces': 2,
+}
+
+
+def _match(column, name, prefix):
+    """WHERE clause for exact or prefix match which can use the index"""
+    if prefix:
+        return '{0} >= ? AND {0} < ?'.format(column), (name, name + '\uffff')
+    return '{} = ?'.format(column), (name,)
+
+
+class UnoApiIndex:
+    """Search the UNO API index file
+
+    Usage:
+    api = UnoApiIndex('api.db')
+    api.findMethod('insertString')   # [('com.sun.star.text.XSimpleText', 'insertString', 'void', '(...)')]
+    api.findType('XText', prefix=True)
+    """
+    def __init__(self, path):
+        self.path = path
+        self.db = sqlite3.connect(path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        self.db.close()
+
+    # ---------- writing ----------
+
+    @classmethod
+    def create(cls, path):
+        """Create an empty index file, existing content is removed
+        """
+        index = cls(path)
+        for table in _COLUMNS:
+            index.db.execute('DROP TABLE IF EXISTS {}'.format(table))
+        index.db.executescript(_SCHEMA)
+        return index
+
+    def insert(self, table, rows):
+        """Insert a sequence of row tuples into table
+        """
+        sql = 'INSERT INTO {} VALUES ({})'.format(table, ', '.join('?' * _COLUMNS[table]))
+        self.db.executemany(sql, rows)
+
+    def finish(self):
+        """Build the search indexes and commit
+        """
+        self.db.executescript(_INDEXES)
+        self.db.commit()
+
+    # ---------- searching ----------
+
+    def findType(self, name, prefix=False, kind=None):
+        """Find types by full or short name
+
+        :param kind: 'service', 'interface', 'constants', 'enum', 'struct', 'exception' or None
+        :return: list of (name, kind)
+        """
+        column = 'name' if '.' in name else 'short'
+        where, args = _match(column, name, prefix)
+        if kind:
+            where += ' AND kind = ?'
+            args += (kind,)
+        return self.db.execute('SELECT name, kind FROM types WHERE ' + where + ' ORDER BY name', args).fetchall()
+
+    def findMethod(self, name, prefix=False):
+        """Which interface has method name
+
+        :return: list of (interface, method, return type, parameters)
+        """
+        where, args = _match('name', name, prefix)
+        return self.db.execute('SELECT owner, name, return_type, params FROM methods WHERE ' + where +
+                               ' ORDER BY owner, name', args).fetchall()
+
+    def findProperty(self, name, prefix=False):
+        """Which service or interface has property name
+
+        :return: list of (owner, property, type)
+        """
+        where, args = _match('name', name, prefix)
+        return self.db.execute('SELECT owner, name, type FROM properties WHERE ' + where +
+                               ' ORDER BY owner, name', args).fetchall()
+
+    def findConstant(self, name, prefix=False):
+        """Find constants and enum values by name
+
+        :return: list of (owner, name, value)
+        """
+        where, args = _match('name', name, prefix)
+        return self.db.execute('SELECT owner, name, value FROM constants WHERE ' + where +
+                               ' ORDER BY owner, name', args).fetchall()
+
+    def methods(self, interface):
+        """Methods of an interface, list of (name, return type, parameters)
+        """
+        return self.db.execute('SELECT name, return_type, params FROM methods WHERE owner = ? ORDER BY name',
+                               (interface,)).fetchall()
+
+    def properties(self, owner):
+        """Properties of a service or attributes of an interface, list of (name, type)
+        """
+        return self.db.execute('SELECT name, type FROM properties WHERE owner = ? ORDER BY name',
+                               (owner,)).fetchall()
+
+    def constants(self, owner):
+        """Values of a constants group or enum, list of (name, value)
+        """
+        return self.db.execute('SELECT name, value FROM constants WHERE owner = ? ORDER BY name',
+                               (owner,)).fetchall()
+
+    def interfaces(self, service):
+        """Interfaces exported by a service
+        """
+        return [r[0] for r in self.db.execute('SELECT interface FROM interfaces WHERE service = ? ORDER BY interface',
+                                              (service,))]
+
+    def services(self, interface):
+        """Services exporting an interface
+        """
+        return [r[0] for r in self.db.execute('SELECT service FROM interfaces WHERE interface = ? ORDER BY service',
+                                              (interface,))]
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) != 3:
+        print('Usage: python unoapi.py INDEX NAME[*]')
+        sys.exit(2)
+
+    path, name = sys.argv[1:]
+    prefix = name.endswith('*')
+    name = name.rstrip('*')
+    with UnoApiIndex(path) as api:
+        for row in api.findType(name, prefix) + api.findMethod(name, prefix) + \
+                api.findProperty(name, prefix) + api.findConstant(name, prefix):
+            print('  '.join(str(v) for v in row))
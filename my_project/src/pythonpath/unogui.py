@@ -0,0 +1,1032 @@
+# -*- coding: utf-8 -*-
+#!/usr/bin/env python
+
+# unostarter is helper for LibreOffice macro development
+# Copyright (C) 2017  Sasa Kelecevic
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301  USA
+
+"""Dialog boxes of unostarter
+
+Loaded on first use of unostarter.Gui or one of the box classes, so
+scripts which only drive documents do not pay for the awt imports.
+"""
+
+import asyncio
+import bisect
+import fnmatch
+import importlib
+import itertools
+import threading
+import uno
+import unohelper
+from com.sun.star.awt import XActionListener, XTextListener, XItemListener, XTopWindowListener
+from com.sun.star.task import XJobExecutor
+from com.sun.star.frame import XTerminateListener
+from com.sun.star.awt.MessageBoxType import \
+    MESSAGEBOX as _MESSAGEBOX, \
+    INFOBOX as _INFOBOX, \
+    WARNINGBOX as _WARNINGBOX, \
+    ERRORBOX as ERRORBOX, \
+    QUERYBOX as QUERYBOX
+from com.sun.star.awt.MessageBoxButtons import \
+    BUTTONS_OK as _BUTTONS_OK, \
+    BUTTONS_OK_CANCEL as _BUTTONS_OK_CANCEL, \
+    BUTTONS_YES_NO as BUTTONS_YES_NO, \
+    BUTTONS_YES_NO_CANCEL as _BUTTONS_YES_NO_CANCEL, \
+    BUTTONS_RETRY_CANCEL as _BUTTONS_RETRY_CANCEL, \
+    BUTTONS_ABORT_IGNORE_RETRY as _BUTTONS_ABORT_IGNORE_RETRY
+from com.sun.star.awt.MessageBoxButtons import \
+    DEFAULT_BUTTON_OK as _DEFAULT_BUTTON_OK, \
+    DEFAULT_BUTTON_CANCEL as _DEFAULT_BUTTON_CANCEL, \
+    DEFAULT_BUTTON_RETRY as _DEFAULT_BUTTON_RETRY, \
+    DEFAULT_BUTTON_YES as _DEFAULT_BUTTON_YES, \
+    DEFAULT_BUTTON_NO as _DEFAULT_BUTTON_NO, \
+    DEFAULT_BUTTON_IGNORE as _DEFAULT_BUTTON_IGNORE
+
+# unostarter core, imported under the same package as this module
+_package = __name__.rpartition('.')[0]
+_core = importlib.import_module(_package + '.unostarter' if _package else 'unostarter')
+ConnectOffice = _core.ConnectOffice
+_invoke = _core._invoke
+
+
+def _stringItems(items):
+    """StringItemList value for setPropertyValue(s) through uno.invoke, a plain tuple would arrive as []any"""
+    return uno.Any("[]string", tuple(items))
+
+
+# change if needed
+# built dialogs kept for reuse per box type
+_DIALOG_POOL_SIZE = 2
+# SelectBox switches to a searchable window of matches above this
+_SELECTBOX_SEARCH_LIMIT = 1000
+
+__all__ = ['SimpleDialog', 'SelectBoxClass', 'SearchBoxClass', 'OptionBoxClass', 'TextBoxClass', 'NumberBoxClass',
+           'DateBoxClass', 'MessageBoxWizardClass', 'Gui']
+
+# -----------------------------------------------------------
+#               GUI CLASSES
+# -----------------------------------------------------------
+
+
+class SimpleDialog(unohelper.Base, XActionListener, XJobExecutor):
+    """
+    Class documentation...
+    """
+    # set control model properties with one setPropertyValues call
+    batchProperties = True
+
+    def __init__(self, nPositionX=None, nPositionY=None, nWidth=None, nHeight=None, sTitle=None):
+        self.ctx = ConnectOffice()
+        self._onClose = None
+        self._closeListener = None
+        self.ServiceManager = self.ctx.ServiceManager
+        self.Toolkit = self.ServiceManager.createInstanceWithContext("com.sun.star.awt.ExtToolkit", self.ctx)
+          #
+        # --------------create dialog container and set model and properties
+        self.DialogContainer = self.ServiceManager.createInstanceWithContext("com.sun.star.awt.UnoControlDialog", self.ctx)
+        self.DialogModel = self.ServiceManager.createInstance("com.sun.star.awt.UnoControlDialogModel")
+        self.DialogContainer.setModel(self.DialogModel)
+        dProps = {"PositionX": nPositionX, "PositionY": nPositionY, "Height": nHeight, "Width": nWidth,
+                  "Name": "Default", "Closeable": True, "Moveable": True}
+        if sTitle is not None:
+            dProps["Title"] = sTitle
+        self._setProperties(self.DialogModel, dProps)
+
+    def _setProperties(self, oModel, dProps):
+        names = sorted(dProps)
+        if self.batchProperties:
+            try:
+                _invoke(oModel, "setPropertyValues", (tuple(names), tuple(dProps[n] for n in names)))
+                return
+            except:
+                # unknown property or wrong type, find it one by one
+                pass
+        for name in names:
+            _invoke(oModel, "setPropertyValue", (name, dProps[name]))
+
+    def addControl(self, sAwtName, sControlName, dProps):
+        oControlModel = self.DialogModel.createInstance("com.sun.star.awt.UnoControl" + sAwtName + "Model")
+        dProps = dict(dProps)
+        dProps["Name"] = sControlName
+        self._setProperties(oControlModel, dProps)
+        self.DialogModel.insertByName(sControlName, oControlModel)
+        if sAwtName == "Button":
+            oControl = self.DialogContainer.getControl(sControlName)
+            oControl.addActionListener(self)
+            oControl.setActionCommand(sControlName + '_OnClick')
+        return oControlModel
+
+    def addControls(self, spec):
+        """Create controls from a declarative spec in one pass
+
+        :param spec: sequence of (awt name, control name, properties)
+        :return: dict of control name and control model
+
+        Every control model is also set as the dialog attribute named
+        after the control, self.lbMessage for "lbMessage".
+
+        Usage:
+        self.addControls([
+            ("FixedText", "lbMessage", {"PositionY": 5, "PositionX": 5, "Height": 15, "Width": 90, "Label": message}),
+            ("Button", "btnOK", {"PositionY": 35, "PositionX": 30, "Height": 15, "Width": 30, "Label": "OK"}),
+        ])
+        """
+        dControls = {}
+        for sAwtName, sControlName, dProps in spec:
+            dControls[sControlName] = self.addControl(sAwtName, sControlName, dProps)
+            setattr(self, sControlName, dControls[sControlName])
+        return dControls
+
+    def dispose(self):
+        try:
+            self.DialogContainer.dispose()
+        except:
+            pass
+
+    def showDialog(self):
+        self._onClose = None
+        self.DialogContainer.setVisible(True)
+        self.DialogContainer.createPeer(self.Toolkit, None)
+        self.DialogContainer.execute()
+
+    def showModeless(self, onClose):
+        """Show the dialog without blocking
+
+        :param onClose: called with returnValue when the dialog is closed
+        """
+        self._onClose = onClose
+        self.DialogContainer.createPeer(self.Toolkit, None)
+        if self._closeListener is None:
+            self._closeListener = _ModelessCloseListener(self)
+            self.DialogContainer.addTopWindowListener(self._closeListener)
+        self.DialogContainer.setVisible(True)
+
+    def endDialog(self):
+        """Close the dialog shown by showDialog or showModeless"""
+        onClose, self._onClose = self._onClose, None
+        if onClose is None:
+            self.DialogContainer.endExecute()
+        else:
+            self.DialogContainer.setVisible(False)
+            onClose(self.returnValue)
+
+
+class _ModelessCloseListener(unohelper.Base, XTopWindowListener):
+    """Ends a modeless dialog closed with the window close button"""
+    def __init__(self, dialog):
+        self.dialog = dialog
+
+    def windowClosing(self, oEvent):
+        if self.dialog._onClose is not None:
+            self.dialog.endDialog()
+
+    def windowOpened(self, oEvent):
+        pass
+
+    def windowClosed(self, oEvent):
+        pass
+
+    def windowMinimized(self, oEvent):
+        pass
+
+    def windowNormalized(self, oEvent):
+        pass
+
+    def windowActivated(self, oEvent):
+        pass
+
+    def windowDeactivated(self, oEvent):
+        pass
+
+    def disposing(self, oEvent):
+        pass
+
+
+class SelectBoxClass(SimpleDialog):
+    """
+    Class documentation...
+    """
+    def __init__(self, message="Select one item", title="SelectBox", choices=None):
+        SimpleDialog.__init__(self, nPositionX=60, nPositionY=60, nWidth=100, nHeight=55, sTitle=title)
+
+        if choices is None:
+            choices = ['a', 'b', 'c']
+
+
+        dMessage = {"PositionY": 5, "PositionX": 5, "Height": 15, "Width": 90, "Label": message,}
+        self.lbMessage = self.addControl("FixedText", "lbMessage", dMessage)
+
+        dChoices = {"PositionY": 15, "PositionX": 5, "Height": 15, "Width": 90,"Dropdown": True,
+                    "StringItemList": _stringItems(choices)}
+        self.cbChoices = self.addControl("ComboBox", "cbChoices", dChoices)
+
+        dOK = {"PositionY": 35, "PositionX": 30, "Height": 15, "Width": 30, "Label": "OK",}
+        self.btnOK = self.addControl("Button", "btnOK", dOK)
+
+        dCancel = {"PositionY": 35, "PositionX": 65, "Height": 15, "Width": 30, "Label": "Cancel",}
+        self.btnCancel = self.addControl("Button", "btnCancel", dCancel)
+
+        self.returnValue = None
+
+    def actionPerformed(self, oActionEvent):
+        if oActionEvent.ActionCommand == 'btnOK_OnClick':
+            self.returnValue = self.cbChoices.Text
+            self.endDialog()
+
+        if oActionEvent.ActionCommand == 'btnCancel_OnClick':
+            self.endDialog()
+
+    def reset(self, message="Select one item", title="SelectBox", choices=None):
+        if choices is None:
+            choices = ['a', 'b', 'c']
+        self._setProperties(self.DialogModel, {"Title": title})
+        self._setProperties(self.lbMessage, {"Label": message})
+        self._setProperties(self.cbChoices, {"StringItemList": _stringItems(choices), "Text": ""})
+        self.returnValue = None
+
+    def returnValue(self):
+        pass
+
+
+class _ChoiceIndex:
+    """Prefix and substring search over a list of choices, built once
+    """
+    def __init__(self, items):
+        self.items = [str(item) for item in items]
+        self._lower = [item.lower() for item in self.items]
+        self._order = sorted(range(len(self.items)), key=self._lower.__getitem__)
+        self._keys = [self._lower[i] for i in self._order]
+
+    def search(self, query, substring=True):
+        """Yield matching items, prefix matches first"""
+        q = query.lower()
+        if not q:
+            for item in self.items:
+                yield item
+            return
+        for k in range(bisect.bisect_left(self._keys, q), len(self._keys)):
+            if not self._keys[k].startswith(q):
+                break
+            yield self.items[self._order[k]]
+        if substring:
+            for i, s in enumerate(self._lower):
+                if q in s and not s.startswith(q):
+                    yield self.items[i]
+
+
+def _pages(source, query, count):
+    """Yield results of a callable source(query, start, count) page by page"""
+    start = 0
+    while True:
+        page = source(query, start, count)
+        for item in page:
+            yield str(item)
+        if len(page) < count:
+            return
+        start += count
+
+
+class SearchBoxClass(SimpleDialog, XTextListener, XItemListener):
+    """
+    Select box for very large choice lists
+
+    Only a window of matches is put into the list box. Typing filters the
+    choices, selecting the last "More ..." entry fetches the next window.
+    """
+    MORE = "More ..."
+
+    def __init__(self, message="Select one item", title="SelectBox", choices=None, window=200, substring=True):
+        """
+        :param choices: sequence, iterator or callable source(query, start, count)
+        :param window: number of matches fetched at once
+        :param substring: match anywhere in an item, not only at the start
+        """
+        SimpleDialog.__init__(self, nPositionX=60, nPositionY=60, nWidth=130, nHeight=125, sTitle=title)
+
+        if choices is None:
+            choices = ['a', 'b', 'c']
+        self.window = window
+        self.substring = substring
+        if callable(choices):
+            self.source = choices
+            self.index = None
+        else:
+            self.source = None
+            self.index = _ChoiceIndex(choices)
+        self.shown = []
+        self.matches = iter(())
+        self.more = False
+
+        self.addControls([
+            ("FixedText", "lbMessage", {"PositionY": 5, "PositionX": 5, "Height": 15, "Width": 120, "Label": message}),
+            ("Edit", "txtSearch", {"PositionY": 15, "PositionX": 5, "Height": 15, "Width": 120, "Text": ""}),
+            ("ListBox", "lbChoices", {"PositionY": 32, "PositionX": 5, "Height": 70, "Width": 120}),
+            ("Button", "btnOK", {"PositionY": 105, "PositionX": 60, "Height": 15, "Width": 30, "Label": "OK"}),
+            ("Button", "btnCancel", {"PositionY": 105, "PositionX": 95, "Height": 15, "Width": 30, "Label": "Cancel"}),
+        ])
+
+        self.DialogContainer.getControl("txtSearch").addTextListener(self)
+        self.DialogContainer.getControl("lbChoices").addItemListener(self)
+        self.filter("")
+
+        self.returnValue = None
+
+    def filter(self, query):
+        """Show the first window of choices matching query"""
+        if self.index is not None:
+            self.matches = self.index.search(query, self.substring)
+        else:
+            self.matches = _pages(self.source, query, self.window)
+        self.shown = []
+        self.fetch()
+
+    def fetch(self):
+        """Append the next window of matches to the list box"""
+        chunk = list(itertools.islice(self.matches, self.window + 1))
+        self.more = len(chunk) > self.window
+        self.shown.extend(chunk[:self.window])
+        if self.more:
+            # keep the extra match for the next window
+            self.matches = itertools.chain(chunk[self.window:], self.matches)
+        items = tuple(self.shown) + ((self.MORE,) if self.more else ())
+        self.lbChoices.StringItemList = items
+
+    def textChanged(self, oTextEvent):
+        self.filter(self.txtSearch.Text)
+
+    def itemStateChanged(self, oItemEvent):
+        if self.more and oItemEvent.Selected == len(self.shown):
+            self.fetch()
+            _invoke(self.lbChoices, "setPropertyValue", ("SelectedItems", uno.Any("[]short", ())))
+
+    def disposing(self, oEvent):
+        pass
+
+    def actionPerformed(self, oActionEvent):
+        if oActionEvent.ActionCommand == 'btnOK_OnClick':
+            positions = self.lbChoices.SelectedItems
+            if positions and positions[0] < len(self.shown):
+                self.returnValue = self.shown[positions[0]]
+            self.endDialog()
+
+        if oActionEvent.ActionCommand == 'btnCancel_OnClick':
+            self.endDialog()
+
+    def returnValue(self):
+        pass
+
+
+class OptionBoxClass(SimpleDialog):
+    """
+    Class documentation...
+    """
+    def __init__(self, message="Select multiple items", title="OptionBox", choices=['a', 'b', 'c']):
+        SimpleDialog.__init__(self, nPositionX=60, nPositionY=60, nWidth=135, nHeight=120, sTitle=title)
+
+        dMessage = {"PositionY": 5, "PositionX": 5, "Height": 15, "Width": 110, "Label": message,}
+        self.lbMessage = self.addControl("FixedText", "lbMessage", dMessage)
+
+        self.choices = tuple(choices)
+        dChoices = {"PositionY": 15, "PositionX": 5, "Height": 80, "Width": 125, "MultiSelection": True,
+                    "StringItemList": _stringItems(self.choices)}
+        self.lbChoices = self.addControl("ListBox", "lbChoices", dChoices)
+
+        dSelectAll = {"PositionY": 100, "PositionX": 5, "Height": 15, "Width": 30, "Label": "Select All",}
+        self.btnSelectAll = self.addControl("Button", "btnSelectAll", dSelectAll)
+
+        dClearAll = {"PositionY": 100, "PositionX": 35, "Height": 15, "Width": 30, "Label": "Clear All",}
+        self.btnClearAll = self.addControl("Button", "btnClearAll", dClearAll)
+
+        dOK = {"PositionY": 100, "PositionX": 70, "Height": 15, "Width": 30, "Label": "OK",}
+        self.btnOK = self.addControl("Button", "btnOK", dOK)
+
+        dCancel = {"PositionY": 100, "PositionX": 100, "Height": 15, "Width": 30, "Label": "Cancel",}
+        self.btnCancel = self.addControl("Button", "btnCancel", dCancel)
+
+        self.returnValue = ()
+
+    def actionPerformed(self, oActionEvent):
+        if oActionEvent.ActionCommand == 'btnOK_OnClick':
+            self.returnValue = tuple(self.choices[i] for i in self.getSelectedPos())
+            self.endDialog()
+
+        if oActionEvent.ActionCommand == 'btnCancel_OnClick':
+            self.endDialog()
+
+        if oActionEvent.ActionCommand == 'btnSelectAll_OnClick':
+            self.selectAll()
+
+        if oActionEvent.ActionCommand == 'btnClearAll_OnClick':
+            self.clearAll()
+
+    # selection is read and written through the model's SelectedItems,
+    # one bridge call for the whole list
+
+    def getSelectedPos(self):
+        return tuple(self.lbChoices.SelectedItems)
+
+    def setSelectedPos(self, positions):
+        _invoke(self.lbChoices, "setPropertyValue", ("SelectedItems", uno.Any("[]short", tuple(sorted(positions)))))
+
+    def selectAll(self):
+        self.setSelectedPos(range(len(self.choices)))
+
+    def clearAll(self):
+        self.setSelectedPos(())
+
+    def invertSelection(self):
+        selected = set(self.getSelectedPos())
+        self.setSelectedPos(i for i in range(len(self.choices)) if i not in selected)
+
+    def selectPattern(self, pattern, add=False):
+        """Select items matching a shell style pattern, "ab*"
+
+        :param add: keep the current selection
+        """
+        positions = set(self.getSelectedPos()) if add else set()
+        positions.update(i for i, item in enumerate(self.choices) if fnmatch.fnmatchcase(item, pattern))
+        self.setSelectedPos(positions)
+
+    def reset(self, message="Select multiple items", title="OptionBox", choices=['a', 'b', 'c']):
+        self.choices = tuple(choices)
+        self._setProperties(self.DialogModel, {"Title": title})
+        self._setProperties(self.lbMessage, {"Label": message})
+        self._setProperties(self.lbChoices, {"StringItemList": _stringItems(self.choices)})
+        self.setSelectedPos(())
+        self.returnValue = ()
+
+    def returnValue(self):
+        pass
+
+
+class TextBoxClass(SimpleDialog):
+    """
+    Class documentation...
+    """
+
+    def __init__(self, message="Enter a text", title="TextBox", text=""):
+        SimpleDialog.__init__(self, nPositionX=60, nPositionY=60, nWidth=100, nHeight=55, sTitle=title)
+
+        dMessage = {"PositionY": 5, "PositionX": 5, "Height": 15, "Width": 90, "Label": message,}
+        self.lbMessage = self.addControl("FixedText", "lbMessage", dMessage)
+
+        dText = {"PositionY": 15, "PositionX": 5, "Height": 15, "Width": 90, "Text":text}
+        self.txtText = self.addControl("Edit", "txtText", dText)
+
+        dOK = {"PositionY": 35, "PositionX": 30, "Height": 15, "Width": 30, "Label": "OK",}
+        self.btnOK = self.addControl("Button", "btnOK", dOK)
+
+        dCancel = {"PositionY": 35, "PositionX": 65, "Height": 15, "Width": 30, "Label": "Cancel",}
+        self.btnCancel = self.addControl("Button", "btnCancel", dCancel)
+
+        self.returnValue = None
+
+    def actionPerformed(self, oActionEvent):
+        if oActionEvent.ActionCommand == 'btnOK_OnClick':
+            self.returnValue = self.txtText.Text
+            self.endDialog()
+
+        if oActionEvent.ActionCommand == 'btnCancel_OnClick':
+            self.endDialog()
+
+    def reset(self, message="Enter a text", title="TextBox", text=""):
+        self._setProperties(self.DialogModel, {"Title": title})
+        self._setProperties(self.lbMessage, {"Label": message})
+        self._setProperties(self.txtText, {"Text": text})
+        self.returnValue = None
+
+    def returnValue(self):
+        pass
+
+
+class NumberBoxClass(SimpleDialog):
+    """
+    Class documentation...
+    """
+
+    def __init__(self, message="Enter a number", title="NumberBox", default_value=0, min_=-10000, max_=10000, decimals=0):
+        SimpleDialog.__init__(self, nPositionX=60, nPositionY=60, nWidth=100, nHeight=55, sTitle=title)
+
+        self.default_value = default_value
+        self.min_ = min_
+        self.max_ = max_
+        self.decimals = decimals
+
+        dMessage = {"PositionY": 5, "PositionX": 5, "Height": 15, "Width": 90, "Label": message,}
+        self.lbMessage = self.addControl("FixedText", "lbMessage", dMessage)
+
+        dNumber = {"PositionY": 15, "PositionX": 5, "Height": 15, "Width": 90, "DecimalAccuracy": self.decimals,
+                   "StrictFormat": True, "Value": self.default_value, "ValueMin": self.min_, "ValueMax": self.max_}
+        self.nfNumber = self.addControl("NumericField", "nfNumber", dNumber)
+
+        dOK = {"PositionY": 35, "PositionX": 30, "Height": 15, "Width": 30, "Label": "OK",}
+        self.btnOK = self.addControl("Button", "btnOK", dOK)
+
+        dCancel = {"PositionY": 35, "PositionX": 65, "Height": 15, "Width": 30, "Label": "Cancel",}
+        self.btnCancel = self.addControl("Button", "btnCancel", dCancel)
+
+        self.returnValue = None
+
+    def actionPerformed(self, oActionEvent):
+        if oActionEvent.ActionCommand == 'btnOK_OnClick':
+            if self.decimals == 0:
+                self.returnValue = int(self.nfNumber.Value)
+            else:
+                self.returnValue = self.nfNumber.Value
+
+            self.endDialog()
+
+        if oActionEvent.ActionCommand == 'btnCancel_OnClick':
+            self.endDialog()
+
+    def reset(self, message="Enter a number", title="NumberBox", default_value=0, min_=-10000, max_=10000, decimals=0):
+        self.default_value = default_value
+        self.min_ = min_
+        self.max_ = max_
+        self.decimals = decimals
+        self._setProperties(self.DialogModel, {"Title": title})
+        self._setProperties(self.lbMessage, {"Label": message})
+        self._setProperties(self.nfNumber, {"DecimalAccuracy": decimals, "Value": default_value,
+                                            "ValueMin": min_, "ValueMax": max_})
+        self.returnValue = None
+
+    def returnValue(self):
+        pass
+
+
+class DateBoxClass(SimpleDialog):
+    """
+    Class documentation...
+    """
+
+    def __init__(self, message="Choose a date", title='DateBox'):
+        """
+        the format of the displayed date 9: short YYYYMMDD
+
+        """
+        SimpleDialog.__init__(self, nPositionX=60, nPositionY=60, nWidth=100, nHeight=55, sTitle=title)
+
+        dMessage = {"PositionY": 5, "PositionX": 5, "Height": 15, "Width": 90, "Label": message,}
+        self.lbMessage = self.addControl("FixedText", "lbMessage", dMessage)
+
+        dDate = {"PositionY": 15, "PositionX": 5, "Height": 15, "Width": 90, "Dropdown": True,
+                 "StrictFormat": True, "DateFormat": 9}
+        self.dbDate = self.addControl("DateField", "dbDate", dDate)
+
+        dOK = {"PositionY": 35, "PositionX": 30, "Height": 15, "Width": 30, "Label": "OK",}
+        self.btnOK = self.addControl("Button", "btnOK", dOK)
+
+        dCancel = {"PositionY": 35, "PositionX": 65, "Height": 15, "Width": 30, "Label": "Cancel",}
+        self.btnCancel = self.addControl("Button", "btnCancel", dCancel)
+
+        self.returnValue = ""
+
+    def actionPerformed(self, oActionEvent):
+        if oActionEvent.ActionCommand == 'btnOK_OnClick':
+            self.returnValue = self.dbDate.Text
+            self.endDialog()
+
+        if oActionEvent.ActionCommand == 'btnCancel_OnClick':
+            self.endDialog()
+
+    def reset(self, message="Choose a date", title='DateBox'):
+        self._setProperties(self.DialogModel, {"Title": title})
+        self._setProperties(self.lbMessage, {"Label": message})
+        self._setProperties(self.dbDate, {"Date": None})
+        self.returnValue = ""
+
+    def returnValue(self):
+        pass
+
+
+class MessageBoxWizardClass(SimpleDialog):
+    """
+    Class documentation...
+    """
+    def __init__(self):
+        """
+        Message Box Wizard
+
+        """
+        SimpleDialog.__init__(self, nPositionX=60, nPositionY=60, nWidth=155, nHeight=180, sTitle=' MessageBox Wizard')
+        # title
+        dLabelTitle = {"PositionY": 5, "PositionX": 5, "Height": 15, "Width": 30, "Label": 'Title'}
+        self.lbTitle = self.addControl("FixedText", "lbTitle", dLabelTitle)
+        dTitle = {"PositionY": 5, "PositionX": 35, "Height": 15, "Width": 115, "Text": 'Title'}
+        self.txtTitle = self.addControl("Edit", "txtTitle", dTitle)
+        # message
+        dLabelMessage = {"PositionY": 20, "PositionX": 5, "Height": 15, "Width": 30, "Label": 'Message'}
+        self.lbMessage = self.addControl("FixedText", "lbMessage", dLabelMessage)
+        dMessage = {"PositionY": 20, "PositionX": 35, "Height": 15, "Width": 115, "Text": 'Message'}
+        self.txtMessage = self.addControl("Edit", "txtMessage", dMessage)
+        # type
+        dLabelType = {"PositionY": 35, "PositionX": 5, "Height": 15, "Width": 30, "Label": 'Type'}
+        self.lbMsgType = self.addControl("FixedText", "lbMsgType", dLabelType)
+        mtype = ['MESSAGEBOX', 'INFOBOX', 'WARNINGBOX', 'ERRORBOX', 'QUERYBOX']
+        dMessageType = {"PositionY": 35, "PositionX": 35, "Height": 15, "Width": 115, "Dropdown": True,
+                        "StringItemList": _stringItems(mtype)}
+        self.cbMsgType = self.addControl("ComboBox", "cbMsgType", dMessageType)
+        # buttons
+        dLabelButtons = {"PositionY": 50, "PositionX": 5, "Height": 15, "Width": 30, "Label": 'Buttons'}
+        self.lbMsgButtons = self.addControl("FixedText", "lbMsgButtons", dLabelButtons)
+
+        self.mbtn = {'BUTTONS_OK':  1, 'BUTTONS_OK_CANCEL': 2, 'BUTTONS_YES_NO': 3, 'BUTTONS_YES_NO_CANCEL': 4, 'BUTTONS_RETRY_CANCEL': 5, 'BUTTONS_ABORT_IGNORE_RETRY': 6}
+        dMessageButtons = {"PositionY": 50, "PositionX": 35, "Height": 15, "Width": 115, "Dropdown": True,
+                           "StringItemList": _stringItems(self.mbtn.keys())}
+        self.cbMsgButtons = self.addControl("ComboBox", "cbMsgButtons", dMessageButtons)
+        # default buttons
+        dLabelDefaultButtons = {"PositionY": 65, "PositionX": 5, "Height": 15, "Width": 30, "Label": 'Default',}
+        self.lbMsgDefaultButtons = self.addControl("FixedText", "lbMsgDefaultButtons", dLabelDefaultButtons)
+
+        self.mdefbtn = {'DEFAULT_BUTTON_OK': 65536, 'DEFAULT_BUTTON_CANCEL': 131072, 'DEFAULT_BUTTON_RETRY': 196608, 'DEFAULT_BUTTON_YES': 262144, 'DEFAULT_BUTTON_NO': 327680, 'DEFAULT_BUTTON_IGNORE': 393216}
+        dMessageDefaultButtons = {"PositionY": 65, "PositionX": 35, "Height": 15, "Width": 115, "Dropdown": True,
+                                  "StringItemList": _stringItems(self.mdefbtn.keys())}
+        self.cbMsgDefaultButtons = self.addControl("ComboBox", "cbMsgDefaultButtons", dMessageDefaultButtons)
+
+        # code
+        text = ''
+        dText = {"PositionY": 101, "PositionX": 5, "Height": 60, "Width": 145, "Text": text, 'MultiLine': True, 'HScroll': True, 'VScroll': True}
+        self.txtText = self.addControl("Edit", "txtText", dText)
+
+        # imports
+        dLabelImports = {"PositionY": 83, "PositionX": 5, "Height": 15, "Width": 30, "Label": 'Imports'}
+        self.lbdImports = self.addControl("FixedText", "lbdImports", dLabelImports)
+        dImports = {"PositionY": 83, "PositionX": 35, "Height": 15, "Width": 55, "Dropdown": True,
+                    "StringItemList": _stringItems(['Minimal', 'All'])}
+        self.cbImports = self.addControl("ComboBox", "cbImports", dImports)
+        # dialog buttons
+        dShow = {"PositionY": 83, "PositionX": 90, "Height": 15, "Width": 30, "Label": "Show"}
+        self.btnShow = self.addControl("Button", "btnShow", dShow)
+        dClear = {"PositionY": 83, "PositionX": 120, "Height": 15, "Width": 30, "Label": "Clear"}
+        self.btnClear = self.addControl("Button", "btnClear", dClear)
+        dClose = {"PositionY": 163, "PositionX": 120, "Height": 15, "Width": 30, "Label": "Close"}
+        self.btnClose = self.addControl("Button", "btnClose", dClose)
+
+        self.returnValue = None
+
+    def actionPerformed(self, oActionEvent):
+        if oActionEvent.ActionCommand == 'btnShow_OnClick':
+            if self.cbImports.Text == 'Minimal':
+                imports = "from com.sun.star.awt.MessageBoxType import MESSAGEBOX, INFOBOX, WARNINGBOX, ERRORBOX, QUERYBOX\n\n"
+                buttons = str(self.mbtn[self.cbMsgButtons.Text] + self.mdefbtn[self.cbMsgDefaultButtons.Text])
+                t = imports + 'Gui.MessageBox(message="' + self.txtMessage.Text + '", title="' + self.txtTitle.Text + '", messageType=' + self.cbMsgType.Text + ', messageButtons=' + buttons + ')'
+
+            elif self.cbImports.Text == 'All':
+
+                imports = """from com.sun.star.awt.MessageBoxType import MESSAGEBOX, INFOBOX, WARNINGBOX, ERRORBOX, QUERYBOX\nfrom com.sun.star.awt.MessageBoxButtons import BUTTONS_OK, BUTTONS_OK_CANCEL, BUTTONS_YES_NO, BUTTONS_YES_NO_CANCEL, BUTTONS_RETRY_CANCEL, BUTTONS_ABORT_IGNORE_RETRY\nfrom com.sun.star.awt.MessageBoxButtons import DEFAULT_BUTTON_OK, DEFAULT_BUTTON_CANCEL, DEFAULT_BUTTON_RETRY,    DEFAULT_BUTTON_YES, DEFAULT_BUTTON_NO, DEFAULT_BUTTON_IGNORE\n\n"""
+                t = imports + 'Gui.MessageBox(message="' + self.txtMessage.Text + '", title="' + self.txtTitle.Text + '", messageType=' + self.cbMsgType.Text + ', messageButtons=' + self.cbMsgButtons.Text + ' + ' + self.cbMsgDefaultButtons.Text + ')'
+
+            self.txtText.Text = t
+            self.returnValue = 0
+
+        if oActionEvent.ActionCommand == 'btnClear_OnClick':
+             self.txtText.Text = ''
+
+        if oActionEvent.ActionCommand == 'btnClose_OnClick':
+            self.endDialog()
+
+    def returnValue(self):
+        pass
+
+
+# -----------------------------------------------------------
+#               GUI FUNCTIONS
+# -----------------------------------------------------------
+
+class _DialogTerminateListener(unohelper.Base, XTerminateListener):
+    """Dispose pooled dialogs when the office shuts down"""
+    def __init__(self, pool, ctx):
+        self.pool = pool
+        self.ctx = ctx
+
+    def queryTermination(self, oEvent):
+        pass
+
+    def notifyTermination(self, oEvent):
+        self.pool.terminated(self.ctx)
+
+    def disposing(self, oEvent):
+        self.pool.terminated(self.ctx)
+
+
+class _DialogPool:
+    """Idle dialog instances per box class, reused by Gui
+
+    A reused dialog only gets its message, title, choices and value reset.
+    """
+    def __init__(self, maxsize=_DIALOG_POOL_SIZE):
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._idle = {}
+        self._listening = []
+
+    def acquire(self, cls, *args):
+        ctx = ConnectOffice()
+        with self._lock:
+            idle = self._idle.get(cls, [])
+            app = idle.pop() if idle else None
+        if app is not None:
+            if app.ctx == ctx:
+                try:
+                    app.reset(*args)
+                    return app
+                except:
+                    pass
+            app.dispose()
+        app = cls(*args)
+        self._listen(app)
+        return app
+
+    def release(self, app):
+        if not hasattr(app, 'reset'):
+            # only dialogs with reset() can be shown again
+            app.dispose()
+            return
+        with self._lock:
+            idle = self._idle.setdefault(type(app), [])
+            if len(idle) < self.maxsize:
+                idle.append(app)
+                return
+        app.dispose()
+
+    def clear(self):
+        with self._lock:
+            apps = [app for idle in self._idle.values() for app in idle]
+            self._idle.clear()
+        for app in apps:
+            app.dispose()
+
+    def terminated(self, ctx):
+        """Clear the pool and forget the listener of a terminated office"""
+        with self._lock:
+            self._listening = [c for c in self._listening if c != ctx]
+        self.clear()
+
+    def _listen(self, app):
+        with self._lock:
+            if any(ctx == app.ctx for ctx in self._listening):
+                return
+            self._listening.append(app.ctx)
+        try:
+            desktop = app.ctx.getValueByName('/singletons/com.sun.star.frame.theDesktop')
+            desktop.addTerminateListener(_DialogTerminateListener(self, app.ctx))
+        except:
+            pass
+
+
+_dialogs = _DialogPool()
+
+
+def _runDialog(cls, *args):
+    app = _dialogs.acquire(cls, *args)
+    try:
+        app.showDialog()
+        return app.returnValue
+    finally:
+        _dialogs.release(app)
+
+
+
+class _GuiAsync:
+    """Awaitable Gui boxes, Gui.aio
+
+    Dialog boxes are shown modeless and resolve when the user closes
+    them, so one asyncio loop can wait for several prompts and do other
+    work meanwhile. Message and file picker boxes have no modeless form,
+    they run modal in a worker thread.
+
+    Usage:
+    text = await Gui.aio.TextBox(message="Enter your input")
+    """
+
+    async def _show(self, cls, *args):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def resolve(value):
+            if not future.done():
+                future.set_result(value)
+
+        def onClose(value):
+            _dialogs.release(app)
+            loop.call_soon_threadsafe(resolve, value)
+
+        acquiring = loop.run_in_executor(None, _dialogs.acquire, cls, *args)
+        showing = None
+        try:
+            # shielded, a cancelled step still finishes in its thread and is cleaned up
+            app = await asyncio.shield(acquiring)
+            showing = loop.run_in_executor(None, app.showModeless, onClose)
+            await asyncio.shield(showing)
+            return await future
+        except asyncio.CancelledError:
+            await self._cancel(loop, acquiring, showing)
+            raise
+
+    async def _cancel(self, loop, acquiring, showing):
+        """Close or release the dialog of a cancelled _show"""
+        try:
+            app = await acquiring
+        except Exception:
+            # not built, nothing to clean up
+            return
+        if showing is None:
+            await loop.run_in_executor(None, _dialogs.release, app)
+            return
+        try:
+            await showing
+        except Exception:
+            await loop.run_in_executor(None, app.dispose)
+            return
+        if app._onClose is not None:
+            await loop.run_in_executor(None, app.endDialog)
+
+    async def _run(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, func, *args)
+
+    async def SelectBox(self, message="Select one item", title="SelectBox", choices=['a', 'b', 'c']):
+        return await self._show(SelectBoxClass, message, title, choices)
+
+    async def OptionBox(self, message="Select multiple items", title="OptionBox", choices=['a', 'b', 'c']):
+        return await self._show(OptionBoxClass, message, title, choices)
+
+    async def TextBox(self, message="Enter your input", title="TextBox", text=""):
+        return await self._show(TextBoxClass, message, title, text)
+
+    async def NumberBox(self, message="Enter a number", title="NumberBox", default_value=0, min_=-10000, max_=10000, decimals=0):
+        return await self._show(NumberBoxClass, message, title, default_value, min_, max_, decimals)
+
+    async def DateBox(self, message="Choose a date", title='DateBox'):
+        return await self._show(DateBoxClass, message, title)
+
+    async def FolderPathBox(self, title='Get directory path'):
+        return await self._run(Gui.FolderPathBox, title)
+
+    async def FilePathBox(self, title='Get file path'):
+        return await self._run(Gui.FilePathBox, title)
+
+    async def MessageBox(self, message="Message", title="MessageBox", messageType=_INFOBOX, messageButtons=_BUTTONS_OK):
+        return await self._run(Gui.MessageBox, message, title, messageType, messageButtons)
+
+
+class Gui:
+    """Provides a simple dialog boxes for interaction with a user:
+
+    make choices (SelectBox, OptionBox)
+    enter new data (TextBox, NumberBox, DateBox)
+    get paths (FolderPathBox, FilePathBox)
+    show information (MessageBox)
+
+    In script interactions are invoked by simple function calls.
+    Awaitable versions are in Gui.aio.
+    """
+    aio = _GuiAsync()
+
+    def SelectBox(message="Select one item", title="SelectBox", choices=['a', 'b', 'c'], search=None):
+        """Simple dialog to select an item within a drop-down list.
+        
+        :param message: Message displayed to the user.
+        :param title: Window title.
+        :param choices: List containing the names of the items that can be selected,
+                        an iterator, or a callable source(query, start, count) returning a page of matches.
+        :param search: Show a searchable list with a window of matches, default
+                       for iterators, callables and more than 1000 choices
+        :return:  A string, or None
+        
+        Usage: SelectBox(message="Select one item", title="SelectBox", choices=['a','b','c'])
+        """
+        if search is None:
+            search = callable(choices) or not hasattr(choices, '__len__') or len(choices) > _SELECTBOX_SEARCH_LIMIT
+        if search:
+            app = SearchBoxClass(message, title, choices)
+            try:
+                app.showDialog()
+                return app.returnValue
+            finally:
+                app.dispose()
+        return _runDialog(SelectBoxClass, message, title, choices)
+
+    def OptionBox(message="Select multiple items", title="OptionBox", choices=['a', 'b', 'c']):
+        """Show a list of possible choices to be selected.
+        
+        :param message: Message displayed to the user.
+        :param title: Window title.
+        :param choices: List containing the names of the items that can be selected.
+        :return: A tuple of selected items, or empty tuple
+        
+        Usage: OptionBox(message="Select multiple items", title="OptionBox", choices=['a','b','c'])
+        """
+        return _runDialog(OptionBoxClass, message, title, choices)
+
+    def TextBox(message="Enter your input", title="TextBox", text=""):
+        """Simple text input box.
+        
+        :param message: Message displayed to the user.
+        :param title: Window title.
+        :param text: Response from the user.
+        :return: A string, or None
+        
+        Usage: TextBox(message="Enter your input", title="TextBox", text="")
+        """
+        return _runDialog(TextBoxClass, message, title, text)
+
+    def NumberBox(message="Enter a number", title="NumberBox", default_value=0, min_=-10000, max_=10000, decimals=0):
+        """Simple dialog to ask a user to select an number within a certain range.
+        
+        :param message: Message displayed to the user.
+        :param title: Window title.
+        :param default_value: Default value appearing in the box.
+        :param min_: Minimum value allowed, default -10000 
+        :param max_: Maximum value allowed, default 10000
+        :param decimals: Indicate the maximum decimal precision allowed, default 0
+        :return: An integer/float or None
+        
+        Usage: NumberBox(message="Enter a number", title="NumberBox", default_value=0, min_=-10000, max_=10000, decimals=0)
+        """
+        return _runDialog(NumberBoxClass, message, title, default_value, min_, max_, decimals)
+
+    def DateBox(message="Choose a date", title='DateBox'):
+        """Calendar dialog box
+        
+        :param message: Message displayed to the user.
+        :param title: Window title.
+        :return: The selected date in format YYYYMMDD
+        
+        Usage: DateBox(message="Date of birth", title="BirthDay")
+        """
+        return _runDialog(DateBoxClass, message, title)
+
+    def FolderPathBox(title='Get directory path'):
+        """Gets the full path of an existing directory
+        
+        :param title: Window title.
+        :return: The path of a directory or an empty string
+        
+        Usage: FolderPathBox(title='Get directory path')
+        """
+        ctx = ConnectOffice()
+        smgr = ctx.getServiceManager()
+        folder_picker = smgr.createInstanceWithContext("com.sun.star.ui.dialogs.FolderPicker", ctx)
+        folder_picker.setTitle(title)
+        folder_picker.execute()
+        return folder_picker.getDirectory()
+
+    def FilePathBox(title='Get file path'):
+        """Gets the full path of existing files
+        
+        :param title: Window title.
+        :return: The path of a file or an empty string
+        
+        Usage: FilePathBox(title='Get file path')
+        """
+        ctx = ConnectOffice()
+        smgr = ctx.getServiceManager()
+        open_file_picker = smgr.createInstanceWithContext("com.sun.star.ui.dialogs.FilePicker", ctx)
+        open_file_picker.setMultiSelectionMode(False)
+        open_file_picker.setTitle(title)
+        open_file_picker.appendFilter("All files (*.*)", "*.*")
+        open_file_picker.execute()
+        return open_file_picker.getSelectedFiles()[0]
+
+    def MessageBox(message="Message", title="MessageBox", messageType=_INFOBOX, messageButtons=_BUTTONS_OK):
+        """Simple message box.
+        
+        :param message: Message displayed to the user.
+        :param title: Window title. 
+        :param messageType: Message box type
+        :param messageButtons: Message box buttons
+        :return: CANCEL = 0, OK = 1, YES = 2, NO = 3, RETRY = 4, IGNORE = 5 
+ 
+        """
+        ctx = ConnectOffice()
+        sm = ctx.ServiceManager
+        toolkit = sm.createInstanceWithContext("com.sun.star.awt.Toolkit", ctx)
+        parent_win = sm.createInstanceWithContext("com.sun.star.awt.ExtToolkit", ctx)
+        messageBox = toolkit.createMessageBox(parent_win, messageType, messageButtons, title, message)
+        rval = messageBox.execute()
+        return rval
+
+    def MBWizard():
+        """Message Box wizard
+
+        Allows developers to quickly generate code for message boxes.
+        Copy generated code in your script.
+        """
+        app = MessageBoxWizardClass()
+        app.showDialog()
+        return None
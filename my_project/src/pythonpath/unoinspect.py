@@ -0,0 +1,513 @@
+# -*- coding: utf-8 -*-
+#!/usr/bin/env python
+
+# unostarter is helper for LibreOffice macro development
+# Copyright (C) 2017  Sasa Kelecevic
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301  USA
+
+"""Object inspection of unostarter
+
+Loaded on first use of unostarter.Inspector.
+"""
+
+import collections
+import importlib
+import json
+import sys
+import uno
+from com.sun.star.uno import RuntimeException
+from com.sun.star.beans.MethodConcept import \
+    ALL as _METHOD_CONCEPT_ALL
+from com.sun.star.beans.PropertyConcept import \
+    ALL as _PROPERTY_CONCEPT_ALL
+from com.sun.star.reflection.ParamMode import \
+    IN as _PARAM_MODE_IN, \
+    OUT as _PARAM_MODE_OUT, \
+    INOUT as _PARAM_MODE_INOUT
+
+# unostarter core, imported under the same package as this module
+_package = __name__.rpartition('.')[0]
+_core = importlib.import_module(_package + '.unostarter' if _package else 'unostarter')
+ConnectOffice = _core.ConnectOffice
+_TracedObject = _core._TracedObject
+
+__all__ = ['Inspector', 'InspectionResult', 'InspectedMember', 'WalkNode']
+
+
+def _mode_to_str(mode):
+    ret = "[]"
+    if mode == _PARAM_MODE_INOUT:
+        ret = "[inout]"
+    elif mode == _PARAM_MODE_OUT:
+        ret = "[out]"
+    elif mode == _PARAM_MODE_IN:
+        ret = "[in]"
+    return ret
+
+
+# -----------------------------------------------------------
+#               INSPECTION
+# -----------------------------------------------------------
+
+class _IntrospectionCache:
+    """LRU cache of static property and method metadata keyed by object type
+    """
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self._data = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        try:
+            value = self._data[key]
+        except KeyError:
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self):
+        self._data.clear()
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self._data),
+                'maxsize': self.maxsize, 'hit_rate': self.hits / total if total else 0.0}
+
+
+# marks a property value which could not be read
+_NO_VALUE = object()
+
+
+def _type_to_str(typ):
+    typ = str(typ)
+    typ = typ.split('(')
+    typ = typ[0].replace('<Type instance ', '')
+    typ = typ.replace('com.sun.star', '')
+    return sys.intern(typ.strip())
+
+
+def _value_to_repr(v):
+    if v is _NO_VALUE:
+        return "()"
+    t = str(v)
+    if t.startswith("pyuno object"):
+        v = "()"
+    if t.startswith("("):
+        v = "()"
+    return str(v)
+
+
+_PLAIN_TYPES = (str, int, float, bool, type(None))
+
+# properties not followed by Inspector.walk, they lead back up the model
+_WALK_SKIP = ('Parent', 'Model', 'CurrentController', 'Controller', 'Frame', 'ContainerWindow', 'ComponentWindow')
+
+WalkNode = collections.namedtuple('WalkNode', 'path depth implementation count')
+
+
+def _is_uno_object(value):
+    return isinstance(value, _TracedObject) or type(value).__name__ == 'pyuno'
+
+
+_NOT_FETCHED = object()
+
+
+class InspectedMember(dict):
+    """Record of one inspected property or method
+
+    A dict {'type': ..., 'repr': ...} as returned by earlier versions,
+    'repr' is missing when values were not fetched. Values are rendered
+    at once so no reference to remote objects is kept.
+    """
+    __slots__ = ('name',)
+
+    def __init__(self, name, typ, value=_NOT_FETCHED):
+        self.name = name
+        if value is _NOT_FETCHED:
+            dict.__init__(self, type=typ)
+        elif typ == 'PyUNO_callable':
+            dict.__init__(self, type=typ, repr=value)
+        else:
+            dict.__init__(self, type=typ, repr=_value_to_repr(value))
+
+    @property
+    def type(self):
+        return self['type']
+
+    @property
+    def repr(self):
+        return self.get('repr')
+
+
+class InspectionResult(dict):
+    """Dict of member name to InspectedMember
+    """
+    __slots__ = ()
+
+    def __init__(self, members=()):
+        dict.__init__(self, ((m.name, m) for m in members))
+
+    def toDict(self):
+        """Return plain nested dicts"""
+        return {name: dict(member) for name, member in self.items()}
+
+
+class Inspector:
+    """Frequently used methods in development context
+
+    """
+    def __init__(self, context=None, cache_size=256):
+        
+        if context:
+            tracer = _core._tracer
+            self.ctx = context if tracer is None else tracer.wrap(context, 'ctx')
+        else:
+            self.ctx = ConnectOffice()
+        self.smgr = self.ctx.ServiceManager
+        self.desktop = self.ctx.getValueByName('/singletons/com.sun.star.frame.theDesktop')
+        self.introspection = self.ctx.getValueByName("/singletons/com.sun.star.beans.theIntrospection")
+        self.reflection = self.ctx.getValueByName("/singletons/com.sun.star.reflection.theCoreReflection")
+        self.documenter = self.ctx.getValueByName('/singletons/com.sun.star.util.theServiceDocumenter')
+        self.cache = _IntrospectionCache(cache_size)
+
+    def _typeKey(self, object):
+        """Cache key: implementation name, supported services and interfaces
+
+        Return None if the object does not describe its type.
+        """
+        try:
+            impl = object.getImplementationName()
+            services = tuple(sorted(object.getSupportedServiceNames()))
+            interfaces = tuple(sorted(t.typeName for t in object.getTypes()))
+        except Exception:
+            return None
+        return impl, services, interfaces
+
+    def _metadata(self, object):
+        """Static metadata of the object type
+
+        Return (properties, methods): properties is a tuple of (name, type),
+        methods is a tuple of (name, parameter signature).
+        """
+        key = self._typeKey(object)
+        if key is not None:
+            meta = self.cache.get(key)
+            if meta is not None:
+                return meta
+
+        properties = ()
+        methods = ()
+        try:
+            inspector = self.introspection.inspect(_core._unwrap(object))
+            properties = tuple((str(p.Name), _type_to_str(p.Type))
+                               for p in inspector.getProperties(_PROPERTY_CONCEPT_ALL))
+            M = []
+            for method in inspector.getMethods(_METHOD_CONCEPT_ALL):
+                args = method.ParameterTypes
+                infos = method.ParameterInfos
+                params = "("
+                for i in range(0, len(args)):
+                    params = params + _mode_to_str(infos[i].aMode) + " " + str(args[i].Name) + " " + str(infos[i].aName) + ", "
+                params = params + ")"
+                M.append((str(method.Name), params))
+            methods = tuple(M)
+        except:
+            # not cached, a failed introspection may succeed next time
+            return properties, methods
+
+        meta = (properties, methods)
+        if key is not None:
+            self.cache.put(key, meta)
+        return meta
+
+    def cacheStats(self):
+        """Return hit, miss and size counters of the introspection cache
+        """
+        return self.cache.stats()
+
+    def _propertyValues(self, object, names):
+        """Fetch values of names, one getPropertyValues call if possible
+
+        Values of properties which can not be read are _NO_VALUE.
+        """
+        if not names:
+            return []
+        if hasattr(object, 'getPropertyValues'):
+            # XMultiPropertySet wants the names sorted, unsorted ones may come back void
+            order = sorted(range(len(names)), key=names.__getitem__)
+            try:
+                values = object.getPropertyValues(tuple(names[i] for i in order))
+                if len(values) == len(names):
+                    result = [None] * len(names)
+                    for i, value in zip(order, values):
+                        result[i] = value
+                    return result
+            except:
+                # one property throws, read them one by one
+                pass
+        values = []
+        for name in names:
+            try:
+                values.append(object.getPropertyValue(name))
+            except:
+                values.append(_NO_VALUE)
+        return values
+
+    def _inspectProperties(self, object, item=None, values=True, meta=None):
+        """Inspect properties
+
+        :param object: Inspect this object
+        :param item: Inspect only these names
+        :param values: Fetch property values
+        :param meta: Metadata from _metadata(object), looked up if None
+
+        Return list of InspectedMember
+        """
+        meta = meta or self._metadata(object)
+        properties = [(n, typ) for n, typ in meta[0] if item is None or n in item]
+        if not values:
+            return [InspectedMember(n, typ) for n, typ in properties]
+
+        names = [n for n, typ in properties]
+        return [InspectedMember(n, typ, v) for (n, typ), v in zip(properties, self._propertyValues(object, names))]
+
+    def _inspectMethods(self, object, item=None, meta=None):
+        """Inspect methods
+
+        :param object: Inspect this object
+        :param item: Inspect only these names
+        :param meta: Metadata from _metadata(object), looked up if None
+
+        Return list of InspectedMember
+        """
+        meta = meta or self._metadata(object)
+        return [InspectedMember(m_name, 'PyUNO_callable', params)
+                for m_name, params in meta[1]
+                if item is None or m_name in item]
+
+
+    def callMRI(self, object=None):
+        """Create an instance of MRI inspector and inspect the given object
+        
+        :param object: Inspect this object
+        """
+        try:
+            if not object:
+                object = self.desktop.getCurrentComponent().getSelection()
+            mri = self.ctx.ServiceManager.createInstance("mytools.Mri")
+            mri.inspect(_core._unwrap(object))
+        except:
+            raise RuntimeException("\n MRI is not installed", self.ctx)
+
+    def inspect(self, object, item=None, console='no', values=True):
+        """Inspect object
+
+        :param object: Inspect this object
+        :param item: Limited list of properties an methods to inspect
+        :param console: Print result to console
+        :param values: Fetch property values, False returns only names and types
+
+        Return properties and methods as InspectionResult, a dict
+        of name to {'type': ..., 'repr': ...}
+        """
+        if item is not None:
+            item = set(item)
+        meta = self._metadata(object)
+        p = self._inspectProperties(object, item, values, meta)
+        m = self._inspectMethods(object, item, meta)
+        
+        context = InspectionResult(sorted(p, key=lambda r: r.name) + sorted(m, key=lambda r: r.name))
+                    
+        if console == 'no':
+            return context
+        
+        if console == 'yes':
+            for key, value in sorted(context.items()):
+                t = value.type
+                r = value.repr or ''
+                print('{:<35}'.format(key) +  '{:<35}'.format(t) + r)
+
+
+    def _children(self, object, skip):
+        """Yield (name, child) for object valued properties and container elements"""
+        names = [n for n, typ in self._metadata(object)[0] if n not in skip]
+        for name, v in zip(names, self._propertyValues(object, names)):
+            if _is_uno_object(v):
+                yield name, v
+        try:
+            if hasattr(object, 'getByIndex'):
+                for i in range(object.getCount()):
+                    v = object.getByIndex(i)
+                    if _is_uno_object(v):
+                        yield str(i), v
+            elif hasattr(object, 'getElementNames'):
+                for n in object.getElementNames():
+                    v = object.getByName(n)
+                    if _is_uno_object(v):
+                        yield n, v
+        except:
+            pass
+
+    def walk(self, root, max_depth=3, max_nodes=10000, skip=_WALK_SKIP, jsonl=None, progress=None):
+        """Walk the object graph below root, yield a WalkNode per object
+
+        :param root: Start object
+        :param max_depth: Do not descend deeper than this
+        :param max_nodes: Stop after this many objects
+        :param skip: Property names which are not followed
+        :param jsonl: Path or open text file, write each node as a JSON line
+        :param progress: Callable, called with the number of visited objects every 100 nodes
+
+        Object valued properties and XIndexAccess/XNameAccess elements are
+        followed depth first, objects already seen are not visited again.
+        Nodes are yielded, not collected. Memory holds the visited objects,
+        at most max_nodes, and the not yet visited siblings along the
+        current path.
+
+        Usage:
+        for node in insp.walk(document, max_depth=2):
+            print(node.path, node.implementation)
+        """
+        out = None
+        own = False
+        if jsonl is not None:
+            if hasattr(jsonl, 'write'):
+                out = jsonl
+            else:
+                out = open(jsonl, 'w', encoding='utf-8')
+                own = True
+        skip = frozenset(skip)
+        seen = set()
+        visited = 0
+        stack = [('', 0, root)]
+        try:
+            while stack and visited < max_nodes:
+                path, depth, object = stack.pop()
+                try:
+                    if object in seen:
+                        continue
+                    seen.add(object)
+                except TypeError:
+                    # object is not hashable, rely on max_depth
+                    pass
+                try:
+                    implementation = object.getImplementationName()
+                except:
+                    implementation = ''
+                count = None
+                if hasattr(object, 'getCount'):
+                    try:
+                        count = object.getCount()
+                    except:
+                        pass
+                node = WalkNode(path or '/', depth, implementation, count)
+                visited += 1
+                if out is not None:
+                    out.write(json.dumps(node._asdict()) + '\n')
+                if progress is not None and visited % 100 == 0:
+                    progress(visited)
+                yield node
+                if depth < max_depth:
+                    children = list(self._children(object, skip))
+                    for name, child in reversed(children):
+                        stack.append((path + '/' + name, depth + 1, child))
+        finally:
+            if own:
+                out.close()
+
+    def exportApiIndex(self, path, module="com.sun.star"):
+        """Write services, interfaces, methods, properties and constants to an index file
+
+        :param path: SQLite file, overwritten
+        :param module: Export types below this module
+
+        The index is searched offline with unoapi.UnoApiIndex.
+        Return number of exported types.
+        """
+        UnoApiIndex = _core._submodule('unoapi').UnoApiIndex
+
+        tdm = self.ctx.getValueByName('/singletons/com.sun.star.reflection.theTypeDescriptionManager')
+        kinds = {'SERVICE': 'service', 'INTERFACE': 'interface', 'CONSTANTS': 'constants',
+                 'ENUM': 'enum', 'STRUCT': 'struct', 'EXCEPTION': 'exception'}
+        classes = tuple(uno.Enum("com.sun.star.uno.TypeClass", k) for k in kinds)
+        depth = uno.Enum("com.sun.star.reflection.TypeDescriptionSearchDepth", "INFINITE")
+        tdenum = tdm.createTypeDescriptionEnumeration(module, classes, depth)
+
+        rows = {'types': [], 'methods': [], 'properties': [], 'constants': [], 'interfaces': []}
+        while tdenum.hasMoreElements():
+            td = tdenum.nextTypeDescription()
+            name = td.getName()
+            kind = kinds[td.getTypeClass().value]
+            rows['types'].append((name, name.rsplit('.', 1)[-1], kind))
+            if kind == 'interface':
+                for member in td.getMembers():
+                    m_name = member.getMemberName()
+                    if member.getTypeClass().value == 'INTERFACE_METHOD':
+                        params = "("
+                        for param in member.getParameters():
+                            mode = "[inout]" if param.isIn() and param.isOut() else "[out]" if param.isOut() else "[in]"
+                            params = params + mode + " " + param.getType().getName() + " " + param.getName() + ", "
+                        params = params + ")"
+                        rows['methods'].append((name, m_name, member.getReturnType().getName(), params))
+                    else:
+                        rows['properties'].append((name, m_name, member.getType().getName()))
+            elif kind == 'service':
+                for prop in td.getProperties():
+                    rows['properties'].append((name, prop.getName().rsplit('.', 1)[-1], prop.getPropertyTypeDescription().getName()))
+                if td.isSingleInterfaceBased():
+                    rows['interfaces'].append((name, td.getInterface().getName()))
+                else:
+                    for iface in td.getMandatoryInterfaces() + td.getOptionalInterfaces():
+                        rows['interfaces'].append((name, iface.getName()))
+            elif kind == 'constants':
+                for const in td.getConstants():
+                    rows['constants'].append((name, const.getName().rsplit('.', 1)[-1], str(const.getConstantValue())))
+            elif kind == 'enum':
+                for e_name, e_value in zip(td.getEnumNames(), td.getEnumValues()):
+                    rows['constants'].append((name, e_name, str(e_value)))
+            else:
+                for s_name, s_type in zip(td.getMemberNames(), td.getMemberTypes()):
+                    rows['properties'].append((name, s_name, s_type.getName()))
+
+        index = UnoApiIndex.create(path)
+        try:
+            for table, table_rows in rows.items():
+                index.insert(table, table_rows)
+            index.finish()
+        finally:
+            index.close()
+        return len(rows['types'])
+
+    def showServiceDocs(self, object):
+        """Open browser to show service documentation
+        :param object:
+        """
+        return self.documenter.showServiceDocs(object)
+
+    def showInterfaceDoc(self, object):
+        """Open browser to show interface documentation
+        :param object:
+        """
+        return self.documenter.showInterfaceDoc(object)
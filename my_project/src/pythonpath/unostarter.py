@@ -18,57 +18,117 @@
 # License along with this library; if not, write to the Free Software
 # Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301  USA
 
+import collections
+import contextlib
+import importlib
+import itertools
+import os
+import sys
+import threading
+import time
 import uno
-import unohelper
-from com.sun.star.awt import XActionListener
-from com.sun.star.task import XJobExecutor
 from com.sun.star.uno import RuntimeException
 from com.sun.star.connection import NoConnectException
-from com.sun.star.awt.MessageBoxType import \
-    MESSAGEBOX as _MESSAGEBOX, \
-    INFOBOX as _INFOBOX, \
-    WARNINGBOX as _WARNINGBOX, \
-    ERRORBOX as ERRORBOX, \
-    QUERYBOX as QUERYBOX
-from com.sun.star.awt.MessageBoxButtons import \
-    BUTTONS_OK as _BUTTONS_OK, \
-    BUTTONS_OK_CANCEL as _BUTTONS_OK_CANCEL, \
-    BUTTONS_YES_NO as BUTTONS_YES_NO, \
-    BUTTONS_YES_NO_CANCEL as _BUTTONS_YES_NO_CANCEL, \
-    BUTTONS_RETRY_CANCEL as _BUTTONS_RETRY_CANCEL, \
-    BUTTONS_ABORT_IGNORE_RETRY as _BUTTONS_ABORT_IGNORE_RETRY
-from com.sun.star.awt.MessageBoxButtons import \
-    DEFAULT_BUTTON_OK as _DEFAULT_BUTTON_OK, \
-    DEFAULT_BUTTON_CANCEL as _DEFAULT_BUTTON_CANCEL, \
-    DEFAULT_BUTTON_RETRY as _DEFAULT_BUTTON_RETRY, \
-    DEFAULT_BUTTON_YES as _DEFAULT_BUTTON_YES, \
-    DEFAULT_BUTTON_NO as _DEFAULT_BUTTON_NO, \
-    DEFAULT_BUTTON_IGNORE as _DEFAULT_BUTTON_IGNORE
-from com.sun.star.beans.MethodConcept import \
-    ALL as _METHOD_CONCEPT_ALL
-from com.sun.star.beans.PropertyConcept import \
-    ALL as _PROPERTY_CONCEPT_ALL
-from com.sun.star.reflection.ParamMode import \
-    IN as _PARAM_MODE_IN, \
-    OUT as _PARAM_MODE_OUT, \
-    INOUT as _PARAM_MODE_INOUT
+from com.sun.star.lang import DisposedException
+from com.sun.star.text.ControlCharacter import \
+    PARAGRAPH_BREAK as _PARAGRAPH_BREAK
+
+# output extension for common export filters
+_FILTER_EXTENSIONS = {
+    'writer_pdf_Export': 'pdf', 'calc_pdf_Export': 'pdf', 'impress_pdf_Export': 'pdf', 'draw_pdf_Export': 'pdf',
+    'writer8': 'odt', 'calc8': 'ods', 'impress8': 'odp', 'draw8': 'odg',
+    'MS Word 2007 XML': 'docx', 'MS Word 97': 'doc', 'Calc MS Excel 2007 XML': 'xlsx', 'MS Excel 97': 'xls',
+    'Impress MS PowerPoint 2007 XML': 'pptx', 'Text': 'txt', 'Text (encoded)': 'txt', 'Text - txt - csv (StarCalc)': 'csv',
+    'HTML (StarWriter)': 'html', 'Rich Text Format': 'rtf',
+}
+
+ConversionResult = collections.namedtuple('ConversionResult', 'path output error load_time store_time')
+
+TransferProgress = collections.namedtuple('TransferProgress', 'rows seconds rows_per_second')
+
+ReplaceRule = collections.namedtuple('ReplaceRule', 'search replace regex case_sensitive words',
+                                     defaults=(False, False, False))
+
+# cells per getDataArray/setDataArray call
+_CALC_BLOCK_CELLS = 65536
 
 # change if needed
 _HOST = 'localhost'
 _PORT = 2002
-
-__all__ = ['Office', 'Gui', 'Inspector']
+# user profile initialised once and cloned for every launched office, in the user's cache directory
+_PROFILE_TEMPLATE = os.path.join(os.environ.get('XDG_CACHE_HOME') or os.environ.get('LOCALAPPDATA')
+                                 or os.path.join(os.path.expanduser('~'), '.cache'), 'unostarter', 'profile')
+# documents kept loaded by Office.open_document
+_DOCUMENT_CACHE_SIZE = 8
+_DOCUMENT_CACHE_MEMORY = 512 * 1024 * 1024
+# loaded document size estimated as file size times this
+_DOCUMENT_MEMORY_FACTOR = 8
+
+__all__ = ['Office', 'OfficePool', 'CalcData', 'WriterBuilder', 'Gui', 'Inspector']
+
+# names loaded on first access from the submodule holding them
+_LAZY = {
+    'unogui': ('SimpleDialog', 'SelectBoxClass', 'SearchBoxClass', 'OptionBoxClass', 'TextBoxClass',
+               'NumberBoxClass', 'DateBoxClass', 'MessageBoxWizardClass', 'Gui', 'ERRORBOX', 'QUERYBOX',
+               'BUTTONS_YES_NO'),
+    'unoinspect': ('Inspector', 'InspectionResult', 'InspectedMember', 'WalkNode'),
+}
+_LAZY_NAMES = {name: module for module, names in _LAZY.items() for name in names}
+
+
+def _submodule(module):
+    """Import a unostarter submodule under the same package as this module"""
+    package = __name__.rpartition('.')[0]
+    return importlib.import_module(package + '.' + module if package else module)
+
+
+def __getattr__(name):
+    module = _LAZY_NAMES.get(name)
+    if module is None:
+        raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+    value = getattr(_submodule(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_NAMES))
+
+
+def _make_props(**kwargs):
+    """Build a tuple of PropertyValue structs from keyword arguments"""
+    props = []
+    for name, value in kwargs.items():
+        prop = uno.createUnoStruct("com.sun.star.beans.PropertyValue")
+        prop.Name = name
+        prop.Value = value
+        props.append(prop)
+    return tuple(props)
+
+
+def _close_component(component):
+    """Close a loaded component, dispose it if it can not be closed"""
+    if component is None:
+        return
+    try:
+        component.close(True)
+    except Exception:
+        try:
+            component.dispose()
+        except Exception:
+            pass
 
 
-def _mode_to_str(mode):
-    ret = "[]"
-    if mode == PARAM_MODE_INOUT:
-        ret = "[inout]"
-    elif mode == PARAM_MODE_OUT:
-        ret = "[out]"
-    elif mode == PARAM_MODE_IN:
-        ret = "[in]"
-    return ret
+def _cell_value(value):
+    """Convert a Python value to a value accepted by setDataArray"""
+    if isinstance(value, float):
+        # NaN marks a missing value, written as an empty cell
+        return value if value == value else ''
+    if isinstance(value, int) and not isinstance(value, bool):
+        return float(value)
+    if value is None:
+        return ''
+    return str(value)
 
 
 def _get_connection_url(host, port, pipe=None):
@@ -79,13 +139,97 @@ def _get_connection_url(host, port, pipe=None):
     return 'uno:{};urp;StarOffice.ComponentContext'.format(connection)
 
 
-def ConnectOffice(host=_HOST, port=_PORT, pipe=None, context=None):
+class _ConnectionRegistry:
+    """Process-wide cache of remote component contexts
+
+    Contexts are keyed by the connection url. A cached context is checked
+    with a single remote call before it is reused, a dead one is dropped
+    and the office is resolved again. Remote calls are made under a lock
+    per url, so a slow connect does not hold up other urls.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._urlLocks = {}
+        self._contexts = {}
+        self.hits = 0
+        self.misses = 0
+        self.reconnects = 0
+
+    def _isAlive(self, ctx):
+        if _tracer is not None:
+            # a bridge call of whoever asked for the connection
+            ctx = _tracer.wrap(ctx, 'ctx')
+        try:
+            ctx.getServiceManager()
+            return True
+        except (DisposedException, RuntimeException):
+            return False
+        except Exception:
+            # bridge torn down, pyuno raises plain exceptions here
+            return False
+
+    def _resolve(self, url):
+        localContext = uno.getComponentContext()
+        resolver = localContext.ServiceManager.createInstanceWithContext("com.sun.star.bridge.UnoUrlResolver", localContext)
+        return resolver.resolve(url)
+
+    def get(self, url):
+        """Return a live context for url, connect if needed
+
+        Raise NoConnectException if the office is not listening.
+        """
+        with self._lock:
+            urlLock = self._urlLocks.setdefault(url, threading.Lock())
+        with urlLock:
+            with self._lock:
+                ctx = self._contexts.get(url)
+            if ctx is not None:
+                if self._isAlive(ctx):
+                    with self._lock:
+                        self.hits += 1
+                    return ctx
+                with self._lock:
+                    self._contexts.pop(url, None)
+                    self.reconnects += 1
+            else:
+                with self._lock:
+                    self.misses += 1
+            ctx = self._resolve(url)
+            with self._lock:
+                self._contexts[url] = ctx
+            return ctx
+
+    def register(self, url, ctx):
+        """Cache ctx resolved by the caller, counted as one miss"""
+        with self._lock:
+            self.misses += 1
+            self._contexts[url] = ctx
+
+    def discard(self, url=None):
+        """Forget cached context for url, or all contexts"""
+        with self._lock:
+            if url is None:
+                self._contexts.clear()
+            else:
+                self._contexts.pop(url, None)
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses,
+                    'reconnects': self.reconnects, 'connections': len(self._contexts)}
+
+
+_connections = _ConnectionRegistry()
+
+
+def ConnectOffice(host=_HOST, port=_PORT, pipe=None, context=None, cache=True):
     """Connect LibreOffice
     
     :param host: connect via socket, default 'localhost'
     :param port: connect via socket, default 2002
     :param pipe: connect via pipe, default None
     :param context: custom context, default None
+    :param cache: reuse the process-wide connection, default True
     
     Start office:
     soffice "--accept=socket,host=localhost,port=2002;urp;StarOffice.ComponentContext" --writer --norestore
@@ -99,8 +243,11 @@ def ConnectOffice(host=_HOST, port=_PORT, pipe=None, context=None):
         try:
             # LibreOffice is started as an OS process, remote connection
             url = _get_connection_url(host, port, pipe)
-            remote = localContext.ServiceManager.createInstanceWithContext("com.sun.star.bridge.UnoUrlResolver", localContext)
-            conn = remote.resolve(url)
+            if cache:
+                conn = _connections.get(url)
+            else:
+                remote = localContext.ServiceManager.createInstanceWithContext("com.sun.star.bridge.UnoUrlResolver", localContext)
+                conn = remote.resolve(url)
         except NoConnectException:
             # Connection inside the Office
             conn = localContext
@@ -109,9 +256,270 @@ def ConnectOffice(host=_HOST, port=_PORT, pipe=None, context=None):
             conn = context
         except:
             print('Error: no context')
+    if _tracer is not None:
+        conn = _tracer.wrap(conn, 'ctx')
     return conn
 
 
+def getConnectionStats():
+    """Return hit, miss and reconnect counters of the cached connections
+    """
+    return _connections.stats()
+
+
+def resetConnections(host=_HOST, port=_PORT, pipe=None):
+    """Drop the cached connection, the next ConnectOffice call reconnects
+    """
+    _connections.discard(_get_connection_url(host, port, pipe))
+
+
+# -----------------------------------------------------------
+#               TRACING
+# -----------------------------------------------------------
+
+class Tracer:
+    """Count and time bridge calls made through traced UNO objects
+
+    Every method call and attribute get/set on a traced object is
+    recorded with the object label, wall time and the call site in the
+    calling script. Objects are labelled by the service they were
+    created from, or by the attribute or method which returned them.
+    With implementation_names=True the label is the implementation name,
+    at the cost of one untraced extra call per object.
+
+    Usage:
+    with tracing() as tracer:
+        office = Office()
+        ...
+    print(tracer.report())
+    """
+    def __init__(self, loop_threshold=20, implementation_names=False):
+        """
+        :param loop_threshold: calls of one member from one call site reported as N+1 pattern
+        :param implementation_names: label objects with their implementation name
+        """
+        self.loop_threshold = loop_threshold
+        self.implementation_names = implementation_names
+        self._lock = threading.Lock()
+        self.records = {}
+
+    def reset(self):
+        with self._lock:
+            self.records.clear()
+
+    def wrap(self, obj, label):
+        """Return a traced proxy for a pyuno object, other values unchanged"""
+        if isinstance(obj, _TracedObject) or type(obj).__name__ != 'pyuno':
+            return obj
+        if self.implementation_names:
+            try:
+                label = obj.getImplementationName()
+            except Exception:
+                pass
+        return _TracedObject(obj, self, label)
+
+    def _wrapResult(self, value, label):
+        if isinstance(value, tuple):
+            return tuple(self._wrapResult(v, label) for v in value)
+        return self.wrap(value, label)
+
+    def record(self, label, member, kind, seconds):
+        key = (label, member, kind, _call_site())
+        with self._lock:
+            entry = self.records.get(key)
+            if entry is None:
+                self.records[key] = [1, seconds]
+            else:
+                entry[0] += 1
+                entry[1] += seconds
+
+    @property
+    def calls(self):
+        """Total number of recorded bridge calls"""
+        with self._lock:
+            return sum(entry[0] for entry in self.records.values())
+
+    def summary(self, top=20):
+        """Hottest calls, list of dicts sorted by total time"""
+        with self._lock:
+            rows = [{'object': label, 'member': member, 'kind': kind, 'site': site,
+                     'calls': entry[0], 'seconds': entry[1]}
+                    for (label, member, kind, site), entry in self.records.items()]
+        rows.sort(key=lambda r: r['seconds'], reverse=True)
+        return rows[:top] if top else rows
+
+    def suspects(self):
+        """Calls repeated at one call site at least loop_threshold times, likely N+1 patterns"""
+        rows = [r for r in self.summary(top=None) if r['calls'] >= self.loop_threshold]
+        rows.sort(key=lambda r: r['calls'], reverse=True)
+        return rows
+
+    def report(self, top=20):
+        """Text report of the hottest calls and N+1 suspects"""
+        lines = ['{} bridge calls'.format(self.calls), '']
+        line = '{:>8} {:>10}  {:<35} {:<30} {}'
+        lines.append(line.format('calls', 'ms', 'object', 'member', 'site'))
+        for r in self.summary(top):
+            lines.append(line.format(r['calls'], '{:.1f}'.format(r['seconds'] * 1000), r['object'][-35:],
+                                     r['kind'] + ' ' + r['member'], r['site']))
+        suspects = self.suspects()
+        if suspects:
+            lines.append('')
+            lines.append('Possible N+1 patterns, batch these calls:')
+            for r in suspects:
+                lines.append('  {} x {} {} at {}'.format(r['calls'], r['kind'], r['member'], r['site']))
+        return '\n'.join(lines)
+
+
+# source files of this module and its submodules, skipped by _call_site
+_OWN_FILES = frozenset(os.path.join(os.path.dirname(__file__), name + '.py') for name in ('unostarter',) + tuple(_LAZY))
+
+
+def _call_site():
+    """file:line of the first frame outside this module and its submodules"""
+    frame = sys._getframe(2)
+    while frame is not None and frame.f_code.co_filename in _OWN_FILES:
+        frame = frame.f_back
+    if frame is None:
+        return '?'
+    return '{}:{}'.format(os.path.basename(frame.f_code.co_filename), frame.f_lineno)
+
+
+def _unwrap(value):
+    """The pyuno objects behind traced proxies, pyuno can not convert the proxies"""
+    if isinstance(value, _TracedObject):
+        return object.__getattribute__(value, '_obj')
+    if isinstance(value, (tuple, list)):
+        return type(value)(_unwrap(v) for v in value)
+    return value
+
+
+def _invoke(obj, method, args):
+    """uno.invoke which also accepts traced objects"""
+    if isinstance(obj, _TracedObject):
+        return obj._invoke(method, args)
+    return uno.invoke(obj, method, _unwrap(args))
+
+
+class _TracedObject:
+    """Thin proxy around a pyuno object which reports to a Tracer"""
+    __slots__ = ('_obj', '_tracer', '_label')
+
+    def __init__(self, obj, tracer, label):
+        object.__setattr__(self, '_obj', obj)
+        object.__setattr__(self, '_tracer', tracer)
+        object.__setattr__(self, '_label', label)
+
+    def __getattr__(self, name):
+        start = time.perf_counter()
+        value = getattr(self._obj, name)
+        if callable(value):
+            return self._method(name, value)
+        self._tracer.record(self._label, name, 'get', time.perf_counter() - start)
+        return self._tracer._wrapResult(value, name)
+
+    def __setattr__(self, name, value):
+        start = time.perf_counter()
+        setattr(self._obj, name, _unwrap(value))
+        self._tracer.record(self._label, name, 'set', time.perf_counter() - start)
+
+    def _method(self, name, method):
+        tracer = self._tracer
+        label = self._label
+
+        def call(*args):
+            start = time.perf_counter()
+            try:
+                result = method(*_unwrap(args))
+            finally:
+                tracer.record(label, name, 'call', time.perf_counter() - start)
+            if name.startswith('createInstance') and args and isinstance(args[0], str):
+                return tracer._wrapResult(result, args[0])
+            return tracer._wrapResult(result, label + '.' + name + '()')
+        return call
+
+    def _invoke(self, method, args):
+        start = time.perf_counter()
+        try:
+            return uno.invoke(self._obj, method, _unwrap(args))
+        finally:
+            self._tracer.record(self._label, method, 'call', time.perf_counter() - start)
+
+    def _protocol(self, name, func, *args):
+        """Container protocol of pyuno, counted as one call"""
+        start = time.perf_counter()
+        try:
+            return func(*_unwrap(args))
+        finally:
+            self._tracer.record(self._label, name, 'call', time.perf_counter() - start)
+
+    def __len__(self):
+        return self._protocol('__len__', len, self._obj)
+
+    def __contains__(self, item):
+        return self._protocol('__contains__', self._obj.__contains__, item)
+
+    def __getitem__(self, key):
+        value = self._protocol('__getitem__', self._obj.__getitem__, key)
+        return self._tracer._wrapResult(value, self._label + '[]')
+
+    def __iter__(self):
+        for value in self._protocol('__iter__', iter, self._obj):
+            yield self._tracer.wrap(value, self._label + '[]')
+
+    def __eq__(self, other):
+        return self._obj == _unwrap(other)
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __hash__(self):
+        return hash(self._obj)
+
+    def __repr__(self):
+        return '<traced {!r}>'.format(self._obj)
+
+
+_tracer = None
+
+
+def startTracing(tracer=None):
+    """Trace objects returned by ConnectOffice, Office and Inspector from now on
+
+    Return the active Tracer.
+    """
+    global _tracer
+    _tracer = tracer or Tracer()
+    return _tracer
+
+
+def stopTracing():
+    """Stop tracing new objects, return the Tracer which was active"""
+    global _tracer
+    tracer, _tracer = _tracer, None
+    return tracer
+
+
+@contextlib.contextmanager
+def tracing(tracer=None):
+    """Trace bridge calls inside a with block
+
+    Usage:
+    with tracing() as tracer:
+        Gui.OptionBox(choices=items)
+    print(tracer.report())
+    """
+    previous = _tracer
+    tracer = startTracing(tracer)
+    try:
+        yield tracer
+    finally:
+        if previous is not None:
+            startTracing(previous)
+        else:
+            stopTracing()
+
+
 # ===========================================================
 #               OFFICE
 # ===========================================================
@@ -122,9 +530,66 @@ class Office:
     def __init__(self, context=None):
         
         if context:
-            self.ctx = context
+            self.ctx = context if _tracer is None else _tracer.wrap(context, 'ctx')
         else:
             self.ctx = ConnectOffice()
+        # set by launch(), the office process owned by this object
+        self._worker = None
+        self._base_dir = None
+        self.startupTime = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.shutdown()
+
+    @classmethod
+    def launch(cls, soffice='soffice', template=_PROFILE_TEMPLATE, timeout=60):
+        """Start a headless office process owned by the returned Office
+
+        :param soffice: office executable
+        :param template: pre-initialised user profile which is cloned for the new process,
+                         created on first use; None starts with an empty profile
+        :param timeout: seconds to wait until the office accepts connections
+
+        The time from start to the first usable context is in startupTime.
+
+        Usage:
+        with Office.launch() as office:
+            doc = office.getDesktop().loadComponentFromURL(...)
+        """
+        import shutil
+        import tempfile
+
+        if template is not None:
+            prepareProfile(template, soffice, timeout)
+        base_dir = tempfile.mkdtemp(prefix='unostarter_')
+        worker = _OfficeWorker(0, soffice, base_dir, template)
+        try:
+            ctx = worker.start(timeout)
+        except:
+            shutil.rmtree(base_dir, ignore_errors=True)
+            raise
+        office = cls(ctx)
+        office._worker = worker
+        office._base_dir = base_dir
+        office.startupTime = worker.startupTime
+        return office
+
+    def shutdown(self, timeout=10):
+        """Terminate the office started by launch() and remove its profile
+
+        Does nothing for an office which was not launched by this object.
+        """
+        import shutil
+
+        if self._worker is None:
+            return
+        self._worker.stop(timeout)
+        self._worker = None
+        shutil.rmtree(self._base_dir, ignore_errors=True)
+        self._base_dir = None
 
     def getContext(self):
         """Get access to the component context
@@ -198,663 +663,1358 @@ class Office:
         """
         return uno.fileUrlToSystemPath(url)
 
-# -----------------------------------------------------------
-#               GUI CLASSES
-# -----------------------------------------------------------
-
-
-class SimpleDialog(unohelper.Base, XActionListener, XJobExecutor):
-    """
-    Class documentation...
-    """
-    def __init__(self, nPositionX=None, nPositionY=None, nWidth=None, nHeight=None, sTitle=None):
-        self.ctx = ConnectOffice()
-        self.ServiceManager = self.ctx.ServiceManager
-        self.Toolkit = self.ServiceManager.createInstanceWithContext("com.sun.star.awt.ExtToolkit", self.ctx)
-          #
-        # --------------create dialog container and set model and properties
-        self.DialogContainer = self.ServiceManager.createInstanceWithContext("com.sun.star.awt.UnoControlDialog", self.ctx)
-        self.DialogModel = self.ServiceManager.createInstance("com.sun.star.awt.UnoControlDialogModel")
-        self.DialogContainer.setModel(self.DialogModel)
-        self.DialogModel.PositionX = nPositionX
-        self.DialogModel.PositionY = nPositionY
-        self.DialogModel.Height = nHeight
-        self.DialogModel.Width = nWidth
-        self.DialogModel.Name = "Default"
-        self.DialogModel.Closeable = True
-        self.DialogModel.Moveable = True
-
-    def addControl(self, sAwtName, sControlName, dProps):
-        oControlModel = self.DialogModel.createInstance("com.sun.star.awt.UnoControl" + sAwtName + "Model")
-        while dProps:
-            prp = dProps.popitem()
-            uno.invoke(oControlModel, "setPropertyValue", (prp[0], prp[1]))
-            oControlModel.Name = sControlName
-        self.DialogModel.insertByName(sControlName, oControlModel)
-        if sAwtName == "Button":
-            self.DialogContainer.getControl(sControlName).addActionListener(self)
-            self.DialogContainer.getControl(sControlName).setActionCommand(sControlName + '_OnClick')
-        return oControlModel
-
-    def showDialog(self):
-        self.DialogContainer.setVisible(True)
-        self.DialogContainer.createPeer(self.Toolkit, None)
-        self.DialogContainer.execute()
-
-
-class SelectBoxClass(SimpleDialog):
-    """
-    Class documentation...
-    """
-    def __init__(self, message="Select one item", title="SelectBox", choices=None):
-        SimpleDialog.__init__(self, nPositionX=60, nPositionY=60, nWidth=100, nHeight=55, sTitle=None)
+    @contextlib.contextmanager
+    def bulk_edit(self, document=None, undo=None, undo_title="Bulk edit"):
+        """Suspend repaint, action handling and auto recalculation during mass edits
 
-        if choices is None:
-            choices = ['a', 'b', 'c']
+        :param document: document to edit, default current document
+        :param undo: None keeps undo recording, 'lock' disables it, 'context' groups all changes in one undo action
+        :param undo_title: title of the undo action for undo='context'
 
-        self.DialogModel.Title = title
+        Everything is restored on exit, also after an exception. Scopes may
+        be nested. The yielded dict holds the time the scope was held in
+        'elapsed' after exit.
 
-        dMessage = {"PositionY": 5, "PositionX": 5, "Height": 15, "Width": 90, "Label": message,}
-        self.lbMessage = self.addControl("FixedText", "lbMessage", dMessage)
+        Usage:
+        with office.bulk_edit(doc) as scope:
+            ...
+        print(scope['elapsed'])
+        """
+        doc = document or self.getDocument()
+        scope = {'elapsed': None}
+        undo_manager = None
+        auto_calc = None
+        start = time.perf_counter()
+        doc.lockControllers()
+        try:
+            if hasattr(doc, 'addActionLock'):
+                doc.addActionLock()
+            try:
+                if hasattr(doc, 'enableAutomaticCalculation'):
+                    auto_calc = doc.isAutomaticCalculationEnabled()
+                    if auto_calc:
+                        doc.enableAutomaticCalculation(False)
+                try:
+                    if undo is not None:
+                        undo_manager = doc.getUndoManager()
+                        if undo == 'lock':
+                            undo_manager.lock()
+                        else:
+                            undo_manager.enterUndoContext(undo_title)
+                    try:
+                        yield scope
+                    finally:
+                        if undo_manager is not None:
+                            if undo == 'lock':
+                                undo_manager.unlock()
+                            else:
+                                undo_manager.leaveUndoContext()
+                finally:
+                    if auto_calc:
+                        doc.enableAutomaticCalculation(True)
+            finally:
+                if hasattr(doc, 'removeActionLock'):
+                    doc.removeActionLock()
+        finally:
+            doc.unlockControllers()
+            scope['elapsed'] = time.perf_counter() - start
+
+    def _loadHidden(self, desktop, path):
+        start = time.perf_counter()
+        url = self.filePathToUrl(os.path.abspath(path))
+        doc = desktop.loadComponentFromURL(url, "_blank", 0, _make_props(Hidden=True))
+        if doc is None:
+            raise RuntimeException("\n Can not load {}".format(path), self.ctx)
+        return doc, time.perf_counter() - start
+
+    def convert_many(self, paths, filter, out_dir, extension=None, prefetch=1):
+        """Convert documents, yield a ConversionResult as each file finishes
+
+        :param paths: iterable of input file paths
+        :param filter: export filter name, "writer_pdf_Export"
+        :param out_dir: output directory
+        :param extension: output extension, default guessed from filter
+        :param prefetch: number of documents loaded ahead in a background thread, 0 disables
+
+        Documents are loaded hidden and always closed. Errors do not stop
+        the run, they are returned in ConversionResult.error. The output
+        name is the input name with the new extension, an input whose
+        output was already written by an earlier input is not converted.
+
+        Usage:
+        for r in office.convert_many(paths, "writer_pdf_Export", "/tmp/pdf"):
+            print(r.path, r.error, r.load_time, r.store_time)
+        """
+        import queue
+
+        extension = extension or _FILTER_EXTENSIONS.get(filter)
+        if not extension:
+            raise ValueError("No extension known for filter {!r}".format(filter))
+        desktop = self.getDesktop()
+        store_props = _make_props(FilterName=filter, Overwrite=True)
+        # output path -> input path, to not overwrite the output of another input
+        targets = {}
+
+        def load(path):
+            name = os.path.splitext(os.path.basename(path))[0] + '.' + extension
+            output = os.path.join(out_dir, name)
+            key = os.path.normcase(os.path.abspath(output))
+            if key in targets:
+                error = ValueError("Output {} is already written for {}".format(output, targets[key]))
+                return path, None, None, None, error
+            targets[key] = path
+            try:
+                doc, load_time = self._loadHidden(desktop, path)
+                return path, output, doc, load_time, None
+            except Exception as e:
+                return path, None, None, None, e
+
+        if prefetch > 0:
+            loaded = queue.Queue(maxsize=prefetch)
+            stop = threading.Event()
+
+            def put(item):
+                while not stop.is_set():
+                    try:
+                        loaded.put(item, timeout=0.1)
+                        return True
+                    except queue.Full:
+                        pass
+                return False
+
+            def loader():
+                try:
+                    for path in paths:
+                        if stop.is_set():
+                            return
+                        item = load(path)
+                        if not put(item):
+                            _close_component(item[2])
+                            return
+                except Exception as e:
+                    # iterating paths failed, handed to the caller
+                    put(e)
+                finally:
+                    put(None)
+
+            def received():
+                for item in iter(loaded.get, None):
+                    if isinstance(item, Exception):
+                        raise item
+                    yield item
+
+            thread = threading.Thread(target=loader, name='convert_many-prefetch', daemon=True)
+            thread.start()
+            items = received()
+        else:
+            items = (load(path) for path in paths)
 
-        dChoices = {"PositionY": 15, "PositionX": 5, "Height": 15, "Width": 90,"Dropdown": True,}
-        self.cbChoices = self.addControl("ComboBox", "cbChoices", dChoices)
-        self.cbChoices.StringItemList = tuple(choices)
+        try:
+            for path, output, doc, load_time, error in items:
+                store_time = None
+                if error is None:
+                    start = time.perf_counter()
+                    try:
+                        doc.storeToURL(self.filePathToUrl(os.path.abspath(output)), store_props)
+                        store_time = time.perf_counter() - start
+                    except Exception as e:
+                        error = e
+                        output = None
+                    finally:
+                        _close_component(doc)
+                yield ConversionResult(path, output, error, load_time, store_time)
+        finally:
+            if prefetch > 0:
+                # generator closed early, release documents already loaded
+                stop.set()
+                while thread.is_alive() or not loaded.empty():
+                    try:
+                        item = loaded.get(timeout=0.1)
+                    except queue.Empty:
+                        continue
+                    if isinstance(item, tuple):
+                        _close_component(item[2])
+
+    def importData(self, source, document=None, sheet=None, cell='A1', bulk=True, progress=None, **kwargs):
+        """Write a csv file, rows or a NumPy array to a Calc sheet with setDataArray in blocks
+
+        :param source: csv file path, iterable of row sequences or 2D NumPy array
+        :param document: Calc document, default current document
+        :param sheet: sheet name, index or object, default active sheet
+        :param cell: top left target cell, "A1"
+        :param bulk: lock controllers and suspend auto recalculation while writing
+        :param progress: callable receiving TransferProgress after each block
+
+        See CalcData.iterImport for the other options.
+        Return TransferProgress of the whole import.
+        """
+        return CalcData(document, self).importData(source, sheet, cell, bulk=bulk, progress=progress, **kwargs)
 
-        dOK = {"PositionY": 35, "PositionX": 30, "Height": 15, "Width": 30, "Label": "OK",}
-        self.btnOK = self.addControl("Button", "btnOK", dOK)
+    def replaceMany(self, rules, document=None, dry_run=False, undo_title="Replace"):
+        """Apply search and replace rules to a Writer document, one replaceAll call per rule
 
-        dCancel = {"PositionY": 35, "PositionX": 65, "Height": 15, "Width": 30, "Label": "Cancel",}
-        self.btnCancel = self.addControl("Button", "btnCancel", dCancel)
+        :param rules: sequence of ReplaceRule or tuples (search, replace, regex=False, case_sensitive=False, words=False)
+        :param document: document to edit, default current document
+        :param dry_run: count matches with findAll, the document is not changed
+        :param undo_title: all replacements are undone together under this title
 
-        self.returnValue = None
+        Rules are applied in order, later rules see the result of earlier ones.
+        Return list of match counts, one per rule.
 
-    def actionPerformed(self, oActionEvent):
-        if oActionEvent.ActionCommand == 'btnOK_OnClick':
-            self.returnValue = self.cbChoices.Text
-            self.DialogContainer.endExecute()
+        Usage:
+        counts = office.replaceMany([("colour", "color"), (" +$", "", True)])
+        """
+        doc = document or self.getDocument()
+        rules = [ReplaceRule(*rule) for rule in rules]
+        desc = doc.createReplaceDescriptor()
+        counts = []
+
+        def prepare(rule):
+            desc.setSearchString(rule.search)
+            desc.setReplaceString(rule.replace)
+            # search descriptors have XPropertySet only, no setPropertyValues
+            desc.SearchCaseSensitive = bool(rule.case_sensitive)
+            desc.SearchRegularExpression = bool(rule.regex)
+            desc.SearchWords = bool(rule.words)
+
+        if dry_run:
+            for rule in rules:
+                prepare(rule)
+                found = doc.findAll(desc)
+                counts.append(found.getCount() if found is not None else 0)
+            return counts
+        with self.bulk_edit(doc, undo='context', undo_title=undo_title):
+            for rule in rules:
+                prepare(rule)
+                counts.append(doc.replaceAll(desc))
+        return counts
+
+    def open_document(self, path, hidden=True, cache=True):
+        """Load a document, reuse it while the file is unchanged
+
+        :param path: file path
+        :param hidden: load without a visible window
+        :param cache: keep the document loaded for the next call, default True
+
+        Cached documents are shared, do not close them. They are closed
+        when evicted, see getDocumentCacheStats() and clearDocumentCache().
+        """
+        path = os.path.abspath(path)
+        url = self.filePathToUrl(path)
+        if not cache:
+            return self._loadDocument(url, hidden)
+        mtime = os.path.getmtime(path)
+        doc = _documents.get(url, hidden, self.ctx, mtime)
+        if doc is None:
+            doc = self._loadDocument(url, hidden)
+            _documents.put(url, hidden, self.ctx, mtime, doc, os.path.getsize(path) * _DOCUMENT_MEMORY_FACTOR)
+        return doc
+
+    def _loadDocument(self, url, hidden):
+        doc = self.getDesktop().loadComponentFromURL(url, "_blank", 0, _make_props(Hidden=hidden))
+        if doc is None:
+            raise RuntimeException("\n Can not load {}".format(url), self.ctx)
+        return doc
 
-        if oActionEvent.ActionCommand == 'btnCancel_OnClick':
-            self.DialogContainer.endExecute()
 
-    def returnValue(self):
-        pass
+# -----------------------------------------------------------
+#               DOCUMENT CACHE
+# -----------------------------------------------------------
 
+class _DocumentCache:
+    """LRU cache of loaded documents keyed by url and office
 
-class OptionBoxClass(SimpleDialog):
+    Every office (component context) has its own entries, so offices of a
+    pool never close each other's documents. An entry is reused while the
+    file mtime is unchanged and the document is alive. Stale and evicted
+    documents are closed. Memory use is estimated from the file size.
     """
-    Class documentation...
-    """
-    def __init__(self, message="Select multiple items", title="OptionBox", choices=['a', 'b', 'c']):
-        SimpleDialog.__init__(self, nPositionX=60, nPositionY=60, nWidth=135, nHeight=120, sTitle=None)
-        self.DialogModel.Title = title
-
-        dMessage = {"PositionY": 5, "PositionX": 5, "Height": 15, "Width": 110, "Label": message,}
-        self.lbMessage = self.addControl("FixedText", "lbMessage", dMessage)
-
-        dChoices = {"PositionY": 15, "PositionX": 5, "Height": 80, "Width": 125, "MultiSelection": True}
-        self.lbChoices = self.addControl("ListBox", "lbChoices", dChoices)
-        self.lbChoices.StringItemList = tuple(choices)
-
-        dSelectAll = {"PositionY": 100, "PositionX": 5, "Height": 15, "Width": 30, "Label": "Select All",}
-        self.btnSelectAll = self.addControl("Button", "btnSelectAll", dSelectAll)
-
-        dClearAll = {"PositionY": 100, "PositionX": 35, "Height": 15, "Width": 30, "Label": "Clear All",}
-        self.btnClearAll = self.addControl("Button", "btnClearAll", dClearAll)
-
-        dOK = {"PositionY": 100, "PositionX": 70, "Height": 15, "Width": 30, "Label": "OK",}
-        self.btnOK = self.addControl("Button", "btnOK", dOK)
-
-        dCancel = {"PositionY": 100, "PositionX": 100, "Height": 15, "Width": 30, "Label": "Cancel",}
-        self.btnCancel = self.addControl("Button", "btnCancel", dCancel)
+    def __init__(self, maxsize=_DOCUMENT_CACHE_SIZE, max_memory=_DOCUMENT_CACHE_MEMORY):
+        self.maxsize = maxsize
+        self.max_memory = max_memory
+        self._lock = threading.Lock()
+        # (url, hidden, ctx) -> (document, mtime, estimated size)
+        self._documents = collections.OrderedDict()
+        self.memory = 0
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+        self.evictions = 0
+
+    def _isAlive(self, doc):
+        try:
+            doc.getURL()
+            return True
+        except Exception:
+            # disposed, or the office is gone
+            return False
+
+    def get(self, url, hidden, ctx, mtime):
+        """Return the cached document or None, a stale entry is closed"""
+        key = (url, hidden, ctx)
+        with self._lock:
+            entry = self._documents.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            doc, doc_mtime, size = entry
+            if doc_mtime == mtime and self._isAlive(doc):
+                self._documents.move_to_end(key)
+                self.hits += 1
+                return doc
+            del self._documents[key]
+            self.memory -= size
+            self.reloads += 1
+        _close_component(doc)
+        return None
 
-        self.returnValue = ()
+    def put(self, url, hidden, ctx, mtime, doc, size):
+        """Add a loaded document, close the least recently used ones over the limits"""
+        key = (url, hidden, ctx)
+        evicted = []
+        with self._lock:
+            old = self._documents.pop(key, None)
+            if old is not None:
+                # loaded twice by concurrent callers
+                self.memory -= old[2]
+                evicted.append(old[0])
+            self._documents[key] = (doc, mtime, size)
+            self.memory += size
+            while len(self._documents) > 1 and (len(self._documents) > self.maxsize or self.memory > self.max_memory):
+                _, (old_doc, _, old_size) = self._documents.popitem(last=False)
+                self.memory -= old_size
+                self.evictions += 1
+                evicted.append(old_doc)
+        for old_doc in evicted:
+            _close_component(old_doc)
+
+    def clear(self, url=None):
+        """Close cached documents of url, or all documents"""
+        with self._lock:
+            keys = [key for key in self._documents if url is None or key[0] == url]
+            docs = [self._documents.pop(key) for key in keys]
+            self.memory -= sum(entry[2] for entry in docs)
+        for entry in docs:
+            _close_component(entry[0])
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'reloads': self.reloads, 'evictions': self.evictions,
+                    'documents': len(self._documents), 'memory': self.memory}
+
+
+_documents = _DocumentCache()
+
+
+def getDocumentCacheStats():
+    """Return hit, miss, reload and eviction counters of Office.open_document
+    """
+    return _documents.stats()
 
-    def actionPerformed(self, oActionEvent):
-        if oActionEvent.ActionCommand == 'btnOK_OnClick':
 
-            n = len(self.DialogContainer.getControl('lbChoices').getSelectedItems())
-            if n == 0:
-                self.returnValue = ()
-            elif n == 1:
-                item = self.DialogContainer.getControl('lbChoices').getSelectedItem()
-                self.returnValue = (item,)
-            else:
-                self.returnValue = self.DialogContainer.getControl('lbChoices').getSelectedItems()
+def clearDocumentCache(path=None):
+    """Close documents cached by Office.open_document
 
-            self.DialogContainer.endExecute()
-
-        if oActionEvent.ActionCommand == 'btnCancel_OnClick':
-            self.DialogContainer.endExecute()
+    :param path: close only this file, default all
+    """
+    _documents.clear(None if path is None else uno.systemPathToFileUrl(os.path.abspath(path)))
 
-        if oActionEvent.ActionCommand == 'btnSelectAll_OnClick':
-            for item in self.lbChoices.StringItemList:
-                self.DialogContainer.getControl('lbChoices').selectItem(item, True)
 
-        if oActionEvent.ActionCommand == 'btnClearAll_OnClick':
-            for item in self.lbChoices.StringItemList:
-                self.DialogContainer.getControl('lbChoices').selectItem(item, False)
+# -----------------------------------------------------------
+#               WRITER TEXT
+# -----------------------------------------------------------
 
-    def returnValue(self):
-        pass
+class WriterBuilder:
+    """Buffered output for Writer documents
 
+    Paragraphs, headings and tables are collected in Python and written
+    on flush() with a few UNO calls: consecutive paragraphs of the same
+    style go in with one insertString call, a table with one setDataArray
+    call. With mode='html' the whole buffer is imported in one call
+    through the HTML filter; only headings, paragraphs and tables are kept.
 
-class TextBoxClass(SimpleDialog):
-    """
-    Class documentation...
+    Usage:
+    with WriterBuilder(office.getDocument()) as w:
+        w.heading("Report", 1)
+        w.paragraph("Hello World")
+        w.table([("a", 1), ("b", 2)])
     """
+    def __init__(self, document=None, office=None, mode='text'):
+        """
+        :param document: Writer document, default current document
+        :param office: Office instance, default new Office()
+        :param mode: 'text' inserts strings and tables, 'html' imports generated HTML
+        """
+        self.office = office or Office()
+        self.document = document or self.office.getDocument()
+        self.mode = mode
+        self._items = []
 
-    def __init__(self, message="Enter a text", title="TextBox", text=""):
-        SimpleDialog.__init__(self, nPositionX=60, nPositionY=60, nWidth=100, nHeight=55, sTitle=None)
-        self.DialogModel.Title = title
+    def __enter__(self):
+        return self
 
-        dMessage = {"PositionY": 5, "PositionX": 5, "Height": 15, "Width": 90, "Label": message,}
-        self.lbMessage = self.addControl("FixedText", "lbMessage", dMessage)
+    def __exit__(self, exc_type, exc_value, tb):
+        if exc_type is None:
+            self.flush()
 
-        dText = {"PositionY": 15, "PositionX": 5, "Height": 15, "Width": 90, "Text":text}
-        self.txtText = self.addControl("Edit", "txtText", dText)
+    def paragraph(self, text, style=None):
+        """Add a paragraph, style is a paragraph style name, default "Standard"
+        """
+        self._items.append(('p', str(text), style or 'Standard'))
 
-        dOK = {"PositionY": 35, "PositionX": 30, "Height": 15, "Width": 30, "Label": "OK",}
-        self.btnOK = self.addControl("Button", "btnOK", dOK)
+    def heading(self, text, level=1):
+        """Add a heading, level 1 to 6
+        """
+        self._items.append(('p', str(text), 'Heading {}'.format(level)))
 
-        dCancel = {"PositionY": 35, "PositionX": 65, "Height": 15, "Width": 30, "Label": "Cancel",}
-        self.btnCancel = self.addControl("Button", "btnCancel", dCancel)
+    def table(self, rows):
+        """Add a table, rows is a sequence of equally long sequences
+        """
+        rows = tuple(tuple(_cell_value(v) for v in row) for row in rows)
+        if rows:
+            self._items.append(('table', rows, None))
 
-        self.returnValue = None
+    def flush(self):
+        """Write buffered content at the end of the document
+        """
+        if not self._items:
+            return
+        items, self._items = self._items, []
+        if self.mode == 'html':
+            self._flushHtml(items)
+        else:
+            self._flushText(items)
+
+    def _groups(self, items):
+        group = None
+        for kind, value, style in items:
+            if kind == 'p' and group is not None and group[0] == 'p' and group[2] == style:
+                group[1].append(value)
+                continue
+            if group is not None:
+                yield group
+            group = (kind, [value], style) if kind == 'p' else (kind, value, style)
+        if group is not None:
+            yield group
+
+    def _flushText(self, items):
+        text = self.document.getText()
+        cursor = text.createTextCursor()
+        cursor.gotoEnd(False)
+        empty = cursor.isStartOfParagraph() and cursor.isEndOfParagraph()
+        for kind, value, style in self._groups(items):
+            if kind == 'p':
+                if not empty:
+                    text.insertControlCharacter(cursor, _PARAGRAPH_BREAK, False)
+                cursor.setPropertyValue("ParaStyleName", style)
+                text.insertString(cursor, '\r'.join(value), False)
+                empty = False
+            else:
+                table = self.document.createInstance("com.sun.star.text.TextTable")
+                table.initialize(len(value), len(value[0]))
+                text.insertTextContent(cursor, table, False)
+                table.setDataArray(value)
+                empty = True
+
+    def _flushHtml(self, items):
+        from html import escape
+
+        html = ['<html><body>']
+        for kind, value, style in items:
+            if kind == 'p':
+                tag = 'p'
+                if style.startswith('Heading ') and style[8:].isdigit():
+                    tag = 'h' + style[8:]
+                html.append('<{0}>{1}</{0}>'.format(tag, escape(value)))
+            else:
+                html.append('<table>')
+                for row in value:
+                    html.append('<tr>' + ''.join('<td>{}</td>'.format(escape(str(v))) for v in row) + '</tr>')
+                html.append('</table>')
+        html.append('</body></html>')
+        data = uno.ByteSequence('\n'.join(html).encode('utf-8'))
+        ctx = self.office.getContext()
+        stream = ctx.ServiceManager.createInstanceWithArgumentsAndContext("com.sun.star.io.SequenceInputStream", (data,), ctx)
+        cursor = self.document.getText().createTextCursor()
+        cursor.gotoEnd(False)
+        cursor.insertDocumentFromURL("private:stream", _make_props(InputStream=stream, FilterName="HTML (StarWriter)"))
 
-    def actionPerformed(self, oActionEvent):
-        if oActionEvent.ActionCommand == 'btnOK_OnClick':
-            self.returnValue = self.txtText.Text
-            self.DialogContainer.endExecute()
 
-        if oActionEvent.ActionCommand == 'btnCancel_OnClick':
-            self.DialogContainer.endExecute()
+# -----------------------------------------------------------
+#               OFFICE POOL
+# -----------------------------------------------------------
 
-    def returnValue(self):
-        pass
+# numbers pipe names, unique for every worker in the process
+_worker_ids = itertools.count()
 
 
-class NumberBoxClass(SimpleDialog):
+class _OfficeWorker:
+    """One headless office process with its own pipe and user profile
     """
-    Class documentation...
+    def __init__(self, index, soffice, base_dir, template=None):
+        self.index = index
+        self.soffice = soffice
+        self.pipe = 'unostarter_{}_{}'.format(os.getpid(), next(_worker_ids))
+        self.profile = os.path.join(base_dir, 'profile_{}'.format(index))
+        self.template = template
+        self.url = _get_connection_url(None, None, self.pipe)
+        self.process = None
+        self.ctx = None
+        self.started = None
+        self.startupTime = None
+        self.jobs = 0
+
+    def command(self):
+        return [self.soffice, '--headless', '--invisible', '--nologo', '--norestore', '--nodefault', '--nolockcheck',
+                '-env:UserInstallation=' + uno.systemPathToFileUrl(self.profile),
+                '--accept=pipe,name={};urp;StarOffice.ComponentContext'.format(self.pipe)]
+
+    def isAlive(self):
+        return self.process is not None and self.process.poll() is None
+
+    def start(self, timeout):
+        import shutil
+        import subprocess
+
+        start = time.perf_counter()
+        if self.template is not None and not os.path.isdir(self.profile):
+            # a cloned profile skips the first start setup of the office
+            shutil.copytree(self.template, self.profile, ignore=shutil.ignore_patterns('.lock'))
+        self.process = subprocess.Popen(self.command(), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        deadline = time.time() + timeout
+        while True:
+            if self.process.poll() is not None:
+                raise RuntimeException("\n Office worker {} exited on start".format(self.index), None)
+            try:
+                # resolved directly, polling a starting office is not a cache miss
+                self.ctx = _connections._resolve(self.url)
+                _connections.register(self.url, self.ctx)
+                self.startupTime = time.perf_counter() - start
+                return self.ctx
+            except NoConnectException:
+                if time.time() > deadline:
+                    self.kill()
+                    raise RuntimeException("\n Office worker {} not ready in {} s".format(self.index, timeout), None)
+                time.sleep(0.1)
+
+    def stop(self, timeout=10):
+        import subprocess
+
+        if self.process is None:
+            return
+        try:
+            if self.isAlive() and self.ctx is not None:
+                self.ctx.getValueByName('/singletons/com.sun.star.frame.theDesktop').terminate()
+        except Exception:
+            # office is already gone or is hanging
+            pass
+        try:
+            self.process.wait(timeout)
+        except subprocess.TimeoutExpired:
+            self.kill()
+        self._forget()
+
+    def kill(self):
+        if self.isAlive():
+            self.process.kill()
+            self.process.wait()
+        self._forget()
+
+    def _forget(self):
+        _connections.discard(self.url)
+        self.ctx = None
+
+
+def prepareProfile(path=_PROFILE_TEMPLATE, soffice='soffice', timeout=60):
+    """Create a pre-initialised user profile to be cloned by launched offices
+
+    The office is started once with the profile and terminated, which does
+    the first start setup. The profile is prepared in a private temporary
+    directory next to path and renamed, so path never holds a partial
+    profile. An existing profile is left as it is.
+    Return the profile path.
+    """
+    import shutil
+    import tempfile
+
+    if os.path.isdir(os.path.join(path, 'user')):
+        return path
+    parent = os.path.dirname(os.path.abspath(path))
+    os.makedirs(parent, exist_ok=True)
+    base_dir = tempfile.mkdtemp(prefix='.unostarter_', dir=parent)
+    try:
+        worker = _OfficeWorker(0, soffice, base_dir)
+        worker.start(timeout)
+        worker.stop()
+        try:
+            os.rename(worker.profile, path)
+        except OSError:
+            # prepared meanwhile by another process
+            if not os.path.isdir(os.path.join(path, 'user')):
+                raise
+    finally:
+        shutil.rmtree(base_dir, ignore_errors=True)
+    return path
+
+
+class OfficePool:
+    """Run jobs in parallel on several headless office processes
+
+    Every worker gets its own pipe name and user profile directory. A job
+    is a callable which receives the worker's component context as first
+    argument, its return value is delivered through a Future.
+
+    Usage:
+    with OfficePool(size=4) as pool:
+        futures = [pool.submit(convert, path) for path in paths]
+        results = [f.result() for f in futures]
     """
+    def __init__(self, size=None, soffice='soffice', profile_dir=None, startup_timeout=60, job_timeout=None,
+                 template=None):
+        """
+        :param size: number of office processes, default number of cores
+        :param soffice: office executable
+        :param profile_dir: base directory for user profiles, default temporary directory
+        :param template: pre-initialised user profile cloned for every worker, see prepareProfile()
+        :param startup_timeout: seconds to wait for a worker to accept connections
+        :param job_timeout: seconds after which a job is considered hung and its worker is restarted
+        """
+        import queue
+        import tempfile
+
+        self.size = size or os.cpu_count() or 1
+        self.startup_timeout = startup_timeout
+        self.job_timeout = job_timeout
+        self.restarts = 0
+        self._own_dir = profile_dir is None
+        self._base_dir = tempfile.mkdtemp(prefix='unostarter_') if profile_dir is None else profile_dir
+        self._jobs = queue.Queue()
+        self._lock = threading.Lock()
+        self._running = {}
+        self._closed = False
+        if template is not None:
+            prepareProfile(template, soffice, startup_timeout)
+        self._workers = [_OfficeWorker(i, soffice, self._base_dir, template) for i in range(self.size)]
+        self._serving = len(self._workers)
+        self._threads = []
+        for worker in self._workers:
+            t = threading.Thread(target=self._serve, args=(worker,), name='OfficePool-{}'.format(worker.index), daemon=True)
+            t.start()
+            self._threads.append(t)
+        if job_timeout:
+            t = threading.Thread(target=self._watch, name='OfficePool-watch', daemon=True)
+            t.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def submit(self, func, *args, **kwargs):
+        """Queue func(ctx, *args, **kwargs) for the next idle worker
+
+        :return: concurrent.futures.Future
+        """
+        import concurrent.futures  # not needed until a pool is used
 
-    def __init__(self, message="Enter a number", title="NumberBox", default_value=0, min_=-10000, max_=10000, decimals=0):
-        SimpleDialog.__init__(self, nPositionX=60, nPositionY=60, nWidth=100, nHeight=55, sTitle=None)
-        self.DialogModel.Title = title
+        if self._closed:
+            raise RuntimeException("\n OfficePool is closed", None)
+        future = concurrent.futures.Future()
+        self._jobs.put((future, func, args, kwargs))
+        return future
 
-        self.default_value = default_value
-        self.min_ = min_
-        self.max_ = max_
-        self.decimals = decimals
+    def map(self, func, iterable):
+        """Run func(ctx, item) for every item, yield results in order
+        """
+        futures = [self.submit(func, item) for item in iterable]
+        for future in futures:
+            yield future.result()
 
-        dMessage = {"PositionY": 5, "PositionX": 5, "Height": 15, "Width": 90, "Label": message,}
-        self.lbMessage = self.addControl("FixedText", "lbMessage", dMessage)
+    def close(self, wait=True):
+        """Stop accepting jobs, finish queued ones and terminate the offices
 
-        dNumber = {"PositionY": 15, "PositionX": 5, "Height": 15, "Width": 90,}
-        self.nfNumber = self.addControl("NumericField", "nfNumber", dNumber)
-        self.nfNumber.setPropertyValue("DecimalAccuracy", self.decimals)
-        self.nfNumber.setPropertyValue("StrictFormat", True)
-        self.nfNumber.setPropertyValue("Value", self.default_value)
-        self.nfNumber.setPropertyValue("ValueMin", self.min_)
-        self.nfNumber.setPropertyValue("ValueMax", self.max_)
+        :param wait: block until all offices are terminated. The profile
+                     directory is removed when the last office has stopped.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        for _ in self._workers:
+            self._jobs.put(None)
+        if wait:
+            for t in self._threads:
+                t.join()
+
+    def _serve(self, worker):
+        import shutil
 
-        dOK = {"PositionY": 35, "PositionX": 30, "Height": 15, "Width": 30, "Label": "OK",}
-        self.btnOK = self.addControl("Button", "btnOK", dOK)
+        try:
+            while True:
+                job = self._jobs.get()
+                if job is None:
+                    break
+                future, func, args, kwargs = job
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    if not worker.isAlive() or worker.ctx is None:
+                        if worker.process is not None:
+                            worker.kill()
+                            with self._lock:
+                                self.restarts += 1
+                        worker.start(self.startup_timeout)
+                    with self._lock:
+                        self._running[worker.index] = time.time()
+                    result = func(worker.ctx, *args, **kwargs)
+                except BaseException as e:
+                    future.set_exception(e)
+                    if not worker.isAlive():
+                        worker.kill()
+                else:
+                    future.set_result(result)
+                finally:
+                    worker.jobs += 1
+                    with self._lock:
+                        self._running.pop(worker.index, None)
+        finally:
+            worker.stop()
+            with self._lock:
+                self._serving -= 1
+                last = self._serving == 0
+            if last and self._own_dir:
+                # the profiles are in use until the last worker has stopped
+                shutil.rmtree(self._base_dir, ignore_errors=True)
+
+    def _watch(self):
+        while not self._closed:
+            time.sleep(min(self.job_timeout, 1.0))
+            now = time.time()
+            with self._lock:
+                hung = [i for i, started in self._running.items() if now - started > self.job_timeout]
+            for i in hung:
+                # the blocked bridge call fails and the worker is restarted on its next job
+                self._workers[i].kill()
 
-        dCancel = {"PositionY": 35, "PositionX": 65, "Height": 15, "Width": 30, "Label": "Cancel",}
-        self.btnCancel = self.addControl("Button", "btnCancel", dCancel)
 
-        self.returnValue = None
+# -----------------------------------------------------------
+#               CALC DATA
+# -----------------------------------------------------------
 
-    def actionPerformed(self, oActionEvent):
-        if oActionEvent.ActionCommand == 'btnOK_OnClick':
-            if self.decimals == 0:
-                self.returnValue = int(self.nfNumber.Value)
-            else:
-                self.returnValue = self.nfNumber.Value
+def _require_numpy():
+    # imported on first use, numpy alone costs more than the rest of the module
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError("NumPy is required, install it with: pip install numpy")
+    return numpy
 
-            self.DialogContainer.endExecute()
 
-        if oActionEvent.ActionCommand == 'btnCancel_OnClick':
-            self.DialogContainer.endExecute()
+def _text_value(value):
+    """Format a cell value for text output, whole numbers without decimals
 
-    def returnValue(self):
-        pass
+    Other numbers are written with repr(), which reads back to the same float.
+    """
+    if isinstance(value, float):
+        return str(int(value)) if value.is_integer() else repr(value)
+    return value
 
 
-class DateBoxClass(SimpleDialog):
-    """
-    Class documentation...
-    """
+_COLUMNAR_MAGIC = b'UNOCOL1\n'
 
-    def __init__(self, message="Choose a date", title='DateBox'):
-        """
-        the format of the displayed date 9: short YYYYMMDD
 
-        """
-        SimpleDialog.__init__(self, nPositionX=60, nPositionY=60, nWidth=100, nHeight=55, sTitle=None)
-        self.DialogModel.Title = title
+def _little_endian(arr):
+    if sys.byteorder != 'little':
+        arr.byteswap()
+    return arr
 
-        dMessage = {"PositionY": 5, "PositionX": 5, "Height": 15, "Width": 90, "Label": message,}
-        self.lbMessage = self.addControl("FixedText", "lbMessage", dMessage)
 
-        dDate = {"PositionY": 15, "PositionX": 5, "Height": 15, "Width": 90, "Dropdown": True,
-                 "StrictFormat": True, "DateFormat": 9}
-        self.dbDate = self.addControl("DateField", "dbDate", dDate)
+def _write_columnar_block(f, block, columns):
+    """Write one block of rows column by column
 
-        dOK = {"PositionY": 35, "PositionX": 30, "Height": 15, "Width": 30, "Label": "OK",}
-        self.btnOK = self.addControl("Button", "btnOK", dOK)
+    A numeric column (numbers and empty cells) is b'd' and float64 values,
+    NaN for empty cells. Any other column is b's', uint32 byte lengths and
+    the UTF-8 text of all cells.
+    """
+    import array
+    import struct
+
+    f.write(struct.pack('<I', len(block)))
+    for j in range(columns):
+        column = [row[j] for row in block]
+        if all(isinstance(v, float) or v == '' for v in column):
+            f.write(b'd')
+            f.write(_little_endian(array.array('d', (float('nan') if v == '' else v for v in column))).tobytes())
+        else:
+            data = [str(_text_value(v)).encode('utf-8') for v in column]
+            f.write(b's')
+            f.write(_little_endian(array.array('I', (len(d) for d in data))).tobytes())
+            f.write(b''.join(data))
 
-        dCancel = {"PositionY": 35, "PositionX": 65, "Height": 15, "Width": 30, "Label": "Cancel",}
-        self.btnCancel = self.addControl("Button", "btnCancel", dCancel)
 
-        self.returnValue = ""
+def _csv_cell(text):
+    """Numbers in a csv field become floats, other text is kept"""
+    if text and text[0] in '+-.0123456789':
+        try:
+            return float(text)
+        except ValueError:
+            pass
+    return text
 
-    def actionPerformed(self, oActionEvent):
-        if oActionEvent.ActionCommand == 'btnOK_OnClick':
-            self.returnValue = self.dbDate.Text
-            self.DialogContainer.endExecute()
 
-        if oActionEvent.ActionCommand == 'btnCancel_OnClick':
-            self.DialogContainer.endExecute()
+def _array_rows(arr, chunk=4096):
+    """Rows of a 2D NumPy array as lists of Python values, converted a chunk at a time"""
+    if arr.ndim != 2:
+        raise ValueError("a 2D array is required, got {} dimensions".format(arr.ndim))
+    for start in range(0, len(arr), chunk):
+        for row in arr[start:start + chunk].tolist():
+            yield row
 
-    def returnValue(self):
-        pass
 
+def readColumnar(path):
+    """Read a file written by CalcData.export(format='columnar')
 
-class MessageBoxWizardClass(SimpleDialog):
+    Yield blocks as lists of columns, a numeric column is array('d') with
+    NaN for empty cells, a text column is a list of str.
     """
-    Class documentation...
+    import array
+    import struct
+
+    with open(path, 'rb') as f:
+        if f.read(len(_COLUMNAR_MAGIC)) != _COLUMNAR_MAGIC:
+            raise ValueError("{} is not a columnar export".format(path))
+        columns, = struct.unpack('<I', f.read(4))
+        while True:
+            head = f.read(4)
+            if not head:
+                return
+            rows, = struct.unpack('<I', head)
+            block = []
+            for _ in range(columns):
+                kind = f.read(1)
+                if kind == b'd':
+                    values = array.array('d')
+                    values.frombytes(f.read(8 * rows))
+                    block.append(_little_endian(values))
+                else:
+                    lengths = array.array('I')
+                    lengths.frombytes(f.read(4 * rows))
+                    data = f.read(sum(_little_endian(lengths)))
+                    texts = []
+                    pos = 0
+                    for n in lengths:
+                        texts.append(data[pos:pos + n].decode('utf-8'))
+                        pos += n
+                    block.append(texts)
+            yield block
+
+
+class CalcData:
+    """Bulk access to Calc cell ranges
+
+    Ranges are read with getDataArray/getFormulaArray in blocks of rows,
+    one bridge call per block instead of one call per cell.
+
+    Usage:
+    data = CalcData(office.getDocument())
+    arr = data.toArray('Sheet1')
     """
-    def __init__(self):
+    def __init__(self, document=None, office=None, block_cells=_CALC_BLOCK_CELLS):
         """
-        Message Box Wizard
-
-        """
-        SimpleDialog.__init__(self, nPositionX=60, nPositionY=60, nWidth=155, nHeight=180, sTitle='Message Box Wizard')
-        self.DialogModel.Title = ' MessageBox Wizard'
-        # title
-        dLabelTitle = {"PositionY": 5, "PositionX": 5, "Height": 15, "Width": 30, "Label": 'Title'}
-        self.lbTitle = self.addControl("FixedText", "lbTitle", dLabelTitle)
-        dTitle = {"PositionY": 5, "PositionX": 35, "Height": 15, "Width": 115, "Text": 'Title'}
-        self.txtTitle = self.addControl("Edit", "txtTitle", dTitle)
-        # message
-        dLabelMessage = {"PositionY": 20, "PositionX": 5, "Height": 15, "Width": 30, "Label": 'Message'}
-        self.lbMessage = self.addControl("FixedText", "lbMessage", dLabelMessage)
-        dMessage = {"PositionY": 20, "PositionX": 35, "Height": 15, "Width": 115, "Text": 'Message'}
-        self.txtMessage = self.addControl("Edit", "txtMessage", dMessage)
-        # type
-        dLabelType = {"PositionY": 35, "PositionX": 5, "Height": 15, "Width": 30, "Label": 'Type'}
-        self.lbMsgType = self.addControl("FixedText", "lbMsgType", dLabelType)
-        mtype = ['MESSAGEBOX', 'INFOBOX', 'WARNINGBOX', 'ERRORBOX', 'QUERYBOX']
-        dMessageType = {"PositionY": 35, "PositionX": 35, "Height": 15, "Width": 115, "Dropdown": True}
-        self.cbMsgType = self.addControl("ComboBox", "cbMsgType", dMessageType)
-        self.cbMsgType.StringItemList = tuple(mtype)
-        # buttons
-        dLabelButtons = {"PositionY": 50, "PositionX": 5, "Height": 15, "Width": 30, "Label": 'Buttons'}
-        self.lbMsgButtons = self.addControl("FixedText", "lbMsgButtons", dLabelButtons)
-
-        self.mbtn = {'BUTTONS_OK':  1, 'BUTTONS_OK_CANCEL': 2, 'BUTTONS_YES_NO': 3, 'BUTTONS_YES_NO_CANCEL': 4, 'BUTTONS_RETRY_CANCEL': 5, 'BUTTONS_ABORT_IGNORE_RETRY': 6}
-        dMessageButtons = {"PositionY": 50, "PositionX": 35, "Height": 15, "Width": 115, "Dropdown": True}
-        self.cbMsgButtons = self.addControl("ComboBox", "cbMsgButtons", dMessageButtons)
-        self.cbMsgButtons.StringItemList = tuple(self.mbtn.keys())
-        # default buttons
-        dLabelDefaultButtons = {"PositionY": 65, "PositionX": 5, "Height": 15, "Width": 30, "Label": 'Default',}
-        self.lbMsgDefaultButtons = self.addControl("FixedText", "lbMsgDefaultButtons", dLabelDefaultButtons)
-
-        self.mdefbtn = {'DEFAULT_BUTTON_OK': 65536, 'DEFAULT_BUTTON_CANCEL': 131072, 'DEFAULT_BUTTON_RETRY': 196608, 'DEFAULT_BUTTON_YES': 262144, 'DEFAULT_BUTTON_NO': 327680, 'DEFAULT_BUTTON_IGNORE': 393216}
-        dMessageDefaultButtons = {"PositionY": 65, "PositionX": 35, "Height": 15, "Width": 115, "Dropdown": True}
-        self.cbMsgDefaultButtons = self.addControl("ComboBox", "cbMsgDefaultButtons", dMessageDefaultButtons)
-        self.cbMsgDefaultButtons.StringItemList = tuple(self.mdefbtn.keys())
-
-        # code
-        text = ''
-        dText = {"PositionY": 101, "PositionX": 5, "Height": 60, "Width": 145, "Text": text, 'MultiLine': True, 'HScroll': True, 'VScroll': True}
-        self.txtText = self.addControl("Edit", "txtText", dText)
-
-        # imports
-        dLabelImports = {"PositionY": 83, "PositionX": 5, "Height": 15, "Width": 30, "Label": 'Imports'}
-        self.lbdImports = self.addControl("FixedText", "lbdImports", dLabelImports)
-        dImports = {"PositionY": 83, "PositionX": 35, "Height": 15, "Width": 55, "Dropdown": True}
-        self.cbImports = self.addControl("ComboBox", "cbImports", dImports)
-        self.cbImports.StringItemList = tuple(['Minimal', 'All'])
-        # dialog buttons
-        dShow = {"PositionY": 83, "PositionX": 90, "Height": 15, "Width": 30, "Label": "Show"}
-        self.btnShow = self.addControl("Button", "btnShow", dShow)
-        dClear = {"PositionY": 83, "PositionX": 120, "Height": 15, "Width": 30, "Label": "Clear"}
-        self.btnClear = self.addControl("Button", "btnClear", dClear)
-        dClose = {"PositionY": 163, "PositionX": 120, "Height": 15, "Width": 30, "Label": "Close"}
-        self.btnClose = self.addControl("Button", "btnClose", dClose)
-
-        self.returnValue = None
-
-    def actionPerformed(self, oActionEvent):
-        if oActionEvent.ActionCommand == 'btnShow_OnClick':
-            if self.cbImports.Text == 'Minimal':
-                imports = "from com.sun.star.awt.MessageBoxType import MESSAGEBOX, INFOBOX, WARNINGBOX, ERRORBOX, QUERYBOX\n\n"
-                buttons = str(self.mbtn[self.cbMsgButtons.Text] + self.mdefbtn[self.cbMsgDefaultButtons.Text])
-                t = imports + 'Gui.MessageBox(message="' + self.txtMessage.Text + '", title="' + self.txtTitle.Text + '", messageType=' + self.cbMsgType.Text + ', messageButtons=' + buttons + ')'
-
-            elif self.cbImports.Text == 'All':
-
-                imports = """from com.sun.star.awt.MessageBoxType import MESSAGEBOX, INFOBOX, WARNINGBOX, ERRORBOX, QUERYBOX\nfrom com.sun.star.awt.MessageBoxButtons import BUTTONS_OK, BUTTONS_OK_CANCEL, BUTTONS_YES_NO, BUTTONS_YES_NO_CANCEL, BUTTONS_RETRY_CANCEL, BUTTONS_ABORT_IGNORE_RETRY\nfrom com.sun.star.awt.MessageBoxButtons import DEFAULT_BUTTON_OK, DEFAULT_BUTTON_CANCEL, DEFAULT_BUTTON_RETRY,    DEFAULT_BUTTON_YES, DEFAULT_BUTTON_NO, DEFAULT_BUTTON_IGNORE\n\n"""
-                t = imports + 'Gui.MessageBox(message="' + self.txtMessage.Text + '", title="' + self.txtTitle.Text + '", messageType=' + self.cbMsgType.Text + ', messageButtons=' + self.cbMsgButtons.Text + ' + ' + self.cbMsgDefaultButtons.Text + ')'
-
-            self.txtText.Text = t
-            self.returnValue = 0
-
-        if oActionEvent.ActionCommand == 'btnClear_OnClick':
-             self.txtText.Text = ''
-
-        if oActionEvent.ActionCommand == 'btnClose_OnClick':
-            self.DialogContainer.endExecute()
-
-    def returnValue(self):
-        pass
-
-
-# -----------------------------------------------------------
-#               GUI FUNCTIONS
-# -----------------------------------------------------------
-
-class Gui:
-    """Provides a simple dialog boxes for interaction with a user:
-
-    make choices (SelectBox, OptionBox)
-    enter new data (TextBox, NumberBox, DateBox)
-    get paths (FolderPathBox, FilePathBox)
-    show information (MessageBox)
-
-    In script interactions are invoked by simple function calls.
-    """
-
-    def SelectBox(message="Select one item", title="SelectBox", choices=['a', 'b', 'c']):
-        """Simple dialog to select an item within a drop-down list.
-        
-        :param message: Message displayed to the user.
-        :param title: Window title.
-        :param choices: List containing the names of the items that can be selected.
-        :return:  A string, or None
-        
-        Usage: SelectBox(message="Select one item", title="SelectBox", choices=['a','b','c'])
+        :param document: Calc document, default current document
+        :param office: Office instance, default new Office()
+        :param block_cells: approximate number of cells fetched per bridge call
         """
-        app = SelectBoxClass(message, title, choices)
-        app.showDialog()
-        return app.returnValue
+        self.office = office or Office()
+        self.document = document or self.office.getDocument()
+        self.block_cells = block_cells
 
-    def OptionBox(message="Select multiple items", title="OptionBox", choices=['a', 'b', 'c']):
-        """Show a list of possible choices to be selected.
-        
-        :param message: Message displayed to the user.
-        :param title: Window title.
-        :param choices: List containing the names of the items that can be selected.
-        :return: A tuple of selected items, or empty tuple
-        
-        Usage: OptionBox(message="Select multiple items", title="OptionBox", choices=['a','b','c'])
+    def getSheet(self, sheet=None):
+        """Get sheet by name, index or object, default active sheet
         """
-        app = OptionBoxClass(message, title, choices)
-        app.showDialog()
-        return app.returnValue
-
-    def TextBox(message="Enter your input", title="TextBox", text=""):
-        """Simple text input box.
-        
-        :param message: Message displayed to the user.
-        :param title: Window title.
-        :param text: Response from the user.
-        :return: A string, or None
-        
-        Usage: TextBox(message="Enter your input", title="TextBox", text="")
+        if sheet is None:
+            return self.document.getCurrentController().getActiveSheet()
+        if isinstance(sheet, str):
+            return self.document.Sheets.getByName(sheet)
+        if isinstance(sheet, int):
+            return self.document.Sheets.getByIndex(sheet)
+        return sheet
+
+    def getUsedArea(self, sheet=None):
+        """Get address of the used area of the sheet, com.sun.star.table.CellRangeAddress
         """
-        app = TextBoxClass(message, title, text)
-        app.showDialog()
-        return app.returnValue
+        cursor = self.getSheet(sheet).createCursor()
+        cursor.gotoStartOfUsedArea(False)
+        cursor.gotoEndOfUsedArea(True)
+        return cursor.getRangeAddress()
 
-    def NumberBox(message="Enter a number", title="NumberBox", default_value=0, min_=-10000, max_=10000, decimals=0):
-        """Simple dialog to ask a user to select an number within a certain range.
-        
-        :param message: Message displayed to the user.
-        :param title: Window title.
-        :param default_value: Default value appearing in the box.
-        :param min_: Minimum value allowed, default -10000 
-        :param max_: Maximum value allowed, default 10000
-        :param decimals: Indicate the maximum decimal precision allowed, default 0
-        :return: An integer/float or None
-        
-        Usage: NumberBox(message="Enter a number", title="NumberBox", default_value=0, min_=-10000, max_=10000, decimals=0)
+    def getRange(self, sheet=None, rng=None):
+        """Get cell range by name "A1:C10", default the used area
         """
-        app = NumberBoxClass(message, title, default_value, min_, max_, decimals)
-        app.showDialog()
-        return app.returnValue
-
-    def DateBox(message="Choose a date", title='DateBox'):
-        """Calendar dialog box
-        
-        :param message: Message displayed to the user.
-        :param title: Window title.
-        :return: The selected date in format YYYYMMDD
-        
-        Usage: DateBox(message="Date of birth", title="BirthDay")
+        oSheet = self.getSheet(sheet)
+        if rng is None:
+            a = self.getUsedArea(oSheet)
+            return oSheet.getCellRangeByPosition(a.StartColumn, a.StartRow, a.EndColumn, a.EndRow)
+        if isinstance(rng, str):
+            return oSheet.getCellRangeByName(rng)
+        return rng
+
+    def blockRows(self, columns):
+        """Number of rows per block for a range of given width"""
+        return max(1, self.block_cells // max(1, columns))
+
+    def iterBlocks(self, sheet=None, rng=None, formulas=False, block_rows=None):
+        """Yield blocks of rows, each block is a tuple of row tuples
+
+        :param formulas: read formulas instead of values
+        :param block_rows: rows per bridge call, default derived from block_cells
         """
-        app = DateBoxClass(message, title)
-        app.showDialog()
-        return app.returnValue
-
-    def FolderPathBox(title='Get directory path'):
-        """Gets the full path of an existing directory
-        
-        :param title: Window title.
-        :return: The path of a directory or an empty string
-        
-        Usage: FolderPathBox(title='Get directory path')
+        oSheet = self.getSheet(sheet)
+        a = self.getRange(oSheet, rng).getRangeAddress()
+        columns = a.EndColumn - a.StartColumn + 1
+        step = block_rows or self.blockRows(columns)
+        for row in range(a.StartRow, a.EndRow + 1, step):
+            end = min(row + step - 1, a.EndRow)
+            block = oSheet.getCellRangeByPosition(a.StartColumn, row, a.EndColumn, end)
+            yield block.getFormulaArray() if formulas else block.getDataArray()
+
+    def read(self, sheet=None, rng=None, formulas=False, block_rows=None):
+        """Read range into a list of row tuples
         """
-        ctx = ConnectOffice()
-        smgr = ctx.getServiceManager()
-        folder_picker = smgr.createInstanceWithContext("com.sun.star.ui.dialogs.FolderPicker", ctx)
-        folder_picker.setTitle(title)
-        folder_picker.execute()
-        return folder_picker.getDirectory()
+        rows = []
+        for block in self.iterBlocks(sheet, rng, formulas, block_rows):
+            rows.extend(block)
+        return rows
 
-    def FilePathBox(title='Get file path'):
-        """Gets the full path of existing files
-        
-        :param title: Window title.
-        :return: The path of a file or an empty string
-        
-        Usage: FilePathBox(title='Get file path')
-        """
-        ctx = ConnectOffice()
-        smgr = ctx.getServiceManager()
-        open_file_picker = smgr.createInstanceWithContext("com.sun.star.ui.dialogs.FilePicker", ctx)
-        open_file_picker.setMultiSelectionMode(False)
-        open_file_picker.setTitle(title)
-        open_file_picker.appendFilter("All files (*.*)", "*.*")
-        open_file_picker.execute()
-        return open_file_picker.getSelectedFiles()[0]
-
-    def MessageBox(message="Message", title="MessageBox", messageType=_INFOBOX, messageButtons=_BUTTONS_OK):
-        """Simple message box.
-        
-        :param message: Message displayed to the user.
-        :param title: Window title. 
-        :param messageType: Message box type
-        :param messageButtons: Message box buttons
-        :return: CANCEL = 0, OK = 1, YES = 2, NO = 3, RETRY = 4, IGNORE = 5 
- 
-        """
-        ctx = ConnectOffice()
-        sm = ctx.ServiceManager
-        toolkit = sm.createInstanceWithContext("com.sun.star.awt.Toolkit", ctx)
-        parent_win = sm.createInstanceWithContext("com.sun.star.awt.ExtToolkit", ctx)
-        messageBox = toolkit.createMessageBox(parent_win, messageType, messageButtons, title, message)
-        rval = messageBox.execute()
-        return rval
-
-    def MBWizard():
-        """Message Box wizard
-
-        Allows developers to quickly generate code for message boxes.
-        Copy generated code in your script.
-        """
-        app = MessageBoxWizardClass()
-        app.showDialog()
-        return None
-
-
-# -----------------------------------------------------------
-#               INSPECTION
-# -----------------------------------------------------------
+    def iterExport(self, path, sheet=None, rng=None, format='csv', block_rows=None, encoding='utf-8'):
+        """Write range to a file block by block, yield TransferProgress after each block
 
-class Inspector:
-    """Frequently used methods in development context
+        :param path: output file, overwritten
+        :param format: 'csv' or 'columnar', a typed binary file read with readColumnar()
+        :param block_rows: rows per bridge call, default derived from block_cells
+        :param encoding: encoding of the csv file
 
-    """
-    def __init__(self, context=None):
-        
-        if context:
-            self.ctx = context
+        Only one block of rows is held in memory.
+        """
+        import csv
+        import struct
+
+        if format not in ('csv', 'columnar'):
+            raise ValueError("format must be 'csv' or 'columnar', not {!r}".format(format))
+        oSheet = self.getSheet(sheet)
+        oRange = self.getRange(oSheet, rng)
+        a = oRange.getRangeAddress()
+        columns = a.EndColumn - a.StartColumn + 1
+        start = time.perf_counter()
+        rows = 0
+        if format == 'csv':
+            f = open(path, 'w', newline='', encoding=encoding)
+            writer = csv.writer(f)
+
+            def write(block):
+                writer.writerows([_text_value(v) for v in row] for row in block)
         else:
-            self.ctx = ConnectOffice()
-        self.smgr = self.ctx.ServiceManager
-        self.desktop = self.ctx.getValueByName('/singletons/com.sun.star.frame.theDesktop')
-        self.introspection = self.ctx.getValueByName("/singletons/com.sun.star.beans.theIntrospection")
-        self.reflection = self.ctx.getValueByName("/singletons/com.sun.star.reflection.theCoreReflection")
-        self.documenter = self.ctx.getValueByName('/singletons/com.sun.star.util.theServiceDocumenter')
-
-    def _inspectProperties(self, object):
-        """Inspect properties
-
-        :param object: Inspect this object
-
+            f = open(path, 'wb')
+            f.write(_COLUMNAR_MAGIC + struct.pack('<I', columns))
+
+            def write(block):
+                _write_columnar_block(f, block, columns)
+        with f:
+            for block in self.iterBlocks(oSheet, oRange, False, block_rows):
+                write(block)
+                rows += len(block)
+                elapsed = time.perf_counter() - start
+                yield TransferProgress(rows, elapsed, rows / elapsed if elapsed else 0.0)
+
+    def export(self, path, sheet=None, rng=None, format='csv', block_rows=None, progress=None):
+        """Write range to a csv or columnar file, see iterExport()
+
+        :param progress: callable receiving TransferProgress after each block
+        :return: TransferProgress of the whole export
         """
-
-        P = {}
+        result = TransferProgress(0, 0.0, 0.0)
+        for result in self.iterExport(path, sheet, rng, format, block_rows):
+            if progress is not None:
+                progress(result)
+        return result
+
+    def iterImport(self, source, sheet=None, cell='A1', block_rows=None, bulk=True, delimiter=',', encoding='utf-8'):
+        """Write rows to the sheet block by block, yield TransferProgress after each block
+
+        :param source: csv file path, iterable of row sequences or 2D NumPy array
+        :param cell: top left target cell, "A1"
+        :param block_rows: rows per setDataArray call, default derived from block_cells and the first row
+        :param bulk: lock controllers and suspend auto recalculation while writing, see Office.bulk_edit
+        :param delimiter: field delimiter of the csv file
+        :param encoding: encoding of the csv file
+
+        Values are converted once on the Python side, numbers in csv fields
+        become numbers, None and NaN become empty cells. Short rows are
+        padded with empty cells.
+        """
+        import csv
+
+        oSheet = self.getSheet(sheet)
+        a = oSheet.getCellRangeByName(cell).getRangeAddress()
+        f = None
+        if isinstance(source, str):
+            f = open(source, newline='', encoding=encoding)
+            rows = ([_csv_cell(v) for v in row] for row in csv.reader(f, delimiter=delimiter))
+        elif hasattr(source, 'ndim') and hasattr(source, 'tolist'):
+            rows = _array_rows(source)
+        else:
+            rows = iter(source)
         try:
-            inspector = self.introspection.inspect(object)
-            # properties
-            properties = inspector.getProperties(_PROPERTY_CONCEPT_ALL)
-            for property in properties:
-                try:
-                    # name
-                    p_name = str(property.Name)
-                    P[p_name] = {}
-                    typ = str(property.Type)
-                    typ = typ.split('(')
-                    typ = typ[0].replace('<Type instance ', '')
-                    typ = typ.replace('com.sun.star', '')
-                    P[p_name]['type'] = typ.strip() 
-                    v = object.getPropertyValue(p_name)
-                    t = str(v)
-                    if t.startswith("pyuno object"):
-                        v = "()"
-                    if t.startswith("("):
-                        v = "()"
-                    
-                    P[p_name]['repr'] = str(v)
-                except:
-
-                    P[p_name]['repr'] = "()"
-
-        except:
-            pass
-
-        return P
-
-    def _inspectMethods(self, object):
-        """Inspect methods
+            first = next(rows, None)
+            if first is None:
+                return
+            step = block_rows or self.blockRows(len(first))
+            rows = itertools.chain((first,), rows)
+            start = time.perf_counter()
+            written = 0
+            with self.office.bulk_edit(self.document) if bulk else contextlib.nullcontext():
+                while True:
+                    block = [tuple(_cell_value(v) for v in row) for row in itertools.islice(rows, step)]
+                    if not block:
+                        break
+                    width = max(len(row) for row in block)
+                    if width:
+                        block = tuple(row + ('',) * (width - len(row)) for row in block)
+                        oSheet.getCellRangeByPosition(a.StartColumn, a.StartRow + written, a.StartColumn + width - 1,
+                                                      a.StartRow + written + len(block) - 1).setDataArray(block)
+                    written += len(block)
+                    elapsed = time.perf_counter() - start
+                    yield TransferProgress(written, elapsed, written / elapsed if elapsed else 0.0)
+        finally:
+            if f is not None:
+                f.close()
+
+    def importData(self, source, sheet=None, cell='A1', block_rows=None, bulk=True, progress=None, **kwargs):
+        """Write a csv file, rows or a NumPy array to the sheet, see iterImport()
+
+        :param progress: callable receiving TransferProgress after each block
+        :return: TransferProgress of the whole import
+        """
+        result = TransferProgress(0, 0.0, 0.0)
+        for result in self.iterImport(source, sheet, cell, block_rows, bulk, **kwargs):
+            if progress is not None:
+                progress(result)
+        return result
+
+    def mirror(self, sheet=None, rng=None, block_rows=None, listen=True):
+        """Return a CalcMirror of the range, default the used area
+        """
+        return CalcMirror(self, sheet, rng, block_rows, listen)
 
-        :param object: Inspect this object
+    def toArray(self, sheet=None, rng=None, dtype=None, block_rows=None):
+        """Read range into a 2D NumPy array
 
+        :param dtype: NumPy dtype of the array, numeric dtypes get NaN for empty cells, integer
+                      dtypes raise ValueError for them, default float if all cells are numeric
+                      or empty, else object
         """
-        M = {}
-        try:
-            inspector = self.introspection.inspect(object)
-            # methods
-            methods = inspector.getMethods(_METHOD_CONCEPT_ALL)
-            for method in methods:
-                # name
-                m_name = str(method.Name)
-                M[m_name] = {}
-                # typ = str(method.getReturnType())
-                M[m_name]['type'] = 'PyUNO_callable'
-                # repr
-                args = method.ParameterTypes
-                infos = method.ParameterInfos
-                params = "("
-                for i in range(0, len(args)):
-                    params = params + _mode_to_str(infos[i].aMode) + " " + str(args[i].Name) + " " + str(infos[i].aName) + ", "
-                params = params + ")"
-
-                if params == "()":
-                    params = "()"
-
-                M[m_name]['repr'] = str(params)
-        except:
-            pass
-        
-        return M
+        np = _require_numpy()
+        oSheet = self.getSheet(sheet)
+        oRange = self.getRange(oSheet, rng)
+        a = oRange.getRangeAddress()
+        shape = (a.EndRow - a.StartRow + 1, a.EndColumn - a.StartColumn + 1)
+        arr = np.empty(shape, dtype=object)
+        r = 0
+        for block in self.iterBlocks(oSheet, oRange, False, block_rows):
+            arr[r:r + len(block)] = block
+            r += len(block)
+        if dtype is None:
+            try:
+                return np.where(arr == '', np.nan, arr).astype(float)
+            except (TypeError, ValueError):
+                return arr
+        if np.dtype(dtype).kind in 'iufc':
+            arr = np.where(arr == '', np.nan, arr)
+        return np.asarray(arr, dtype=dtype)
+
+    def toColumns(self, sheet=None, rng=None, header=False, block_rows=None):
+        """Read range into a dict of column arrays
+
+        Numeric columns become float arrays with NaN for empty cells,
+        other columns become str arrays.
+
+        :param header: use first row as column names, default column indexes
+        """
+        np = _require_numpy()
+        arr = self.toArray(sheet, rng, dtype=object, block_rows=block_rows)
+        if header and len(arr):
+            names = [str(v) for v in arr[0]]
+            arr = arr[1:]
+        else:
+            names = list(range(arr.shape[1]))
+        columns = {}
+        for j, name in enumerate(names):
+            col = arr[:, j]
+            try:
+                columns[name] = np.where(col == '', np.nan, col).astype(float)
+            except (TypeError, ValueError):
+                columns[name] = col.astype(str)
+        return columns
+
+
+def _rectangles(cells):
+    """Cover sorted (row, column) cells with rectangles (first row, last row, first column, last column)
+
+    Runs of adjacent columns in a row are merged with the same run in
+    the rows directly above.
+    """
+    runs = []
+    for row, columns in itertools.groupby(cells, key=lambda cell: cell[0]):
+        columns = [column for _, column in columns]
+        start = prev = columns[0]
+        for column in columns[1:]:
+            if column != prev + 1:
+                runs.append((row, start, prev))
+                start = column
+            prev = column
+        runs.append((row, start, prev))
+    open_rects = {}
+    done = []
+    for row, start, end in runs:
+        rect = open_rects.get((start, end))
+        if rect is not None and rect[1] == row - 1:
+            rect[1] = row
+        else:
+            if rect is not None:
+                done.append(rect)
+            open_rects[(start, end)] = [row, row, start, end]
+    done.extend(open_rects.values())
+    return sorted(tuple(rect) for rect in done)
+
+
+# defined on first use, the listener needs unohelper and the util interfaces
+_MirrorListener = None
+
+
+def _mirrorListener(mirror):
+    """Create a listener which marks blocks of mirror stale when the office changes cells"""
+    global _MirrorListener
+    if _MirrorListener is None:
+        import unohelper
+        from com.sun.star.util import XChangesListener, XModifyListener
+
+        class MirrorListener(unohelper.Base, XChangesListener, XModifyListener):
+            """Marks blocks of a CalcMirror stale when the office changes cells"""
+            def __init__(self, mirror):
+                self.mirror = mirror
+
+            def changesOccurred(self, oEvent):
+                addresses = []
+                for change in oEvent.Changes:
+                    if change.Accessor != 'cell-change':
+                        # rows or columns inserted or deleted, cells have moved
+                        self.mirror.markStale()
+                        return
+                    element = change.ReplacedElement
+                    try:
+                        addresses.extend(element.getRangeAddresses())
+                    except Exception:
+                        try:
+                            addresses.append(element.getRangeAddress())
+                        except Exception:
+                            self.mirror.markStale()
+                            return
+                for address in addresses:
+                    self.mirror.markStale(address)
+
+            def modified(self, oEvent):
+                # the event does not tell which cells changed
+                self.mirror.markStale()
+
+            def disposing(self, oEvent):
+                self.mirror._listener = None
+
+        _MirrorListener = MirrorListener
+    return _MirrorListener(mirror)
+
+
+class CalcMirror:
+    """Python-side copy of a Calc range
+
+    The range is read once with getDataArray, reads are served from
+    memory. Written cells are tracked and flush() writes back only
+    those, one setDataArray call per rectangle of adjacent dirty cells,
+    so formulas and other cells are left alone. Cells changed in the
+    office mark their blocks stale through a changes listener, a stale
+    block is read again on the next access.
+
+    Indexes are relative to the top left cell of the range.
+
+    Usage:
+    with CalcData(office.getDocument()).mirror('Sheet1', 'A1:F1000') as m:
+        m[0, 2] = m[0, 1] * 2
+    # flushed on exit
+    """
+    def __init__(self, data, sheet=None, rng=None, block_rows=None, listen=True):
+        """
+        :param data: CalcData of the document
+        :param sheet: sheet name, index or object, default active sheet
+        :param rng: cell range name "A1:C10" or object, default the used area
+        :param block_rows: rows per bridge call, default derived from block_cells
+        :param listen: mark blocks stale when cells change in the office
+        """
+        self.data = data
+        self.sheet = data.getSheet(sheet)
+        self.range = data.getRange(self.sheet, rng)
+        self.address = self.range.getRangeAddress()
+        self.rows = self.address.EndRow - self.address.StartRow + 1
+        self.columns = self.address.EndColumn - self.address.StartColumn + 1
+        self.block_rows = block_rows or data.blockRows(self.columns)
+        self._lock = threading.Lock()
+        # block index -> set of dirty (row, column)
+        self._dirty = {}
+        self._stale = set()
+        self._flushing = False
+        self.refreshes = 0
+        self.flushes = 0
+        self._cells = []
+        for block in data.iterBlocks(self.sheet, self.range, False, self.block_rows):
+            self._cells.extend(list(row) for row in block)
+        self._listener = None
+        self._broadcaster = None
+        if listen:
+            self._listen()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        if exc_type is None:
+            self.flush()
+        self.close()
+
+    def __len__(self):
+        return self.rows
+
+    def __getitem__(self, key):
+        row, column = key
+        self._fresh(row)
+        return self._cells[row][column]
+
+    def __setitem__(self, key, value):
+        row, column = key
+        self._fresh(row)
+        self._cells[row][column] = _cell_value(value)
+        with self._lock:
+            self._dirty.setdefault(row // self.block_rows, set()).add((row, column))
+
+    def getRow(self, row):
+        """Values of a row as a tuple
+        """
+        self._fresh(row)
+        return tuple(self._cells[row])
 
+    def setRow(self, row, values):
+        """Set the leading cells of a row from a sequence
+        """
+        for column, value in enumerate(values):
+            self[row, column] = value
+
+    def isDirty(self):
+        return bool(self._dirty)
+
+    def _listen(self):
+        listener = _mirrorListener(self)
+        document = self.data.document
+        if hasattr(document, 'addChangesListener'):
+            document.addChangesListener(listener)
+            self._broadcaster = document
+        elif hasattr(self.range, 'addModifyListener'):
+            self.range.addModifyListener(listener)
+            self._broadcaster = self.range
+        else:
+            return
+        self._listener = listener
 
-    def callMRI(self, object=None):
-        """Create an instance of MRI inspector and inspect the given object
-        
-        :param object: Inspect this object
+    def close(self):
+        """Stop listening to office changes, unflushed changes stay in memory
         """
+        listener, self._listener = self._listener, None
+        if listener is None:
+            return
         try:
-            if not object:
-                object = self.desktop.getCurrentComponent().getSelection()
-            mri = self.ctx.ServiceManager.createInstance("mytools.Mri")
-            mri.inspect(object)
-        except:
-            raise RuntimeException("\n MRI is not installed", self.ctx)
-
-    def inspect(self, object, item=None, console='no'):
-        """Inspect object
-
-        :param object: Inspect this object
-        :param item: Limited list of properties an methods to inspect
-        :param console: Print result to console
+            if hasattr(self._broadcaster, 'removeChangesListener'):
+                self._broadcaster.removeChangesListener(listener)
+            else:
+                self._broadcaster.removeModifyListener(listener)
+        except Exception:
+            # document already closed
+            pass
 
-        Return properties and methods
+    def markStale(self, address=None):
+        """Mark blocks overlapping a CellRangeAddress for reading again, default all blocks
         """
-        p = self._inspectProperties(object)
-        m = self._inspectMethods(object)
-        
-        context = {}
-        if item is None:
-            context.update(sorted(p.items()))
-            context.update(sorted(m.items()))
+        if self._flushing:
+            # our own setDataArray calls
+            return
+        blocks = (len(self._cells) + self.block_rows - 1) // self.block_rows
+        a = self.address
+        if address is None:
+            stale = range(blocks)
         else:
-            for k,v in p.items():
-                if k in item:
-                    context[k] = v
-            for k,v in m.items():
-                if k in item:
-                    context[k] = v
-                    
-        if console == 'no':
-            return context
-        
-        if console == 'yes':
-            for key, value in sorted(context.items()):
-                for tp, rep in value.items():
-                    t = context[key]['type']
-                    r = context[key]['repr']
-                print('{:<35}'.format(key) +  '{:<35}'.format(t) + r)
-
-
-    def showServiceDocs(self, object):
-        """Open browser to show service documentation
-        :param object:
+            if address.Sheet != a.Sheet or address.EndColumn < a.StartColumn or address.StartColumn > a.EndColumn:
+                return
+            first = max(address.StartRow, a.StartRow) - a.StartRow
+            last = min(address.EndRow, a.EndRow) - a.StartRow
+            if first > last:
+                return
+            stale = range(first // self.block_rows, last // self.block_rows + 1)
+        with self._lock:
+            self._stale.update(stale)
+
+    def _fresh(self, row):
+        if self._stale:
+            block = row // self.block_rows
+            if block in self._stale:
+                self.refresh(block)
+
+    def refresh(self, block=None):
+        """Read a block again, default all stale blocks
+
+        Cells written in Python and not yet flushed keep their values.
         """
-        return self.documenter.showServiceDocs(object)
-
-    def showInterfaceDoc(self, object):
-        """Open browser to show interface documentation
-        :param object:
+        with self._lock:
+            blocks = sorted(self._stale) if block is None else [block]
+            self._stale.difference_update(blocks)
+        a = self.address
+        for block in blocks:
+            first = block * self.block_rows
+            last = min(first + self.block_rows, self.rows) - 1
+            oRange = self.sheet.getCellRangeByPosition(a.StartColumn, a.StartRow + first, a.EndColumn, a.StartRow + last)
+            fresh = [list(row) for row in oRange.getDataArray()]
+            with self._lock:
+                for row, column in self._dirty.get(block, ()):
+                    fresh[row - first][column] = self._cells[row][column]
+            self._cells[first:last + 1] = fresh
+            self.refreshes += 1
+
+    def flush(self):
+        """Write dirty cells back, one setDataArray call per rectangle of dirty cells
+
+        Cells which were not written keep their content in the office,
+        formulas included.
         """
-        return self.documenter.showInterfaceDoc(object)
-
-
-
+        with self._lock:
+            blocks = sorted(self._dirty)
+        a = self.address
+        self._flushing = True
+        try:
+            for block in blocks:
+                with self._lock:
+                    cells = sorted(self._dirty[block])
+                for first, last, column, end in _rectangles(cells):
+                    oRange = self.sheet.getCellRangeByPosition(a.StartColumn + column, a.StartRow + first,
+                                                               a.StartColumn + end, a.StartRow + last)
+                    oRange.setDataArray(tuple(tuple(row[column:end + 1]) for row in self._cells[first:last + 1]))
+                    self.flushes += 1
+                with self._lock:
+                    self._dirty[block].difference_update(cells)
+                    if not self._dirty[block]:
+                        del self._dirty[block]
+        finally:
+            self._flushing = False